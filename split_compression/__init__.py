@@ -0,0 +1,47 @@
+"""分卷压缩工具的压缩引擎，不依赖PyQt5，可以在没有图形界面的服务器上使用
+    
+    from split_compression import compress_to_volumes
+    compress_to_volumes("项目文件夹", "输出目录", 100 * 1024 * 1024, password="密码")
+
+命令行用法见 python -m split_compression --help。
+"""
+
+__version__ = "1.02"
+
+# 公开的接口按需导入：只导入包本身时不会加载pyzipper等依赖
+_EXPORTS = {
+    "compress_to_volumes": "engine",
+    "CompressJob": "engine",
+    "CompressCancelled": "engine",
+    "ExtractJob": "extract",
+    "extract_volumes": "extract",
+    "VerifyJob": "verify",
+    "verify_archive": "verify",
+    "verify_volumes": "checksums",
+    "repair_volumes": "parity",
+    "JobStats": "stats",
+    "StatsLog": "stats",
+    "list_archive": "index",
+    "search_entries": "index",
+    "write_index": "index",
+    "JobScheduler": "batch",
+    "load_job_list": "batch",
+    "COMPRESSION_METHODS": "codecs",
+    "COMPRESSION_PRESETS": "codecs",
+    "split_zip_file": "volumes",
+    "list_volumes": "volumes",
+    "get_volume_name": "volumes",
+    "VolumeWriter": "volumes",
+    "VolumeReader": "volumes",
+    "find_volume_set": "volumes",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
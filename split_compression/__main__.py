@@ -0,0 +1,7 @@
+"""python -m split_compression"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,298 @@
+"""批量压缩：任务队列和调度器，同时运行多个压缩任务
+
+调度器按CPU核数和每个输出设备的并发写入数限制同时运行的任务：
+每个任务占用与其压缩线程数相同的CPU名额，同一设备上同时写入的任务数不超过io_limit，
+避免多个任务同时写一块机械硬盘时磁头来回寻道反而更慢。
+创建调度器不会导入压缩引擎（pyzipper等），第一次加入任务时才导入，界面启动时可以直接创建。
+"""
+
+import collections
+import itertools
+import os
+import threading
+import time
+
+# 任务状态
+PENDING = "等待中"
+RUNNING = "压缩中"
+DONE = "已完成"
+FAILED = "失败"
+CANCELLED = "已取消"
+
+def _ignore(*args):
+    pass
+
+def device_id(path):
+    """返回路径所在设备的标识；路径还不存在时使用最近的已存在的上级目录"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return path
+
+def load_job_list(list_path):
+    """读取任务列表文件，返回[(源路径, 输出目录或None), ...]
+    
+    每行一个要压缩的文件或文件夹，可以用制表符分隔再指定该任务的输出目录；
+    空行和以#开头的行会被忽略，相对路径相对于列表文件所在的目录。
+    """
+    base_dir = os.path.dirname(os.path.abspath(list_path))
+    jobs = []
+    with open(list_path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            source, _, output_dir = line.partition("\t")
+            source = os.path.join(base_dir, source.strip())
+            output_dir = output_dir.strip()
+            jobs.append((source, os.path.join(base_dir, output_dir) if output_dir else None))
+    return jobs
+
+class BatchJob:
+    """队列中的一个压缩任务，记录状态、进度和结果"""
+    
+    def __init__(self, job_id, job, cpu_cost, device):
+        self.job_id = job_id
+        self.job = job
+        self.cpu_cost = cpu_cost
+        self.device = device
+        self.state = PENDING
+        self.progress = 0.0
+        self.current_file = ""
+        self.volumes = []
+        self.message = ""
+        self.start_time = None
+        self.end_time = None
+    
+    @property
+    def source_path(self):
+        return self.job.source_path
+    
+    @property
+    def output_dir(self):
+        return self.job.output_dir
+    
+    @property
+    def total_size(self):
+        return getattr(self.job, "total_size", 0)
+    
+    @property
+    def processed_bytes(self):
+        """按进度估算的已处理字节数（包括正在压缩的文件）"""
+        if self.state == DONE:
+            return self.total_size
+        return int(self.total_size * self.progress / 100.0)
+    
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+class JobScheduler:
+    """压缩任务队列：按CPU和设备限制调度，任务完成后自动启动后面的任务
+    
+    callbacks为可选的回调字典（在各任务的工作线程中执行）：
+    "state"(BatchJob)在任务开始和结束时调用，"progress"(BatchJob)在进度变化时调用，
+    "current_file"(BatchJob)在开始压缩新文件时调用，"all_done"()在队列中的任务全部结束时调用。
+    """
+    
+    def __init__(self, cpu_limit=None, io_limit=1, callbacks=None):
+        callbacks = callbacks or {}
+        self.on_state = callbacks.get("state") or _ignore
+        self.on_progress = callbacks.get("progress") or _ignore
+        self.on_current_file = callbacks.get("current_file") or _ignore
+        self.on_all_done = callbacks.get("all_done") or _ignore
+        self.cpu_limit = max(1, cpu_limit or os.cpu_count() or 1)
+        # 每个输出设备上同时运行的任务数
+        self.io_limit = max(1, io_limit)
+        self.jobs = []
+        self._job_ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._cpu_in_use = 0
+        self._device_in_use = collections.Counter()
+        self._started = False
+        self._reporting = 0  # 已经结束但还在执行结束回调的任务数
+        # 吞吐量采样：(时间, 已处理字节数)，取最近几秒计算当前速度
+        self._samples = collections.deque()
+        self.throughput_window = 5.0
+    
+    def add(self, source_path, output_dir, volume_size, password=None, **options):
+        """加入一个压缩任务，options为CompressJob的其他参数；调度器已启动时会立即参与调度"""
+        from .engine import CompressJob
+        
+        with self._condition:
+            batch_job = None
+            
+            def on_progress(value):
+                batch_job.progress = value
+                self.on_progress(batch_job)
+            
+            def on_current_file(name):
+                batch_job.current_file = name
+                self.on_current_file(batch_job)
+            
+            job = CompressJob(
+                source_path, output_dir, volume_size, password,
+                callbacks={"progress": on_progress, "current_file": on_current_file},
+                **options
+            )
+            # 两个任务写同一组分卷会互相覆盖
+            for other in self.jobs:
+                if not other.finished and os.path.abspath(other.job.output_base) == os.path.abspath(job.output_base):
+                    raise ValueError(f"队列中已有输出到{job.output_base}.*的任务")
+            # 压缩线程数超过CPU限制的任务也要能运行，只是运行时独占全部CPU名额
+            cpu_cost = min(job.workers, self.cpu_limit)
+            batch_job = BatchJob(next(self._job_ids), job, cpu_cost, device_id(output_dir))
+            self.jobs.append(batch_job)
+            if self._started:
+                self._schedule()
+        return batch_job
+    
+    def start(self):
+        """开始调度队列中的任务；队列中的任务全部结束后停止调度，再加入的任务需要再次调用start()"""
+        with self._condition:
+            self._started = True
+            self._schedule()
+    
+    def _schedule(self):
+        """在持有锁时调用：按队列顺序启动满足CPU和设备限制的任务
+        
+        CPU名额不够时停止向后查找，保证占用多个线程的任务不会一直被后面的小任务插队；
+        设备繁忙的任务则跳过，让写入其他设备的任务先运行。
+        """
+        for batch_job in self.jobs:
+            if batch_job.state != PENDING:
+                continue
+            if self._cpu_in_use + batch_job.cpu_cost > self.cpu_limit:
+                break
+            if self._device_in_use[batch_job.device] >= self.io_limit:
+                continue
+            batch_job.state = RUNNING
+            batch_job.start_time = time.monotonic()
+            self._cpu_in_use += batch_job.cpu_cost
+            self._device_in_use[batch_job.device] += 1
+            threading.Thread(target=self._run_job, args=(batch_job,), daemon=True).start()
+    
+    def _run_job(self, batch_job):
+        from .engine import CompressCancelled
+        
+        self.on_state(batch_job)
+        job = batch_job.job
+        try:
+            batch_job.volumes = job.run()
+            batch_job.message = job.format_summary(batch_job.volumes)
+            state = DONE
+        except CompressCancelled:
+            batch_job.message = "压缩已取消，未完成的分卷已删除"
+            state = CANCELLED
+        except Exception as e:
+            batch_job.message = f"压缩失败：{e}"
+            if job.failure_note:
+                batch_job.message += f"\n{job.failure_note}"
+            state = FAILED
+        
+        with self._condition:
+            batch_job.state = state
+            batch_job.end_time = time.monotonic()
+            self._cpu_in_use -= batch_job.cpu_cost
+            self._device_in_use[batch_job.device] -= 1
+            self._schedule()
+            all_done = self._check_all_done()
+            self._reporting += 1
+        self._report_finished(batch_job, all_done)
+    
+    def _check_all_done(self):
+        """在持有锁时调用：任务全部结束时停止调度并返回True"""
+        if any(not batch_job.finished for batch_job in self.jobs):
+            return False
+        self._started = False
+        return True
+    
+    def _report_finished(self, batch_job, all_done):
+        """执行任务结束的回调，回调全部执行完wait()才返回"""
+        try:
+            self.on_state(batch_job)
+            if all_done:
+                self.on_all_done()
+        finally:
+            with self._condition:
+                self._reporting -= 1
+                self._condition.notify_all()
+    
+    def cancel(self, batch_job):
+        """取消一个任务：等待中的任务直接标记为已取消，运行中的任务删除未完成的分卷"""
+        with self._condition:
+            if batch_job.state == PENDING:
+                batch_job.state = CANCELLED
+                batch_job.message = "任务已取消"
+                all_done = self._check_all_done()
+                self._reporting += 1
+            else:
+                batch_job.job.cancel()
+                return
+        self._report_finished(batch_job, all_done)
+    
+    def cancel_all(self):
+        for batch_job in list(self.jobs):
+            if not batch_job.finished:
+                self.cancel(batch_job)
+    
+    def pause_all(self):
+        for batch_job in self.jobs:
+            batch_job.job.pause()
+    
+    def resume_all(self):
+        for batch_job in self.jobs:
+            batch_job.job.resume()
+    
+    def remove_finished(self):
+        """从队列中移除已结束的任务"""
+        with self._condition:
+            self.jobs = [batch_job for batch_job in self.jobs if not batch_job.finished]
+    
+    def wait(self, timeout=None):
+        """等待队列中的任务全部结束，返回是否全部结束"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._reporting == 0 and all(batch_job.finished for batch_job in self.jobs), timeout
+            )
+    
+    def totals(self):
+        """返回(已处理字节数, 总字节数)，只统计已经开始的任务"""
+        processed = total = 0
+        for batch_job in self.jobs:
+            if batch_job.state != PENDING:
+                processed += batch_job.processed_bytes
+                total += batch_job.total_size
+        return processed, total
+    
+    def throughput(self):
+        """返回最近几秒所有任务合计的处理速度（字节/秒）"""
+        now = time.monotonic()
+        processed, _ = self.totals()
+        samples = self._samples
+        samples.append((now, processed))
+        while len(samples) > 2 and now - samples[0][0] > self.throughput_window:
+            samples.popleft()
+        first_time, first_processed = samples[0]
+        if now - first_time <= 0:
+            return 0.0
+        return max(0.0, (processed - first_processed) / (now - first_time))
+    
+    def average_throughput(self):
+        """返回已开始的任务从第一个开始到现在（或最后一个结束）的平均处理速度（字节/秒）"""
+        started = [batch_job for batch_job in self.jobs if batch_job.start_time is not None]
+        if not started:
+            return 0.0
+        first = min(batch_job.start_time for batch_job in started)
+        if all(batch_job.finished for batch_job in started):
+            last = max(batch_job.end_time or batch_job.start_time for batch_job in started)
+        else:
+            last = time.monotonic()
+        processed, _ = self.totals()
+        return processed / (last - first) if last > first else 0.0
@@ -0,0 +1,410 @@
+"""可重复的基准测试：生成本地合成语料，按分卷大小、压缩方式、密码和线程数组合运行压缩引擎
+
+语料（按固定的随机种子生成，同样的参数每次生成的内容完全相同，生成后缓存在语料目录中）：
+    text    可压缩的文本文件
+    random  不可压缩的随机数据
+    tiny    大量1-10KB的小文件
+    huge    一个大文件（文本块与随机块交替）
+    mixed   模拟的媒体文件夹：图片、视频、压缩包、文本和位图混在一起
+
+每个组合在单独的子进程中运行（python -m split_compression bench --run-case），
+这样峰值内存（peak RSS）和I/O计数器只统计这一次压缩。结果保存为JSON，
+用--compare可以与上次的结果逐项比较。界面中的CompressThread使用的就是这里测量的CompressJob。
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_VERSION = 1
+CORPUS_VERSION = 1
+CORPUS_SEED = 20240501
+CORPORA = ["text", "random", "tiny", "huge", "mixed"]
+
+# scale为1时各语料的大小
+CORPUS_SIZES = {
+    "text": 64 * 1024 * 1024,
+    "random": 64 * 1024 * 1024,
+    "huge": 512 * 1024 * 1024,
+    "mixed": 128 * 1024 * 1024,
+}
+DEFAULT_TINY_FILES = 20000
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# 模拟媒体文件夹中的文件：扩展名、大小范围、内容类型
+MIXED_KINDS = [
+    (".jpg", (200 * 1024, 4 * 1024 * 1024), "random"),
+    (".mp4", (5 * 1024 * 1024, 20 * 1024 * 1024), "random"),
+    (".zip", (1024 * 1024, 8 * 1024 * 1024), "random"),
+    (".txt", (10 * 1024, 2 * 1024 * 1024), "text"),
+    (".csv", (10 * 1024, 2 * 1024 * 1024), "text"),
+    (".log", (10 * 1024, 2 * 1024 * 1024), "text"),
+    (".bmp", (512 * 1024, 4 * 1024 * 1024), "pattern"),
+]
+# 已压缩格式的文件头，智能存储按扩展名判断，这里让内容也像一点
+MEDIA_HEADERS = {".jpg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00", ".mp4": b"\x00\x00\x00\x18ftypmp42", ".zip": b"PK\x03\x04"}
+
+class CorpusGenerator:
+    """按固定的随机种子生成各语料"""
+    
+    def __init__(self, seed=CORPUS_SEED):
+        self.rng = random.Random(seed)
+        vocabulary = [
+            "".join(self.rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(self.rng.randint(2, 10)))
+            for _ in range(2000)
+        ]
+        lines = []
+        size = 0
+        while size < 1024 * 1024:
+            line = " ".join(self.rng.choice(vocabulary) for _ in range(self.rng.randint(4, 16))) + "\n"
+            lines.append(line)
+            size += len(line)
+        self.lines = lines
+    
+    def text_block(self, size):
+        """返回一块文本：每次打乱同一页文本的行序，压缩率与普通文本接近"""
+        lines = self.lines[:]
+        self.rng.shuffle(lines)
+        data = "".join(lines).encode("ascii")
+        while len(data) < size:
+            data += data
+        return data[:size]
+    
+    def random_block(self, size):
+        return self.rng.randbytes(size)
+    
+    def pattern_block(self, size):
+        """位图一类的数据：渐变加少量噪声，压缩率很高"""
+        row = bytes(range(256)) * 4
+        noise = self.rng.randbytes(64)
+        data = (row + noise) * (size // (len(row) + len(noise)) + 1)
+        return data[:size]
+    
+    def block(self, kind, size):
+        return {"text": self.text_block, "random": self.random_block, "pattern": self.pattern_block}[kind](size)
+    
+    def write_file(self, path, size, kind, header=b""):
+        with open(path, "wb") as f:
+            f.write(header[:size])
+            remaining = size - min(size, len(header))
+            while remaining > 0:
+                chunk = self.block(kind, min(BLOCK_SIZE, remaining))
+                f.write(chunk)
+                remaining -= len(chunk)
+    
+    def generate(self, name, directory, scale=1.0, tiny_files=DEFAULT_TINY_FILES):
+        os.makedirs(directory, exist_ok=True)
+        if name in ("text", "random"):
+            # 16个文件
+            size = int(CORPUS_SIZES[name] * scale) // 16
+            for index in range(16):
+                self.write_file(os.path.join(directory, f"{name}{index:02d}.dat"), size, name)
+        elif name == "huge":
+            # 文本块与随机块按3:1交替
+            size = int(CORPUS_SIZES[name] * scale)
+            with open(os.path.join(directory, "huge.bin"), "wb") as f:
+                written = 0
+                while written < size:
+                    kind = "random" if (written // BLOCK_SIZE) % 4 == 3 else "text"
+                    chunk = self.block(kind, min(BLOCK_SIZE, size - written))
+                    f.write(chunk)
+                    written += len(chunk)
+        elif name == "tiny":
+            # 每个子文件夹1000个文件，70%为文本，30%为随机数据
+            text = self.text_block(1024 * 1024)
+            for index in range(tiny_files):
+                folder = os.path.join(directory, f"d{index // 1000:04d}")
+                if index % 1000 == 0:
+                    os.makedirs(folder, exist_ok=True)
+                size = self.rng.randint(1024, 10 * 1024)
+                if self.rng.random() < 0.7:
+                    start = self.rng.randrange(len(text) - size)
+                    data = text[start:start + size]
+                else:
+                    data = self.rng.randbytes(size)
+                with open(os.path.join(folder, f"f{index:07d}.txt"), "wb") as f:
+                    f.write(data)
+        elif name == "mixed":
+            total = int(CORPUS_SIZES[name] * scale)
+            written = index = 0
+            while written < total:
+                extension, (low, high), kind = self.rng.choice(MIXED_KINDS)
+                size = min(self.rng.randint(low, high), total - written)
+                folder = os.path.join(directory, ["照片", "视频", "文档", "其他"][index % 4])
+                os.makedirs(folder, exist_ok=True)
+                self.write_file(
+                    os.path.join(folder, f"file{index:04d}{extension}"), size, kind, MEDIA_HEADERS.get(extension, b"")
+                )
+                written += size
+                index += 1
+        else:
+            raise ValueError(f"未知的语料：{name}")
+
+def corpus_spec(name, scale, tiny_files):
+    spec = {"version": CORPUS_VERSION, "seed": CORPUS_SEED, "name": name}
+    if name == "tiny":
+        spec["files"] = tiny_files
+    else:
+        spec["scale"] = scale
+    return spec
+
+def directory_totals(directory):
+    """返回(文件数, 总字节数)"""
+    count = size = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            count += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return count, size
+
+def prepare_corpus(name, corpus_dir, scale=1.0, tiny_files=DEFAULT_TINY_FILES, log=None):
+    """生成（或复用已经生成的）语料，返回{"path", "files", "bytes"}"""
+    root = os.path.join(corpus_dir, name)
+    marker = os.path.join(corpus_dir, f"{name}.json")
+    spec = corpus_spec(name, scale, tiny_files)
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("spec") == spec and os.path.isdir(root):
+            return info
+    except (OSError, ValueError):
+        pass
+    
+    if log:
+        log(f"正在生成语料{name}...")
+    shutil.rmtree(root, ignore_errors=True)
+    start = time.perf_counter()
+    CorpusGenerator().generate(name, root, scale, tiny_files)
+    files, size = directory_totals(root)
+    info = {"spec": spec, "path": root, "files": files, "bytes": size, "seconds": time.perf_counter() - start}
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False)
+    return info
+
+def read_io_counters():
+    """本进程累计读写的字节数（包括从页缓存读写的部分），无法获取时返回None"""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    counters = psutil.Process().io_counters()
+    return counters.read_bytes, counters.write_bytes
+
+def peak_rss():
+    """本进程的峰值内存（字节），无法获取时返回None"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux以KB为单位，macOS以字节为单位
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", None) or info.rss
+
+def run_case(case):
+    """在当前进程中运行一个组合，返回测量结果（由子进程调用）"""
+    from .codecs import COMPRESSION_METHODS
+    from .engine import CompressJob
+    from .volumes import split_zip_file
+    
+    output_dir = tempfile.mkdtemp(prefix="bench-", dir=case.get("work_dir"))
+    try:
+        if case["operation"] == "split":
+            output_base = os.path.join(output_dir, "split")
+            io_before = read_io_counters()
+            start = time.perf_counter()
+            volumes = split_zip_file(case["source"], output_base, case["volume_size"])
+        else:
+            password = "benchmark" if case["password"] else None
+            job = CompressJob(
+                case["source"], output_dir, case["volume_size"], password,
+                workers=case["workers"], compression=COMPRESSION_METHODS[case["method"]][0],
+            )
+            io_before = read_io_counters()
+            start = time.perf_counter()
+            volumes = job.run()
+        wall_time = time.perf_counter() - start
+        io_after = read_io_counters()
+        volume_bytes = sum(os.path.getsize(volume) for volume in volumes)
+        output_bytes = directory_totals(output_dir)[1]
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    
+    source_bytes = case["source_bytes"]
+    result = {
+        "wall_time": wall_time,
+        "throughput_mb_s": source_bytes / wall_time / 1024 / 1024 if wall_time else None,
+        "files_per_s": case["source_files"] / wall_time if wall_time and case.get("source_files") else None,
+        "peak_rss": peak_rss(),
+        "volumes": len(volumes),
+        "volume_bytes": volume_bytes,
+        "output_bytes": output_bytes,
+        "ratio": volume_bytes / source_bytes if source_bytes else None,
+        "bytes_read": None,
+        "bytes_written": None,
+        "read_amplification": None,
+        "write_amplification": None,
+    }
+    if io_before and io_after:
+        result["bytes_read"] = io_after[0] - io_before[0]
+        result["bytes_written"] = io_after[1] - io_before[1]
+        result["read_amplification"] = result["bytes_read"] / source_bytes if source_bytes else None
+        result["write_amplification"] = result["bytes_written"] / output_bytes if output_bytes else None
+    return result
+
+def run_case_in_subprocess(case):
+    """在新的Python进程中运行一个组合，峰值内存和I/O计数只包含这一次运行"""
+    process = subprocess.run(
+        [sys.executable, "-m", "split_compression", "bench", "--run-case", json.dumps(case, ensure_ascii=False)],
+        capture_output=True, text=True, encoding="utf-8",
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if process.returncode != 0:
+        return {"error": (process.stderr.strip().splitlines() or ["子进程失败"])[-1]}
+    return json.loads(process.stdout)
+
+def case_key(case):
+    """用来在两次结果之间对应同一个组合"""
+    if case["operation"] == "split":
+        return f"{case['corpus']}/split/{case['volume_size']}"
+    return (
+        f"{case['corpus']}/compress/{case['method']}/{case['volume_size']}/"
+        f"{'aes' if case['password'] else 'plain'}/j{case['workers']}"
+    )
+
+def build_cases(corpora, volume_sizes, methods, passwords, workers_list, include_split=True):
+    """返回所有组合（不含语料路径）"""
+    cases = []
+    for corpus in corpora:
+        for volume_size in volume_sizes:
+            for method in methods:
+                for password in passwords:
+                    for workers in workers_list:
+                        cases.append({
+                            "corpus": corpus, "operation": "compress", "method": method,
+                            "volume_size": volume_size, "password": password, "workers": workers,
+                        })
+            if include_split:
+                cases.append({"corpus": corpus, "operation": "split", "volume_size": volume_size})
+    return cases
+
+def make_split_source(corpus, info, work_dir):
+    """分割测试用的单个ZIP文件（DEFLATE，不分卷），不计入测试时间"""
+    from .engine import CompressJob
+    
+    directory = os.path.join(work_dir or tempfile.gettempdir(), f"bench-split-{corpus}")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    volumes = CompressJob(
+        info["path"], directory, 1 << 62, checkpoint=False, index=False, checksum=None
+    ).run()
+    return volumes[0]
+
+def machine_info():
+    from importlib import metadata
+    
+    from . import __version__
+    
+    try:
+        pyzipper_version = metadata.version("pyzipper")
+    except metadata.PackageNotFoundError:
+        pyzipper_version = None
+    return {
+        "package": __version__,
+        "pyzipper": pyzipper_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run_benchmarks(cases, corpus_dir, work_dir=None, scale=1.0, tiny_files=DEFAULT_TINY_FILES,
+                   repeat=1, parity=True, log=None):
+    """运行所有组合，返回可以保存为JSON的结果"""
+    log = log or (lambda message: None)
+    # 子进程的工作目录不同，路径都改为绝对路径
+    corpus_dir = os.path.abspath(corpus_dir)
+    work_dir = os.path.abspath(work_dir) if work_dir else None
+    corpora = {}
+    for case in cases:
+        if case["corpus"] not in corpora:
+            corpora[case["corpus"]] = prepare_corpus(case["corpus"], corpus_dir, scale, tiny_files, log)
+    
+    split_sources = {}
+    results = []
+    try:
+        for number, case in enumerate(cases, 1):
+            info = corpora[case["corpus"]]
+            if case["operation"] == "split" and case["corpus"] not in split_sources:
+                split_sources[case["corpus"]] = make_split_source(case["corpus"], info, work_dir)
+            run = dict(case, work_dir=work_dir, source_bytes=info["bytes"], source_files=info["files"])
+            run["source"] = split_sources[case["corpus"]] if case["operation"] == "split" else info["path"]
+            if case["operation"] == "split":
+                run["source_bytes"] = os.path.getsize(run["source"])
+                run["source_files"] = None
+            
+            measurements = [run_case_in_subprocess(run) for _ in range(repeat)]
+            ok = [m for m in measurements if "error" not in m]
+            # 重复运行时保留最快的一次
+            best = min(ok, key=lambda m: m["wall_time"]) if ok else measurements[0]
+            record = dict(
+                case, key=case_key(case), source_bytes=run["source_bytes"], source_files=run["source_files"], **best
+            )
+            if len(ok) > 1:
+                record["wall_times"] = [m["wall_time"] for m in ok]
+            results.append(record)
+            if "error" in best:
+                log(f"[{number}/{len(cases)}] {record['key']} 失败：{best['error']}")
+            else:
+                message = f"[{number}/{len(cases)}] {record['key']} {best['throughput_mb_s']:.1f} MB/s"
+                if best.get("files_per_s"):
+                    message += f"，每秒{best['files_per_s']:.0f}个文件"
+                log(message)
+    finally:
+        for path in split_sources.values():
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    
+    report = {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "corpora": {name: {"files": info["files"], "bytes": info["bytes"]} for name, info in corpora.items()},
+        "results": results,
+    }
+    if parity:
+        from .parity import benchmark_parity, is_numpy_available
+        
+        if is_numpy_available():
+            log("正在测量恢复卷生成速度...")
+            report["parity"] = {count: benchmark_parity(parity_count=count, directory=work_dir) for count in (1, 2, 4)}
+    return report
+
+def compare_results(old, new):
+    """按组合比较两次结果，返回[(组合, 上次MB/s, 本次MB/s, 变化百分比), ...]"""
+    previous = {record["key"]: record for record in old.get("results", [])}
+    rows = []
+    for record in new.get("results", []):
+        before = previous.get(record["key"])
+        if not before or not before.get("throughput_mb_s") or not record.get("throughput_mb_s"):
+            continue
+        change = (record["throughput_mb_s"] / before["throughput_mb_s"] - 1) * 100
+        rows.append((record["key"], before["throughput_mb_s"], record["throughput_mb_s"], change))
+    return rows
@@ -0,0 +1,108 @@
+"""断点续压使用的任务日志"""
+
+import json
+import os
+
+def zipinfo_to_record(zinfo, mtime):
+    """把已完成条目的中央目录信息转换为可以写入日志的记录"""
+    aes = None
+    if getattr(zinfo, 'wz_aes_vendor_id', None) is not None:
+        aes = [zinfo.wz_aes_version, zinfo.wz_aes_vendor_id.decode('ascii'), zinfo.wz_aes_strength]
+    return {
+        "name": zinfo.filename,
+        "mtime": mtime,
+        "time": list(zinfo.date_time),
+        "offset": zinfo.header_offset,
+        "method": zinfo.compress_type,
+        "flags": zinfo.flag_bits,
+        "crc": zinfo.CRC,
+        "csize": zinfo.compress_size,
+        "size": zinfo.file_size,
+        "attr": zinfo.external_attr,
+        "version": [zinfo.create_version, zinfo.extract_version],
+        "aes": aes,
+    }
+
+def zipinfo_from_record(zipinfo_cls, record):
+    """根据日志记录重建条目信息，恢复后由pyzipper照常写入中央目录"""
+    zinfo = zipinfo_cls(record["name"], tuple(record["time"]))
+    zinfo.header_offset = record["offset"]
+    zinfo.compress_type = record["method"]
+    zinfo.flag_bits = record["flags"]
+    zinfo.CRC = record["crc"]
+    zinfo.compress_size = record["csize"]
+    zinfo.file_size = record["size"]
+    zinfo.external_attr = record["attr"]
+    zinfo.create_version, zinfo.extract_version = record["version"]
+    if record["aes"]:
+        zinfo.wz_aes_version = record["aes"][0]
+        zinfo.wz_aes_vendor_id = record["aes"][1].encode('ascii')
+        zinfo.wz_aes_strength = record["aes"][2]
+    return zinfo
+
+class JobJournal:
+    """压缩任务的检查点日志，保存在分卷旁边
+    
+    JSON Lines格式，只追加写入：第一行是任务信息，之后每个检查点一行，
+    记录新完成的条目和此时分卷数据流的写入位置（最后一个完成条目的结束位置）。
+    每次追加前先把分卷数据同步到磁盘，因此日志中的内容一定已经完整写出；
+    进程被强制结束时最后一行可能不完整，读取时忽略即可。
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    def load(self, header):
+        """读取与header匹配的日志，返回(写入位置, 已完成条目的记录列表)，没有可用的检查点时返回None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except (OSError, ValueError):
+            return None
+        try:
+            if not lines or json.loads(lines[0]) != header:
+                return None
+        except ValueError:
+            return None
+        offset = 0
+        records = []
+        for line in lines[1:]:
+            try:
+                checkpoint = json.loads(line)
+            except ValueError:
+                break
+            offset = checkpoint["offset"]
+            records.extend(checkpoint["entries"])
+        return offset, records
+    
+    def start(self, header, offset=0, records=()):
+        """新建日志（恢复时把已完成的条目合并为一个检查点），替换旧日志"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            if records:
+                f.write(json.dumps({"offset": offset, "entries": list(records)}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def append(self, offset, records):
+        """追加一个检查点"""
+        self._file.write(json.dumps({"offset": offset, "entries": records}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def remove(self):
+        """任务完成后删除日志"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,115 @@
+"""分卷校验和：写入分卷时同步计算，保存为分卷旁边的校验文件，校验时多个线程同时重新计算
+
+校验文件（源文件名.checksums）使用BSD格式，每行一个分卷，例如：
+    BLAKE2b (项目.z01) = 1f2e...
+可以直接用b2sum -c、sha256sum -c或xxhsum -c在其他电脑上检查。
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# 校验算法：名称 -> 校验文件中的标签
+CHECKSUM_ALGORITHMS = {
+    "blake2b": "BLAKE2b",
+    "sha256": "SHA256",
+    "xxh128": "XXH128",
+}
+
+# 校验结果
+VOLUME_OK = "正常"
+VOLUME_CORRUPT = "损坏"
+VOLUME_MISSING = "缺失"
+
+def is_xxhash_available():
+    """是否安装了xxhash模块（xxh128比BLAKE2快得多，为可选功能），只查找不导入"""
+    return importlib.util.find_spec("xxhash") is not None
+
+def default_checksum():
+    """默认的校验算法：安装了xxhash时使用xxh128，否则使用BLAKE2b"""
+    return "xxh128" if is_xxhash_available() else "blake2b"
+
+def new_hasher(algorithm):
+    """返回一个新的哈希对象（提供update/hexdigest方法）"""
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValueError(f"不支持的校验算法：{algorithm}")
+    if algorithm == "xxh128":
+        try:
+            import xxhash
+        except ImportError:
+            raise RuntimeError("使用xxh128校验需要安装xxhash模块：pip install xxhash")
+        return xxhash.xxh3_128()
+    return hashlib.new(algorithm)
+
+def hash_file(path, algorithm, buffer_size=1024 * 1024, check_state=None):
+    """计算整个文件的校验和"""
+    hasher = new_hasher(algorithm)
+    with open(path, 'rb') as f:
+        while True:
+            if check_state:
+                check_state()
+            data = f.read(buffer_size)
+            if not data:
+                break
+            hasher.update(data)
+    return hasher.hexdigest()
+
+def checksum_path(output_base):
+    """校验文件保存在分卷旁边"""
+    return f"{output_base}.checksums"
+
+def write_checksums(output_base, algorithm, volumes, digests):
+    """把各分卷的校验和写入校验文件，返回校验文件路径"""
+    tag = CHECKSUM_ALGORITHMS[algorithm]
+    path = checksum_path(output_base)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+        for volume, digest in zip(volumes, digests):
+            f.write(f"{tag} ({os.path.basename(volume)}) = {digest}\n")
+    os.replace(temp_path, path)
+    return path
+
+_CHECKSUM_LINE = re.compile(r"^(\w+) \((.+)\) = ([0-9a-fA-F]+)$")
+
+def read_checksums(path):
+    """读取校验文件，返回(校验算法, [(分卷文件名, 校验和), ...])"""
+    tags = {tag: algorithm for algorithm, tag in CHECKSUM_ALGORITHMS.items()}
+    algorithm = None
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            match = _CHECKSUM_LINE.match(line)
+            if not match or match.group(1) not in tags:
+                raise ValueError(f"无法识别的校验文件内容：{line}")
+            if algorithm not in (None, tags[match.group(1)]):
+                raise ValueError("校验文件中混用了不同的校验算法")
+            algorithm = tags[match.group(1)]
+            records.append((match.group(2), match.group(3).lower()))
+    if algorithm is None:
+        raise ValueError(f"校验文件为空：{path}")
+    return algorithm, records
+
+def verify_volumes(output_base, workers=None, check_state=None):
+    """按校验文件重新计算各分卷的校验和，返回[(分卷路径, 结果), ...]
+    
+    各分卷由多个线程同时读取（hashlib计算时会释放GIL）。没有校验文件时抛出FileNotFoundError。
+    """
+    algorithm, records = read_checksums(checksum_path(output_base))
+    directory = os.path.dirname(output_base)
+    
+    def check(record):
+        name, expected = record
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            return path, VOLUME_MISSING
+        digest = hash_file(path, algorithm, check_state=check_state)
+        return path, VOLUME_OK if digest == expected else VOLUME_CORRUPT
+    
+    workers = workers or min(len(records), os.cpu_count() or 1, 8)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(check, records))
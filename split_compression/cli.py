@@ -0,0 +1,562 @@
+"""命令行入口：python -m split_compression compress/split ...
+
+只在真正执行命令时才导入压缩引擎（pyzipper等），--help和--version不加载任何依赖，
+也不会导入PyQt5和requests。使用--timings可以查看导入和启动耗时。
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+_MODULE_START = time.perf_counter()
+
+# 与codecs.COMPRESSION_METHODS / COMPRESSION_PRESETS一致，这里单独列出是为了--help不需要导入引擎
+METHOD_CHOICES = ["DEFLATE", "LZMA", "BZIP2", "ZSTD"]
+PRESET_ALIASES = {
+    "最快": "最快", "fastest": "最快",
+    "均衡": "均衡", "balanced": "均衡",
+    "最小": "最小", "smallest": "最小",
+}
+
+# 与checksums.CHECKSUM_ALGORITHMS一致
+CHECKSUM_CHOICES = ["auto", "blake2b", "sha256", "xxh128", "none"]
+
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+def parse_size(text):
+    """解析分卷或缓冲区大小，例如 100M、1.5G、65536"""
+    value = text.strip().upper().rstrip("B")
+    multiplier = 1
+    if value and value[-1] in SIZE_UNITS:
+        multiplier = SIZE_UNITS[value[-1]]
+        value = value[:-1]
+    try:
+        size = int(float(value) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的大小：{text}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"大小必须大于0：{text}")
+    return size
+
+def add_compression_options(parser):
+    """compress和batch共用的压缩选项"""
+    parser.add_argument("-s", "--volume-size", type=parse_size, default="100M", help="分卷大小（默认100M）")
+    parser.add_argument("-p", "--password", help="密码（AES-256加密）")
+    parser.add_argument("--password-env", metavar="变量名", help="从环境变量读取密码，避免密码出现在进程列表中")
+    parser.add_argument("-m", "--method", choices=METHOD_CHOICES, help="压缩方式（默认DEFLATE）")
+    parser.add_argument("-l", "--level", type=int, help="压缩级别（默认使用压缩方式的默认级别）")
+    parser.add_argument("--preset", choices=sorted(PRESET_ALIASES), help="压缩预设，会覆盖--method和--level")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="压缩线程数（默认1）")
+    parser.add_argument("--no-auto-store", action="store_true", help="不自动跳过已压缩的文件")
+    parser.add_argument("--incremental", action="store_true", help="复用上次压缩包中未变化的文件")
+    parser.add_argument("--verify-content", action="store_true", help="增量压缩时比较CRC32确认内容是否变化")
+    parser.add_argument("--no-checkpoint", action="store_true", help="不记录检查点（中断后不能继续）")
+    parser.add_argument("--checksum", choices=CHECKSUM_CHOICES, default="auto",
+                        help="写入分卷时计算的校验和（默认auto：有xxhash时用xxh128，否则用blake2b；none不计算）")
+    parser.add_argument("--parity", type=int, default=0, metavar="N",
+                        help="同时生成N个恢复卷，最多可以修复N个丢失或损坏的分卷（需要numpy）")
+    parser.add_argument("--read-buffer", type=parse_size, default="1M", metavar="大小",
+                        help="每次从源文件读取并送入压缩器的数据块大小（默认1M，高速SSD或网络存储可以调大）")
+    parser.add_argument("--write-buffer", type=parse_size, default="1M", metavar="大小",
+                        help="分卷文件的写缓冲区大小（默认1M）")
+    parser.add_argument("--mmap-threshold", type=parse_size, metavar="大小",
+                        help="不小于该大小的源文件使用内存映射读取（默认不使用）")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="不通知系统丢弃读过的源文件和写完的分卷的页缓存（仅Linux等支持posix_fadvise的系统）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不显示进度")
+
+def comma_list(text):
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+def build_parser():
+    from . import __version__
+    
+    parser = argparse.ArgumentParser(
+        prog="python -m split_compression",
+        description="分卷压缩工具（命令行版本）",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--timings", action="store_true", help="在结束时输出导入和启动耗时")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    compress = subparsers.add_parser("compress", help="把文件或文件夹压缩为分卷ZIP")
+    compress.add_argument("source", help="要压缩的文件或文件夹")
+    compress.add_argument("output_dir", help="输出目录")
+    add_compression_options(compress)
+    compress.add_argument("--no-index", action="store_true", help="不在分卷旁边写出索引文件")
+    compress.add_argument("--stats", action="store_true", help="结束时输出各阶段耗时、平均速度等统计")
+    compress.add_argument("--stats-log", metavar="文件",
+                          help="压缩过程中每秒把统计快照追加到JSON Lines文件（隐含--stats）")
+    
+    batch = subparsers.add_parser("batch", help="按任务列表批量压缩，多个任务同时运行")
+    batch.add_argument("job_list", help="任务列表文件：每行一个源路径，可用制表符分隔再指定输出目录")
+    batch.add_argument("output_dir", help="未指定输出目录的任务使用的输出目录")
+    batch.add_argument("--cpu-limit", type=int, help="所有任务合计的压缩线程数上限（默认CPU核数）")
+    batch.add_argument("--io-limit", type=int, default=1, help="每个输出设备上同时运行的任务数（默认1）")
+    add_compression_options(batch)
+    
+    extract = subparsers.add_parser("extract", help="直接从分卷中解压，不需要先合并分卷")
+    extract.add_argument("archive", help="任意一个分卷（.zip或.z01等）")
+    extract.add_argument("output_dir", help="输出目录")
+    extract.add_argument("-f", "--member", dest="members", action="append", metavar="名称",
+                         help="只解压这个文件或文件夹（压缩包内的路径，可以多次指定）")
+    extract.add_argument("-p", "--password", help="密码")
+    extract.add_argument("-j", "--workers", type=int, help="解压线程数（默认CPU核数，最多8）")
+    extract.add_argument("--password-env", metavar="变量名", help="从环境变量读取密码，避免密码出现在进程列表中")
+    extract.add_argument("-q", "--quiet", action="store_true", help="不显示进度")
+    
+    verify = subparsers.add_parser("verify", help="检查各分卷的校验和，并测试每个条目的CRC，不写出任何文件")
+    verify.add_argument("archive", help="任意一个分卷（.zip或.z01等）")
+    verify.add_argument("-p", "--password", help="密码")
+    verify.add_argument("--password-env", metavar="变量名", help="从环境变量读取密码，避免密码出现在进程列表中")
+    verify.add_argument("-j", "--workers", type=int, help="校验线程数（默认CPU核数，最多8）")
+    verify.add_argument("-q", "--quiet", action="store_true", help="不显示进度")
+    
+    repair = subparsers.add_parser("repair", help="用恢复卷修复丢失或损坏的分卷")
+    repair.add_argument("archive", help="任意一个分卷（.zip或.z01等）")
+    repair.add_argument("-j", "--workers", type=int, help="检查分卷时的线程数（默认CPU核数，最多8）")
+    
+    list_parser = subparsers.add_parser("list", help="列出或搜索分卷压缩包中的文件，只读取中央目录")
+    list_parser.add_argument("archive", help="任意一个分卷（.zip或.z01等）")
+    list_parser.add_argument("pattern", nargs="?", help="搜索：包含*?[时按通配符匹配，否则按名称中的文字匹配")
+    list_parser.add_argument("--no-index", action="store_true", help="忽略索引文件，直接读取中央目录")
+    list_parser.add_argument("--save-index", action="store_true", help="为这组分卷写出索引文件")
+    
+    bench = subparsers.add_parser("bench", help="生成合成语料并测量各种设置下的压缩速度，结果保存为JSON")
+    bench.add_argument("-o", "--output", default="benchmark.json", help="结果文件（默认benchmark.json）")
+    bench.add_argument("--corpus-dir", default=os.path.join(".benchmark", "corpus"),
+                       help="语料目录，生成后会被复用（默认.benchmark/corpus）")
+    bench.add_argument("--work-dir", help="压缩输出的临时目录（默认系统临时目录）")
+    bench.add_argument("--corpora", type=comma_list, default="text,random,tiny,huge,mixed",
+                       help="要测试的语料，逗号分隔：text,random,tiny,huge,mixed")
+    bench.add_argument("--scale", type=float, default=1.0, help="语料大小的倍数（默认1：文本和随机数据各64MB，大文件512MB）")
+    bench.add_argument("--tiny-files", type=int, default=20000, help="小文件语料的文件数（默认20000）")
+    bench.add_argument("--volume-sizes", type=comma_list, default="16M,256M", help="分卷大小，逗号分隔")
+    bench.add_argument("--methods", type=comma_list, default="DEFLATE,ZSTD", help="压缩方式，逗号分隔")
+    bench.add_argument("--password", choices=["no", "yes", "both"], default="both", help="是否加密（默认两种都测）")
+    bench.add_argument("--workers", type=comma_list, help="线程数，逗号分隔（默认1和CPU核数）")
+    bench.add_argument("--repeat", type=int, default=1, help="每个组合运行的次数，保留最快的一次")
+    bench.add_argument("--no-split", action="store_true", help="不测试分割已有的ZIP文件")
+    bench.add_argument("--no-parity", action="store_true", help="不测量恢复卷的生成速度")
+    bench.add_argument("--compare", metavar="上次的结果.json", help="与上次的结果逐项比较")
+    bench.add_argument("--run-case", help=argparse.SUPPRESS)
+    
+    split = subparsers.add_parser("split", help="把已有的ZIP文件分割为标准分卷")
+    split.add_argument("zip_path", help="要分割的ZIP文件")
+    split.add_argument("output_dir", nargs="?", help="输出目录（默认与ZIP文件相同）")
+    split.add_argument("-s", "--volume-size", type=parse_size, default="100M", help="分卷大小（默认100M）")
+    split.add_argument("--stats", action="store_true", help="结束时输出分割耗时和速度")
+    split.add_argument("-q", "--quiet", action="store_true", help="不显示进度")
+    return parser
+
+class ConsoleProgress:
+    """在标准错误输出的同一行显示进度"""
+    
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.current_file = ""
+    
+    def set_file(self, name):
+        self.current_file = name
+    
+    def update(self, percent):
+        if self.quiet:
+            return
+        name = self.current_file
+        if len(name) > 50:
+            name = "..." + name[-47:]
+        sys.stderr.write(f"\r{percent:6.1f}%  {name:<50}")
+        sys.stderr.flush()
+    
+    def done(self):
+        if not self.quiet:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+def read_password(args):
+    """返回命令行指定的密码；--password-env指定的环境变量为空时返回False"""
+    if args.password_env:
+        password = os.environ.get(args.password_env)
+        if not password:
+            print(f"环境变量{args.password_env}为空", file=sys.stderr)
+            return False
+        return password
+    return args.password
+
+def compression_options(args):
+    """根据命令行参数返回(密码, CompressJob的其他参数)，参数无效时返回None并输出原因"""
+    from .codecs import COMPRESSION_METHODS, COMPRESSION_PRESETS
+    
+    password = read_password(args)
+    if password is False:
+        return None
+    
+    method, level = args.method or "DEFLATE", args.level
+    if args.preset:
+        method, level = COMPRESSION_PRESETS[PRESET_ALIASES[args.preset]]
+    compression, (low, high), _ = COMPRESSION_METHODS[method]
+    if level is not None and not low <= level <= high:
+        print(f"{method}的压缩级别范围为{low}-{high}", file=sys.stderr)
+        return None
+    
+    return password, {
+        "workers": args.workers,
+        "auto_store": not args.no_auto_store,
+        "compression": compression,
+        "compresslevel": level,
+        "incremental": args.incremental,
+        "verify_content": args.verify_content,
+        "checkpoint": not args.no_checkpoint,
+        "checksum": None if args.checksum == "none" else args.checksum,
+        "parity": args.parity,
+        "buffer_size": args.read_buffer,
+        "write_buffer": args.write_buffer,
+        "mmap_threshold": args.mmap_threshold or 0,
+        "drop_cache": not args.keep_cache,
+    }
+
+def run_compress(args, timings):
+    start = time.perf_counter()
+    from .engine import CompressCancelled, CompressJob
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    
+    options = compression_options(args)
+    if options is None:
+        return 2
+    password, options = options
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    console = ConsoleProgress(args.quiet)
+    callbacks = {"progress": console.update, "current_file": console.set_file}
+    stats_log = None
+    if args.stats_log:
+        from .stats import StatsLog
+        try:
+            stats_log = StatsLog(args.stats_log)
+        except OSError as e:
+            print(f"无法打开统计日志：{e}", file=sys.stderr)
+            return 2
+        callbacks["stats"] = stats_log
+    job = CompressJob(
+        args.source, args.output_dir, args.volume_size, password,
+        index=not args.no_index, stats=args.stats,
+        callbacks=callbacks,
+        **options
+    )
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    # 在工作线程中压缩，主线程收到Ctrl+C时请求取消，由引擎删除未完成的分卷
+    try:
+        volumes, error = run_in_worker(job, console)
+    finally:
+        if stats_log is not None:
+            stats_log.close()
+    if isinstance(error, CompressCancelled):
+        print("压缩已取消，未完成的分卷已删除", file=sys.stderr)
+        return 130
+    if error is not None:
+        message = f"压缩失败：{error}"
+        if job.failure_note:
+            message += f"\n{job.failure_note}"
+        print(message, file=sys.stderr)
+        return 1
+    print(job.format_summary(volumes))
+    return 0
+
+def run_batch(args, timings):
+    start = time.perf_counter()
+    from .batch import CANCELLED, DONE, RUNNING, JobScheduler, load_job_list
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    
+    options = compression_options(args)
+    if options is None:
+        return 2
+    password, options = options
+    try:
+        job_list = load_job_list(args.job_list)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"无法读取任务列表：{e}", file=sys.stderr)
+        return 2
+    if not job_list:
+        print("任务列表为空", file=sys.stderr)
+        return 2
+    
+    def on_state(batch_job):
+        if batch_job.finished:
+            print(f"[{batch_job.job_id}/{len(job_list)}] {batch_job.state}：{batch_job.source_path}", file=sys.stderr)
+            if batch_job.state != DONE and not args.quiet:
+                print(batch_job.message, file=sys.stderr)
+    
+    scheduler = JobScheduler(args.cpu_limit, args.io_limit, callbacks={"state": on_state})
+    try:
+        for source, output_dir in job_list:
+            output_dir = output_dir or args.output_dir
+            os.makedirs(output_dir, exist_ok=True)
+            scheduler.add(source, output_dir, args.volume_size, password, **options)
+    except (OSError, ValueError) as e:
+        print(f"无法创建任务：{e}", file=sys.stderr)
+        return 2
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    scheduler.start()
+    last_report = 0.0
+    try:
+        while not scheduler.wait(0.5):
+            now = time.monotonic()
+            if not args.quiet and now - last_report >= 1.0:
+                last_report = now
+                processed, total = scheduler.totals()
+                running = sum(1 for batch_job in scheduler.jobs if batch_job.state == RUNNING)
+                sys.stderr.write(
+                    f"\r运行中{running}个任务  {processed / 1024 / 1024:.1f}/{total / 1024 / 1024:.1f} MB  "
+                    f"{scheduler.throughput() / 1024 / 1024:.1f} MB/s   "
+                )
+                sys.stderr.flush()
+    except KeyboardInterrupt:
+        scheduler.cancel_all()
+        scheduler.wait()
+    if not args.quiet:
+        sys.stderr.write("\n")
+    
+    states = [batch_job.state for batch_job in scheduler.jobs]
+    done = states.count(DONE)
+    print(f"批量压缩结束：完成{done}个，失败{len(states) - done - states.count(CANCELLED)}个，取消{states.count(CANCELLED)}个")
+    if done == len(states):
+        return 0
+    return 130 if CANCELLED in states else 1
+
+def run_in_worker(job, console):
+    """在工作线程中运行任务，主线程收到Ctrl+C时请求取消；返回(结果, 异常)"""
+    result = {}
+    
+    def work():
+        try:
+            result["value"] = job.run()
+        except BaseException as e:
+            result["error"] = e
+    
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.2)
+    except KeyboardInterrupt:
+        job.cancel()
+        worker.join()
+    console.done()
+    return result.get("value"), result.get("error")
+
+def run_extract(args, timings):
+    start = time.perf_counter()
+    from .engine import CompressCancelled
+    from .extract import ExtractJob
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    
+    password = read_password(args)
+    if password is False:
+        return 2
+    console = ConsoleProgress(args.quiet)
+    job = ExtractJob(
+        args.archive, args.output_dir, password, args.members, args.workers,
+        callbacks={"progress": console.update, "current_file": console.set_file},
+    )
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    count, error = run_in_worker(job, console)
+    if isinstance(error, CompressCancelled):
+        print("解压已取消，正在写入的文件已删除", file=sys.stderr)
+        return 130
+    if isinstance(error, KeyError):
+        print(f"解压失败：{error.args[0]}", file=sys.stderr)
+        return 1
+    if error is not None:
+        print(f"解压失败：{error}", file=sys.stderr)
+        return 1
+    print(f"解压完成！共{count}个文件，输出位置：{args.output_dir}")
+    return 0
+
+def run_verify(args, timings):
+    start = time.perf_counter()
+    from .engine import CompressCancelled
+    from .parity import parity_manifest_path
+    from .verify import VerifyJob
+    from .volumes import volume_base
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    
+    password = read_password(args)
+    if password is False:
+        return 2
+    console = ConsoleProgress(args.quiet)
+    job = VerifyJob(
+        args.archive, password, args.workers,
+        callbacks={"progress": console.update, "current_file": console.set_file},
+    )
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    report, error = run_in_worker(job, console)
+    if isinstance(error, CompressCancelled):
+        print("校验已取消", file=sys.stderr)
+        return 130
+    if error is not None:
+        print(f"校验失败：{error}", file=sys.stderr)
+        return 1
+    print(report.format_summary())
+    if not report.ok and os.path.exists(parity_manifest_path(volume_base(args.archive))):
+        print("这组分卷有恢复卷，可以用repair命令修复", file=sys.stderr)
+    return 0 if report.ok else 1
+
+def run_repair(args, timings):
+    start = time.perf_counter()
+    from .parity import repair_volumes
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    try:
+        repaired = repair_volumes(args.archive, args.workers)
+    except FileNotFoundError as e:
+        print(f"修复失败：没有找到恢复卷清单（{e.filename}）", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"修复失败：{e}", file=sys.stderr)
+        return 1
+    if not repaired:
+        print("所有分卷和恢复卷都完好，不需要修复")
+    for path in repaired:
+        print(f"已修复：{path}")
+    return 0
+
+def format_size(size):
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+def run_list(args, timings):
+    start = time.perf_counter()
+    from pyzipper import BadZipFile
+    from .index import list_archive, search_entries, write_index
+    from .volumes import find_volume_set
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    
+    try:
+        if args.save_index:
+            print(f"已写出索引：{write_index(find_volume_set(args.archive))}", file=sys.stderr)
+        entries = list_archive(args.archive, use_index=not args.no_index)
+    except (OSError, ValueError, BadZipFile) as e:
+        print(f"读取失败：{e}", file=sys.stderr)
+        return 1
+    if args.pattern:
+        entries = search_entries(entries, args.pattern)
+    
+    total_size = total_csize = 0
+    for zinfo in entries:
+        year, month, day, hour, minute, _ = zinfo.date_time
+        print(
+            f"{format_size(zinfo.file_size):>8} {format_size(zinfo.compress_size):>8}  "
+            f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}  "
+            f"{zinfo.volume_index + 1:>4}  {zinfo.filename}"
+        )
+        total_size += zinfo.file_size
+        total_csize += zinfo.compress_size
+    print(f"共{len(entries)}个条目，{format_size(total_size)}，压缩后{format_size(total_csize)}", file=sys.stderr)
+    return 0
+
+def run_bench(args, timings):
+    import json
+    
+    from . import benchmark
+    
+    if args.run_case:
+        # 子进程：只运行一个组合，把结果输出到标准输出
+        print(json.dumps(benchmark.run_case(json.loads(args.run_case))))
+        return 0
+    
+    from .codecs import COMPRESSION_METHODS, is_zstd_available
+    
+    unknown = [name for name in args.corpora if name not in benchmark.CORPORA]
+    if unknown:
+        print(f"未知的语料：{'、'.join(unknown)}", file=sys.stderr)
+        return 2
+    methods = [method.upper() for method in args.methods]
+    if "ZSTD" in methods and not is_zstd_available():
+        print("没有安装zstandard模块，跳过ZSTD", file=sys.stderr)
+        methods.remove("ZSTD")
+    unknown = [method for method in methods if method not in COMPRESSION_METHODS]
+    if unknown:
+        print(f"未知的压缩方式：{'、'.join(unknown)}", file=sys.stderr)
+        return 2
+    try:
+        volume_sizes = [parse_size(size) for size in args.volume_sizes]
+        workers_list = [int(count) for count in args.workers] if args.workers else sorted({1, os.cpu_count() or 1})
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        print(f"参数无效：{e}", file=sys.stderr)
+        return 2
+    passwords = {"no": [False], "yes": [True], "both": [False, True]}[args.password]
+    
+    cases = benchmark.build_cases(
+        args.corpora, volume_sizes, methods, passwords, workers_list, include_split=not args.no_split
+    )
+    os.makedirs(args.corpus_dir, exist_ok=True)
+    report = benchmark.run_benchmarks(
+        cases, args.corpus_dir, args.work_dir, args.scale, args.tiny_files, max(1, args.repeat),
+        parity=not args.no_parity, log=lambda message: print(message, file=sys.stderr),
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到{args.output}")
+    
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        for key, before, after, change in benchmark.compare_results(previous, report):
+            print(f"{change:+7.1f}%  {before:8.1f} → {after:8.1f} MB/s  {key}")
+    return 0
+
+def run_split(args, timings):
+    start = time.perf_counter()
+    from .volumes import split_zip_file
+    timings["导入压缩引擎"] = time.perf_counter() - start
+    
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.zip_path))
+    os.makedirs(output_dir, exist_ok=True)
+    output_base = os.path.join(output_dir, os.path.splitext(os.path.basename(args.zip_path))[0])
+    console = ConsoleProgress(args.quiet)
+    stats = None
+    if args.stats:
+        from .stats import JobStats
+        stats = JobStats()
+    timings["启动"] = time.perf_counter() - _MODULE_START
+    try:
+        volumes = split_zip_file(
+            args.zip_path, output_base, args.volume_size,
+            lambda done, total: console.update(done / total * 100.0 if total else 100.0),
+            stats=stats
+        )
+    except (OSError, ValueError) as e:
+        console.done()
+        print(f"分割失败：{e}", file=sys.stderr)
+        return 1
+    console.done()
+    print(f"分割完成！共{len(volumes)}个分卷，输出位置：{output_base}.*")
+    if stats is not None:
+        from .stats import format_snapshot
+        print(format_snapshot(stats.snapshot(done=True)))
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    timings = {}
+    commands = {
+        "compress": run_compress, "batch": run_batch, "extract": run_extract, "verify": run_verify,
+        "repair": run_repair, "list": run_list, "bench": run_bench, "split": run_split,
+    }
+    try:
+        return commands[args.command](args, timings)
+    finally:
+        if args.timings:
+            timings["总耗时"] = time.perf_counter() - _MODULE_START
+            print("；".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()), file=sys.stderr)
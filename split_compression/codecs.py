@@ -0,0 +1,174 @@
+"""压缩方式、级别和自动存储的判断
+
+本模块不在导入时加载pyzipper（界面启动时只需要下面的压缩方式列表），
+需要pyzipper自带的压缩器时才导入。
+"""
+
+import importlib.util
+import os
+import lzma
+import struct
+import zlib
+
+# ZIP规范（APPNOTE）中的压缩方式编号，与ZIP_STORED等常量相同
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP_BZIP2 = 12
+ZIP_LZMA = 14
+ZIP_ZSTANDARD = 93  # APPNOTE 6.3.7中Zstandard的压缩方式编号
+
+# 可选的压缩方式：名称 -> (压缩方式编号, 级别范围, 默认级别)
+COMPRESSION_METHODS = {
+    "DEFLATE": (ZIP_DEFLATED, (1, 9), 6),
+    "LZMA": (ZIP_LZMA, (0, 9), 6),
+    "BZIP2": (ZIP_BZIP2, (1, 9), 9),
+    "ZSTD": (ZIP_ZSTANDARD, (1, 22), 3),
+}
+
+# 压缩预设：名称 -> (压缩方式名称, 级别)
+COMPRESSION_PRESETS = {
+    "最快": ("DEFLATE", 1),
+    "均衡": ("DEFLATE", 6),
+    "最小": ("LZMA", 9),
+}
+
+def is_zstd_available():
+    """是否安装了zstandard模块（Zstandard压缩为可选功能），只查找不导入"""
+    return importlib.util.find_spec("zstandard") is not None
+
+class LZMALevelCompressor:
+    """支持压缩级别的ZIP LZMA压缩器（pyzipper自带的实现会忽略压缩级别）"""
+    # ZIP中LZMA数据开头记录的LZMA SDK版本号（与pyzipper相同）
+    LZMA_SDK_MAJOR_VERSION = 9
+    LZMA_SDK_MINOR_VERSION = 4
+    
+    def __init__(self, level=None):
+        self.level = level
+        self._comp = None
+    
+    def _init(self):
+        filter_spec = {'id': lzma.FILTER_LZMA1}
+        if self.level is not None:
+            filter_spec['preset'] = self.level
+        props = lzma._encode_filter_properties(filter_spec)
+        self._comp = lzma.LZMACompressor(lzma.FORMAT_RAW, filters=[filter_spec])
+        # ZIP中的LZMA数据以LZMA SDK版本号和属性长度开头
+        header = struct.pack(
+            '<BBH',
+            self.LZMA_SDK_MAJOR_VERSION,
+            self.LZMA_SDK_MINOR_VERSION,
+            len(props)
+        ) + props
+        return header
+    
+    def compress(self, data):
+        if self._comp is None:
+            return self._init() + self._comp.compress(data)
+        return self._comp.compress(data)
+    
+    def flush(self):
+        if self._comp is None:
+            return self._init() + self._comp.flush()
+        return self._comp.flush()
+
+def get_compressor(compress_type, compresslevel=None):
+    """返回指定压缩方式的压缩器（提供compress/flush方法），ZIP_STORED返回None"""
+    if compress_type == ZIP_LZMA:
+        return LZMALevelCompressor(compresslevel)
+    if compress_type == ZIP_ZSTANDARD:
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("使用Zstandard压缩需要安装zstandard模块：pip install zstandard")
+        level = compresslevel if compresslevel is not None else 3
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    import pyzipper
+    return pyzipper.zipfile._get_compressor(compress_type, compresslevel)
+
+def get_decompressor(compress_type):
+    """返回Zstandard条目的解压器（提供decompress方法和eof属性），其他压缩方式由pyzipper处理"""
+    if compress_type == ZIP_ZSTANDARD:
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("解压Zstandard条目需要安装zstandard模块：pip install zstandard")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+def set_entry_compression(zinfo, compression, compresslevel):
+    """设置条目的压缩方式和级别"""
+    zinfo.compress_type = compression
+    zinfo._compresslevel = compresslevel
+    if compression == ZIP_ZSTANDARD:
+        # Zstandard需要6.3版本的解压程序
+        zinfo.extract_version = max(zinfo.extract_version, 63)
+        zinfo.create_version = max(zinfo.create_version, 63)
+
+# 通常已经压缩过的文件类型（图片、音视频、压缩包、Office文档等）
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp3', '.aac', '.m4a', '.ogg', '.opus', '.flac', '.wma',
+    '.mp4', '.m4v', '.mkv', '.mov', '.avi', '.webm', '.wmv', '.flv',
+    '.zip', '.7z', '.rar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.lz4', '.cab',
+    '.jar', '.apk', '.docx', '.xlsx', '.pptx', '.odt', '.epub',
+}
+
+# 已压缩/已加密数据常见的文件头（偏移, 魔数）
+INCOMPRESSIBLE_MAGIC = [
+    (0, b'\xff\xd8\xff'),            # JPEG
+    (0, b'\x89PNG\r\n\x1a\n'),       # PNG
+    (0, b'GIF8'),                     # GIF
+    (0, b'PK\x03\x04'),               # ZIP / Office文档 / JAR
+    (0, b'7z\xbc\xaf\x27\x1c'),       # 7z
+    (0, b'Rar!\x1a\x07'),             # RAR
+    (0, b'\x1f\x8b'),                 # gzip
+    (0, b'BZh'),                      # bzip2
+    (0, b'\xfd7zXZ\x00'),             # xz
+    (0, b'\x28\xb5\x2f\xfd'),         # zstd
+    (0, b'OggS'),                     # Ogg
+    (0, b'fLaC'),                     # FLAC
+    (0, b'ID3'),                      # MP3
+    (0, b'\x1a\x45\xdf\xa3'),         # Matroska / WebM
+    (4, b'ftyp'),                     # MP4 / MOV / HEIC
+    (8, b'WEBP'),                     # WebP（RIFF容器）
+    (8, b'AVI '),                     # AVI（RIFF容器）
+]
+
+AUTO_STORE_MIN_SIZE = 64 * 1024  # 小于该大小的文件直接压缩，不值得检测
+AUTO_STORE_SAMPLE_SIZE = 64 * 1024  # 每个采样块的大小
+AUTO_STORE_SAMPLE_COUNT = 3  # 采样块数量（数据开头、中间、结尾）
+AUTO_STORE_RATIO = 0.95  # 采样压缩后仍大于原大小的95%时认为不可压缩
+
+def choose_compression(file_path, file_size, compression, data):
+    """判断文件是否值得压缩，不值得时返回ZIP_STORED，否则返回原压缩方式
+    
+    依次检查扩展名、文件头魔数，最后从data的开头、中间和结尾各取一块数据
+    用zlib最快级别试压缩，压缩率太低就直接存储。
+    data为压缩时本来就要读取的数据（整体读入的文件内容，或者流式压缩读到的第一块），
+    检测只在这块数据上进行，不需要为了采样另外打开和读取文件。
+    """
+    if compression == ZIP_STORED or file_size < AUTO_STORE_MIN_SIZE:
+        return compression
+    if os.path.splitext(file_path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return ZIP_STORED
+    
+    head = data[:AUTO_STORE_SAMPLE_SIZE]
+    for offset, magic in INCOMPRESSIBLE_MAGIC:
+        if head[offset:offset + len(magic)] == magic:
+            return ZIP_STORED
+    
+    # 采样位置：开头、中间、结尾
+    if AUTO_STORE_SAMPLE_COUNT > 1:
+        step = max(0, len(data) - AUTO_STORE_SAMPLE_SIZE) // (AUTO_STORE_SAMPLE_COUNT - 1)
+    else:
+        step = 0
+    offsets = sorted({i * step for i in range(AUTO_STORE_SAMPLE_COUNT)})
+    samples = [data[offset:offset + AUTO_STORE_SAMPLE_SIZE] for offset in offsets]
+    
+    raw_size = sum(len(sample) for sample in samples)
+    if raw_size == 0:
+        return compression
+    compressed_size = sum(len(zlib.compress(sample, 1)) for sample in samples)
+    if compressed_size >= raw_size * AUTO_STORE_RATIO:
+        return ZIP_STORED
+    return compression
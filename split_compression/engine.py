@@ -0,0 +1,903 @@
+"""不依赖Qt的压缩引擎：扫描源文件，压缩（可选加密）并直接写入分卷"""
+
+import collections
+import itertools
+import os
+import threading
+import time
+import zlib
+
+import pyzipper
+
+from .checksums import checksum_path, default_checksum, new_hasher, write_checksums
+from .checkpoint import JobJournal, zipinfo_from_record, zipinfo_to_record
+from .codecs import choose_compression, get_compressor, set_entry_compression
+from .entries import (
+    RawEntryWriter, compress_batch, compress_entry, crc32_combine, deflate_block, read_files, store_block,
+    write_raw_entry
+)
+from .fileio import DEFAULT_READ_BUFFER, DEFAULT_WRITE_BUFFER, InputFile
+from .index import write_index
+from .incremental import (
+    PreviousArchive, load_manifest_cache, manifest_cache_path, save_manifest_cache
+)
+from .manifest import make_zipinfo, scan_source, small_file_runs
+from .parity import ParityWriter, remove_parity, write_parity_manifest
+from .pipeline import CompressPipeline
+from .stats import JobStats, format_snapshot, timed
+from .volumes import VolumeWriter, list_volumes
+
+class CompressCancelled(Exception):
+    """用户取消了压缩"""
+
+# 进度节流器
+class ProgressThrottle:
+    """限制进度回调的频率，距离上次发送超过min_interval秒才会再次发送
+    
+    界面中的回调是跨线程的Qt信号，会进入界面线程的事件队列，工作线程本身不会阻塞；
+    节流是为了避免大文件压缩时队列里堆积成千上万个进度事件拖慢界面。
+    """
+    
+    def __init__(self, callback, min_interval=0.1):
+        self.callback = callback
+        self.min_interval = min_interval
+        self._last_time = 0.0
+    
+    def reset(self):
+        self._last_time = 0.0
+    
+    def update(self, value, force=False):
+        now = time.monotonic()
+        if force or now - self._last_time >= self.min_interval:
+            self._last_time = now
+            self.callback(value)
+
+# 带进度统计的读取包装
+class ProgressReader:
+    """包装源文件对象，ZIP写入器每实际读取一块数据就回调一次已读取的字节数"""
+    
+    def __init__(self, fileobj, callback):
+        self.fileobj = fileobj
+        self.callback = callback
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        self.callback(self.bytes_read)
+        return data
+
+def _ignore(*args):
+    pass
+
+class JobControl:
+    """任务的暂停、继续和取消，工作线程在处理每个数据块之前调用check_state"""
+    
+    cancel_message = "压缩已取消"
+    
+    def __init__(self):
+        # 取消和暂停请求，在每个数据块处检查，因此大文件处理到一半也能及时响应
+        self._cancel_event = threading.Event()
+        self._running_event = threading.Event()  # 未设置时表示已暂停
+        self._running_event.set()
+    
+    def cancel(self):
+        """请求取消任务"""
+        self._cancel_event.set()
+        self._running_event.set()
+    
+    def pause(self):
+        """暂停任务，各线程在处理下一个数据块前等待，不再占用CPU和磁盘"""
+        self._running_event.clear()
+    
+    def resume(self):
+        """继续已暂停的任务"""
+        self._running_event.set()
+    
+    def is_paused(self):
+        return not self._running_event.is_set()
+    
+    def check_state(self, abort=None):
+        """处理每个数据块之前调用：暂停时在这里等待，取消时抛出CompressCancelled
+        
+        abort（threading.Event）被设置时不再等待继续，直接返回，
+        流水线的其他阶段出错时读取阶段不会一直停在暂停处。
+        """
+        if abort is None:
+            self._running_event.wait()
+        else:
+            while not self._running_event.wait(0.1):
+                if abort.is_set():
+                    return
+        if self._cancel_event.is_set():
+            raise CompressCancelled(self.cancel_message)
+
+class CompressJob(JobControl):
+    """把一个文件或文件夹压缩为分卷ZIP，不依赖Qt，可以在命令行和界面中使用
+    
+    callbacks为可选的回调字典（都在调用run的线程中执行）：
+    "progress"(总进度0-100.0)、"current_file"(压缩包内名称)、"file_progress"(当前文件进度0-100.0)、
+    "stats"(分阶段统计快照，见stats.JobStats.snapshot，每秒最多一次，结束时done为True)。
+    run()返回分卷路径列表，失败时抛出异常，取消时抛出CompressCancelled。
+    """
+    
+    def __init__(self, source_path, output_dir, volume_size, password=None, workers=1,
+                 pipeline_depth=8, buffer_size=DEFAULT_READ_BUFFER, auto_store=True,
+                 compression=pyzipper.ZIP_DEFLATED, compresslevel=None, incremental=False,
+                 verify_content=False, checkpoint=True, index=True, checksum="auto", parity=0,
+                 stats=False, write_buffer=DEFAULT_WRITE_BUFFER, mmap_threshold=0, drop_cache=True,
+                 callbacks=None):
+        super().__init__()
+        callbacks = callbacks or {}
+        self.on_progress = callbacks.get("progress") or _ignore
+        self.on_current_file = callbacks.get("current_file") or _ignore
+        self.on_file_progress = callbacks.get("file_progress") or _ignore
+        self.on_stats = callbacks.get("stats") or _ignore
+        self.source_path = source_path
+        self.output_dir = output_dir
+        # 分卷的公共路径：输出目录/源文件名（.z01, .z02...和.zip）
+        self.output_base = os.path.join(output_dir, os.path.basename(source_path))
+        self.volume_size = volume_size
+        self.password = password
+        self.workers = max(1, workers)  # 压缩线程数，1表示逐个文件顺序压缩
+        self.buffer_size = buffer_size  # 每次送入压缩器的数据块大小（默认1MB）
+        self.write_buffer = write_buffer  # 分卷文件的写缓冲区大小
+        # 不小于该大小的源文件使用内存映射读取，数据不复制直接送入压缩器（0表示不使用）
+        self.mmap_threshold = mmap_threshold
+        # 读过的源文件和写完的分卷通知内核丢弃页缓存，压缩大文件夹时不挤掉其他程序的缓存
+        self.drop_cache = drop_cache
+        # 顺序压缩时流水线各阶段之间的队列深度，0表示不使用流水线
+        self.pipeline_depth = pipeline_depth
+        self.pipeline_stats = None  # 流水线各阶段的忙碌/等待统计
+        self.pipeline_summary = ""
+        # 压缩方式与级别（级别为None时使用各压缩方式的默认级别）
+        self.compression = compression
+        self.compresslevel = compresslevel
+        # 自动检测已压缩/不可压缩的文件并直接存储，不浪费CPU
+        self.auto_store = auto_store
+        # 按压缩方式统计：{压缩方式: [文件数, 原始字节数, 写入字节数]}
+        self.method_stats = {}
+        # 并行模式下整体读入内存压缩的单个文件大小上限，更大的文件按流式方式压缩
+        self.parallel_entry_limit = 16 * 1024 * 1024
+        # 并行模式下等待写入的条目数据总量上限，限制内存占用
+        self.parallel_pending_limit = 256 * 1024 * 1024
+        # 并行模式下超过该大小的单个文件拆分为数据块，由多个线程同时DEFLATE压缩
+        self.block_parallel_threshold = 64 * 1024 * 1024
+        self.block_size = 2 * 1024 * 1024  # 分块压缩时每个数据块的大小
+        # 小文件快速路径：不超过small_file_limit的文件连续至少small_file_batch个时，
+        # 由预读线程成批读入内存，压缩线程整批压缩/加密，每批只发送一次界面回调（0表示不使用）
+        self.small_file_limit = 64 * 1024
+        self.small_file_batch = 128  # 每批的文件数
+        self.prefetch_workers = 4  # 预读小文件的线程数（主要是等待磁盘或网络延迟）
+        self.scan_workers = 8  # 并行扫描子目录的线程数（网络共享上扫描主要是等待延迟）
+        # 增量压缩：未变化的文件直接从上次的分卷中复制已压缩的数据
+        self.incremental = incremental
+        # 增量压缩时，修改时间变化但大小相同的文件再比较CRC32确认内容是否变化
+        self.verify_content = verify_content
+        self.reused_stats = [0, 0]  # 增量压缩复用的[文件数, 原始字节数]
+        self.incremental_note = ""  # 无法复用上次压缩包时的原因
+        # 定期把已完成的条目记录到任务日志中，中断后再次运行相同的任务时从检查点继续
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = 5.0  # 两次检查点之间的最短间隔（秒）
+        self.journal = None
+        self.resume_stats = None  # 从检查点恢复的(条目数, 原始字节数, 恢复耗时秒数)
+        self.failure_note = ""
+        # 压缩完成后在分卷旁边写出索引，列出和解压单个文件时不需要读取中央目录
+        self.index = index
+        # 写入分卷时同步计算各分卷的校验和（"auto"为默认算法，None表示不计算）
+        self.checksum = default_checksum() if checksum == "auto" else checksum
+        # 恢复卷数：与分卷同步生成，最多可以修复这么多个丢失或损坏的分卷
+        self.parity = parity
+        if parity and not self.checksum:
+            # 修复时靠校验和判断哪些分卷损坏了
+            self.checksum = default_checksum()
+        self.parity_writer = None
+        # 分阶段统计（耗时、速度、剩余时间），提供了"stats"回调时自动启用；未启用时为None
+        self.stats_enabled = bool(stats or callbacks.get("stats"))
+        self.stats = None
+        self.final_stats = None
+        self.elapsed = None  # 整个任务的耗时（秒），用于计算每秒处理的文件数
+        self.file_count = 0
+    
+    def update_total_progress(self, processed_size):
+        """根据已处理的字节数发送总进度（节流）"""
+        # 计算当前总进度（使用100%表示完整压缩过程）
+        current_progress = (processed_size / self.total_size) * 100.0
+        
+        # 确保进度值在0-100之间
+        current_progress = max(0.0, min(100.0, current_progress))
+        
+        # 四舍五入到小数点后两位，并发送总进度更新信号（节流）
+        self.total_throttle.update(round(current_progress, 2))
+        if self.stats is not None:
+            self.stats.processed_bytes = processed_size
+            self.stats.processed_files = len(self.zipf.filelist)
+            self.stats_throttle.update(False)
+    
+    def emit_stats(self, done=False):
+        """发送一次统计快照"""
+        snapshot = self.stats.snapshot(done)
+        if done:
+            self.final_stats = snapshot
+        self.on_stats(snapshot)
+    
+    def open_input(self, path):
+        """按I/O设置打开一个源文件用于顺序读取"""
+        return InputFile(path, self.drop_cache, self.mmap_threshold)
+    
+    def entry_compression(self, file_path, file_size, compression, data):
+        """返回该文件实际使用的压缩方式（启用自动存储时可能为ZIP_STORED），data为已经读到的第一块数据"""
+        if self.auto_store:
+            return choose_compression(file_path, file_size, compression, data)
+        return compression
+    
+    def record_entry(self, zinfo):
+        """按压缩方式统计写入的条目"""
+        stats = self.method_stats.setdefault(zinfo.compress_type, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += zinfo.file_size
+        stats[2] += zinfo.compress_size
+        self.maybe_checkpoint()
+    
+    def load_checkpoint(self, journal, header, files_list):
+        """读取检查点，返回(写入位置, 已完成条目的记录列表, 剩余的文件清单)，没有可用的检查点时返回None
+        
+        已完成的文件在中断后又被修改或删除时，从该条目开始重新压缩。
+        """
+        loaded = journal.load(header)
+        if loaded is None:
+            return None
+        offset, records = loaded
+        manifest = {entry.arcname: entry for entry in files_list}
+        for index, record in enumerate(records):
+            entry = manifest.get(record["name"])
+            if entry is None or entry.size != record["size"] or entry.mtime != record["mtime"]:
+                offset = record["offset"]
+                records = records[:index]
+                break
+        completed = {record["name"] for record in records}
+        remaining = [entry for entry in files_list if entry.arcname not in completed]
+        return offset, records, remaining
+    
+    def maybe_checkpoint(self, force=False):
+        """距离上次检查点超过checkpoint_interval时，把新完成的条目追加到任务日志"""
+        if self.journal is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_checkpoint < self.checkpoint_interval:
+            return
+        filelist = self.zipf.filelist
+        if len(filelist) == self.journaled_count:
+            return
+        # 先确保条目数据已经写到磁盘，再记录检查点
+        self.volume_writer.sync()
+        records = [
+            zipinfo_to_record(filelist[index], self.job_files[index - self.resumed_count].mtime)
+            for index in range(self.journaled_count, len(filelist))
+        ]
+        self.journal.append(self.zipf.start_dir, records)
+        self.journaled_count = len(filelist)
+        self.last_checkpoint = now
+    
+    def format_method_stats(self):
+        """返回存储/压缩字节数的简要报告"""
+        def mb(size):
+            return f"{size / 1024 / 1024:.1f} MB"
+        
+        parts = []
+        for compress_type, (count, file_size, compress_size) in sorted(self.method_stats.items()):
+            if compress_type == pyzipper.ZIP_STORED:
+                parts.append(f"直接存储{count}个文件 {mb(file_size)}")
+            else:
+                parts.append(f"压缩{count}个文件 {mb(file_size)} → {mb(compress_size)}")
+        return "；".join(parts)
+    
+    def hasher_factory(self):
+        """返回VolumeWriter计算分卷校验和用的哈希对象工厂，不计算时返回None"""
+        if not self.checksum:
+            return None
+        new_hasher(self.checksum)  # 提前检查算法是否可用
+        return lambda: new_hasher(self.checksum)
+    
+    def parity_writer_for(self, output_base, files_list, total_size):
+        """返回生成恢复卷的ParityWriter，不生成时返回None
+        
+        分卷数加恢复卷数不能超过256：按不压缩估算的分卷数超过上限时在开始之前就报错。
+        """
+        if not self.parity:
+            return None
+        writer = ParityWriter(output_base, self.parity)
+        # 每个条目的本地文件头、数据描述符和中央目录记录大约多占几百字节
+        estimated_size = total_size + len(files_list) * 512
+        if -(-estimated_size // self.volume_size) > writer.max_volumes:
+            raise ValueError(
+                f"使用{self.parity}个恢复卷时最多只能有{writer.max_volumes}个分卷，请增大分卷大小"
+            )
+        return writer
+    
+    def compression_options(self):
+        """影响条目数据的压缩选项，选项变化后上次的条目不能再复用"""
+        return {
+            "compression": self.compression,
+            "compresslevel": self.compresslevel,
+            "encrypted": bool(self.password),
+            "auto_store": self.auto_store,
+        }
+    
+    def open_previous_archive(self, output_base):
+        """打开上次生成的分卷用于增量压缩，不能复用时返回None并记录原因
+        
+        上次的分卷先重命名为.prev，这样本次可以使用相同的文件名写入新分卷。
+        """
+        # 上次的增量压缩中断时，.prev分卷还保留着，直接使用
+        previous_volumes = list_volumes(output_base, ".prev")
+        volumes = [] if previous_volumes else list_volumes(output_base)
+        cache = load_manifest_cache(manifest_cache_path(output_base))
+        if not (previous_volumes or volumes) or cache is None:
+            self.incremental_note = "没有找到上次的压缩包和清单缓存，已完整压缩"
+            return None
+        options, cached_files = cache
+        if options != self.compression_options():
+            self.incremental_note = "压缩选项与上次不同，已完整压缩"
+            return None
+        
+        for volume in volumes:
+            os.replace(volume, volume + ".prev")
+            previous_volumes.append(volume + ".prev")
+        try:
+            previous = PreviousArchive(
+                previous_volumes, cached_files, self.password.encode() if self.password else None
+            )
+        except Exception:
+            self.restore_previous_volumes(previous_volumes)
+            self.incremental_note = "上次的压缩包已损坏，已完整压缩"
+            return None
+        if not previous.check_password():
+            previous.close()
+            self.restore_previous_volumes(previous_volumes)
+            self.incremental_note = "密码与上次不同，已完整压缩"
+            return None
+        return previous
+    
+    def restore_previous_volumes(self, previous_volumes):
+        """把.prev分卷恢复为原来的文件名"""
+        for volume in previous_volumes:
+            try:
+                os.replace(volume, volume[:-len(".prev")])
+            except OSError:
+                pass
+    
+    def copy_unchanged_entry(self, zipf, previous, zinfo):
+        """从上次的分卷中原样复制一个未变化的条目"""
+        self.on_current_file(zinfo.filename)
+        new_zinfo = previous.copy_entry(zipf, zinfo, self.buffer_size, self.check_state)
+        self.reused_stats[0] += 1
+        self.reused_stats[1] += zinfo.file_size
+        self.on_file_progress(100.0)
+        self.processed_size += zinfo.file_size
+        self.update_total_progress(self.processed_size)
+        self.maybe_checkpoint()
+        return new_zinfo
+    
+    def compress_files(self, zipf, files_list, compression):
+        """成批的小文件走小文件快速路径，其余按设置选择并行、流水线或逐个文件的方式压缩"""
+        if self.small_file_limit > 0:
+            runs = small_file_runs(files_list, self.small_file_limit, self.small_file_batch)
+        else:
+            runs = [(False, files_list)]
+        for small, group in runs:
+            if small:
+                self.compress_small_files(zipf, group, compression)
+            elif self.workers > 1:
+                self.compress_files_parallel(zipf, group, compression)
+            elif self.pipeline_depth > 0:
+                self.compress_files_pipelined(zipf, group, compression)
+            else:
+                for entry in group:
+                    self.compress_file(zipf, entry, compression)
+    
+    def compress_files_incremental(self, zipf, files_list, compression, previous):
+        """增量压缩：未变化的文件直接复制上次的条目，其余文件正常压缩
+        
+        条目顺序与完整压缩相同；连续的一段变化文件一起交给compress_files处理。
+        """
+        matched = (
+            (entry, previous.find_unchanged(entry, self.verify_content, self.check_state))
+            for entry in files_list
+        )
+        for unchanged, group in itertools.groupby(matched, key=lambda item: item[1] is not None):
+            if unchanged:
+                for entry, zinfo in group:
+                    self.copy_unchanged_entry(zipf, previous, zinfo)
+            else:
+                self.compress_files(zipf, [entry for entry, _ in group], compression)
+    
+    def compress_file(self, zipf, entry, compression):
+        """以流式方式压缩单个文件，进度来自压缩器实际读取的数据"""
+        # 发送当前文件名信号
+        self.on_current_file(entry.arcname)
+        file_size = entry.size
+        
+        # 初始化文件进度
+        self.on_file_progress(0.0)
+        self.file_throttle.reset()
+        
+        def on_read(bytes_read):
+            """根据压缩器实际读取的字节数更新文件进度和总进度"""
+            if file_size > 0:
+                self.file_throttle.update(min(100.0, bytes_read / file_size * 100.0))
+            self.update_total_progress(self.processed_size + bytes_read)
+        
+        stats = self.stats
+        
+        def read_chunk():
+            self.check_state()
+            if stats is None:
+                return reader.read(self.buffer_size)
+            start = time.perf_counter()
+            chunk = reader.read(self.buffer_size)
+            stats.add("read", time.perf_counter() - start, len(chunk))
+            return chunk
+        
+        # 与zipf.write相同的条目信息，但由我们自己把数据送入压缩流，
+        # 这样进度来自压缩器真正读取的数据，源文件只读取一次
+        crc = 0
+        with self.open_input(entry.path) as f_in:
+            reader = ProgressReader(f_in, on_read)
+            # 自动存储的检测在第一块数据上采样，写入本地文件头之前就能确定压缩方式
+            chunk = read_chunk()
+            zinfo = make_zipinfo(zipf.zipinfo_cls, entry)
+            set_entry_compression(
+                zinfo, self.entry_compression(entry.path, file_size, compression, chunk), self.compresslevel
+            )
+            compressor = get_compressor(zinfo.compress_type, zinfo._compresslevel)
+            entry_writer = RawEntryWriter(zipf, zinfo, self.password.encode() if self.password else None, stats=stats)
+            while chunk:
+                if stats is not None:
+                    start = time.perf_counter()
+                crc = zlib.crc32(chunk, crc)
+                data = compressor.compress(chunk) if compressor else chunk
+                if stats is not None:
+                    stats.add("compress", time.perf_counter() - start, len(chunk))
+                entry_writer.write(data)
+                chunk = read_chunk()
+        if compressor:
+            entry_writer.write(compressor.flush())
+        entry_writer.close(crc, reader.bytes_read)
+        self.record_entry(zinfo)
+        
+        # 文件压缩完成，确保发送100%进度
+        self.on_file_progress(100.0)
+        
+        # 更新已处理大小
+        self.processed_size += file_size
+        self.update_total_progress(self.processed_size)
+    
+    def write_compressed_entry(self, zipf, future):
+        """等待并行压缩的结果，并按提交顺序写入ZIP"""
+        zinfo, payload = future.result()
+        self.on_current_file(zinfo.filename)
+        write_raw_entry(zipf, zinfo, payload)
+        self.record_entry(zinfo)
+        self.on_file_progress(100.0)
+        self.processed_size += zinfo.file_size
+        self.update_total_progress(self.processed_size)
+    
+    def compress_small_files(self, zipf, files_list, compression):
+        """小文件快速路径：预读 → 整批压缩/加密 → 按顺序写入
+        
+        预读线程每次读入small_file_batch个文件，压缩线程（workers个）在内存中压缩整批条目，
+        每个条目的PBKDF2密钥派生也在压缩线程中完成；当前线程按原顺序写入，
+        当前文件名和文件进度每批只发送一次。
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        password = self.password.encode() if self.password else None
+        pending = collections.deque()  # 压缩结果的future，保持提交顺序
+        max_pending = self.workers * 2 + self.prefetch_workers
+        
+        def compress_prefetched(batch, contents):
+            return compress_batch(
+                batch, contents.result(), compression, self.compresslevel, password, self.auto_store, self.stats,
+                self.check_state
+            )
+        
+        with ThreadPoolExecutor(max_workers=self.prefetch_workers) as readers:
+            with ThreadPoolExecutor(max_workers=self.workers) as compressors:
+                for start in range(0, len(files_list), self.small_file_batch):
+                    self.check_state()
+                    batch = files_list[start:start + self.small_file_batch]
+                    contents = readers.submit(read_files, batch, self.check_state, self.stats)
+                    pending.append(compressors.submit(compress_prefetched, batch, contents))
+                    if len(pending) >= max_pending:
+                        self.write_compressed_batch(zipf, pending.popleft())
+                while pending:
+                    self.write_compressed_batch(zipf, pending.popleft())
+    
+    def write_compressed_batch(self, zipf, future):
+        """等待一批小文件的压缩结果，并按顺序写入ZIP"""
+        results = future.result()
+        self.on_current_file(results[0][0].filename)
+        for zinfo, payload in results:
+            write_raw_entry(zipf, zinfo, payload)
+            self.record_entry(zinfo)
+            self.processed_size += zinfo.file_size
+        self.on_file_progress(100.0)
+        self.update_total_progress(self.processed_size)
+    
+    def compress_file_blocks(self, zipf, entry, executor):
+        """分块并行压缩单个大文件（类似pigz）
+        
+        文件按block_size切分，每块以前一块末尾32KB为预置字典，在线程池中独立压缩，
+        写入线程按顺序拼接成一个DEFLATE数据流，CRC32由各块的CRC合并得到。
+        自动存储检测认为第一块不可压缩时，各块直接存储，只在线程池中计算CRC。
+        """
+        # 发送当前文件名信号
+        self.on_current_file(entry.arcname)
+        self.on_file_progress(0.0)
+        self.file_throttle.reset()
+        
+        zinfo = make_zipinfo(zipf.zipinfo_cls, entry)
+        file_size = zinfo.file_size
+        password = self.password.encode() if self.password else None
+        
+        stats = self.stats
+        entry_writer = None
+        pending = collections.deque()  # (future, 数据块长度)，保持块顺序
+        max_pending = self.workers * 2
+        crc = 0
+        bytes_done = 0
+        
+        def write_next_block():
+            nonlocal crc, bytes_done
+            future, length = pending.popleft()
+            compressed, block_crc = future.result()
+            entry_writer.write(compressed)
+            crc = crc32_combine(crc, block_crc, length)
+            bytes_done += length
+            if file_size > 0:
+                self.file_throttle.update(min(100.0, bytes_done / file_size * 100.0))
+            self.update_total_progress(self.processed_size + bytes_done)
+        
+        with self.open_input(entry.path) as f_in:
+            dictionary = None
+            block = f_in.read(self.block_size)
+            compression = self.entry_compression(entry.path, file_size, pyzipper.ZIP_DEFLATED, block)
+            set_entry_compression(zinfo, compression, self.compresslevel)
+            block_func = deflate_block if compression == pyzipper.ZIP_DEFLATED else store_block
+            entry_writer = RawEntryWriter(zipf, zinfo, password, stats=stats)
+            while True:
+                self.check_state()
+                # 预读下一块，以便判断当前块是否为最后一块
+                if stats is not None:
+                    start = time.perf_counter()
+                    next_block = f_in.read(self.block_size) if block else b''
+                    stats.add("read", time.perf_counter() - start, len(next_block))
+                else:
+                    next_block = f_in.read(self.block_size) if block else b''
+                is_last = not next_block
+                if stats is not None:
+                    future = executor.submit(
+                        timed, stats, "compress", len(block),
+                        block_func, block, dictionary, self.compresslevel, is_last
+                    )
+                else:
+                    future = executor.submit(block_func, block, dictionary, self.compresslevel, is_last)
+                pending.append((future, len(block)))
+                if len(pending) >= max_pending:
+                    write_next_block()
+                if is_last:
+                    break
+                dictionary = block[-32768:]
+                block = next_block
+            while pending:
+                write_next_block()
+        
+        entry_writer.close(crc, bytes_done)
+        self.record_entry(zinfo)
+        
+        # 文件压缩完成，确保发送100%进度
+        self.on_file_progress(100.0)
+        self.processed_size += bytes_done
+        self.update_total_progress(self.processed_size)
+    
+    def compress_files_pipelined(self, zipf, files_list, compression):
+        """通过读取 → 压缩 → 加密 → 写入流水线顺序压缩所有文件"""
+        pipeline = CompressPipeline(
+            zipf,
+            password=self.password.encode() if self.password else None,
+            queue_depth=self.pipeline_depth,
+            buffer_size=self.buffer_size,
+            compresslevel=self.compresslevel,
+            check_state=self.check_state,
+            job_stats=self.stats,
+            open_input=self.open_input,
+            choose_compression=self.entry_compression,
+        )
+        file_state = {"size": 0, "done": 0}
+        
+        def on_entry_start(zinfo):
+            # 发送当前文件名信号，并初始化文件进度
+            self.on_current_file(zinfo.filename)
+            self.on_file_progress(0.0)
+            self.file_throttle.reset()
+            file_state["size"] = zinfo.file_size
+            file_state["done"] = 0
+        
+        def on_progress(bytes_written):
+            # 进度按写入阶段实际写出的数据对应的原始字节数计算
+            file_state["done"] += bytes_written
+            if file_state["size"] > 0:
+                self.file_throttle.update(min(100.0, file_state["done"] / file_state["size"] * 100.0))
+            self.update_total_progress(self.processed_size + file_state["done"])
+        
+        def on_entry_done(zinfo):
+            self.record_entry(zinfo)
+            # 文件压缩完成，确保发送100%进度
+            self.on_file_progress(100.0)
+            self.processed_size += zinfo.file_size
+            self.update_total_progress(self.processed_size)
+        
+        # 自动存储的采样检测在读取阶段用每个文件读到的第一块数据完成
+        entries = ((entry, compression) for entry in files_list)
+        try:
+            pipeline.run(entries, on_entry_start, on_progress, on_entry_done)
+        finally:
+            self.pipeline_stats = pipeline.stats
+            self.pipeline_summary = pipeline.format_stats()
+    
+    def compress_files_parallel(self, zipf, files_list, compression):
+        """多线程并行压缩：线程池独立压缩/加密各条目，当前线程按原顺序依次写入"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        password = self.password.encode() if self.password else None
+        pending = collections.deque()  # (future, 文件大小)，保持提交顺序
+        pending_size = 0
+        max_pending = self.workers * 2
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for entry in files_list:
+                self.check_state()
+                file_size = entry.size
+                if file_size > self.parallel_entry_limit:
+                    # 大文件不整体读入内存：先写完排在它前面的条目，再按流式方式压缩
+                    while pending:
+                        future, size = pending.popleft()
+                        pending_size -= size
+                        self.write_compressed_entry(zipf, future)
+                    if compression == pyzipper.ZIP_DEFLATED and file_size >= self.block_parallel_threshold:
+                        # 超大文件拆分为数据块，多个线程同时压缩同一个文件
+                        self.compress_file_blocks(zipf, entry, executor)
+                    else:
+                        self.compress_file(zipf, entry, compression)
+                    continue
+                
+                future = executor.submit(
+                    compress_entry, entry, compression, self.compresslevel, password,
+                    self.auto_store, self.stats
+                )
+                pending.append((future, file_size))
+                pending_size += file_size
+                
+                # 等待写入的条目过多时，先写出最早提交的条目
+                while pending and (len(pending) >= max_pending or pending_size > self.parallel_pending_limit):
+                    future, size = pending.popleft()
+                    pending_size -= size
+                    self.write_compressed_entry(zipf, future)
+            
+            while pending:
+                future, size = pending.popleft()
+                self.write_compressed_entry(zipf, future)
+    
+    def run(self):
+        """执行压缩，返回分卷路径列表"""
+        output_base = self.output_base
+        
+        run_start = time.perf_counter()
+        self.stats = JobStats() if self.stats_enabled else None
+        self.final_stats = None
+        
+        # 一次扫描得到文件清单，总大小、写入顺序和进度都来自这份清单
+        scan_start = time.perf_counter()
+        files_list = scan_source(self.source_path, self.scan_workers, self.check_state)
+        total_size = sum(entry.size for entry in files_list)
+        
+        if total_size == 0 or not files_list:
+            raise ValueError("源文件或文件夹为空")
+        self.file_count = len(files_list)
+        if self.stats is not None:
+            self.stats.total_bytes = total_size
+            self.stats.total_files = len(files_list)
+            self.stats.add("scan", time.perf_counter() - scan_start)
+            self.stats_throttle = ProgressThrottle(self.emit_stats, min_interval=1.0)
+        
+        # 初始化进度
+        self.processed_size = 0
+        self.total_size = total_size
+        
+        # 发送初始进度
+        self.on_progress(0.0)
+        
+        # 设置压缩参数
+        compression = self.compression
+        
+        # 任务日志：相同的源、分卷大小和压缩选项才能从检查点继续
+        journal = JobJournal(f"{output_base}.journal") if self.checkpoint else None
+        job_header = {
+            "version": 1,
+            "source": os.path.abspath(self.source_path),
+            "volume_size": self.volume_size,
+            "options": self.compression_options(),
+        }
+        resume_start = time.perf_counter()
+        checkpoint = self.load_checkpoint(journal, job_header, files_list) if journal else None
+        
+        parity_writer = self.parity_writer_for(output_base, files_list, total_size)
+        previous = self.open_previous_archive(output_base) if self.incremental else None
+        
+        # 直接写入分卷：写满一个分卷后自动切换到下一个，无需临时ZIP文件
+        volume_writer = VolumeWriter(
+            output_base, self.volume_size, durable=journal is not None,
+            hasher_factory=self.hasher_factory(), parity=parity_writer, stats=self.stats,
+            buffer_size=self.write_buffer, drop_cache=self.drop_cache
+        )
+        if checkpoint:
+            try:
+                volume_writer.resume(checkpoint[0])
+            except (OSError, ValueError):
+                # 分卷已经被删除或损坏，只能重新开始
+                checkpoint = None
+                if parity_writer:
+                    parity_writer.reset()
+                volume_writer = VolumeWriter(
+                    output_base, self.volume_size, durable=True,
+                    hasher_factory=self.hasher_factory(), parity=parity_writer, stats=self.stats,
+                    buffer_size=self.write_buffer, drop_cache=self.drop_cache
+                )
+        offset, records, job_files = checkpoint if checkpoint else (0, [], files_list)
+        resumed = [zipinfo_from_record(pyzipper.zipfile_aes.AESZipInfo, record) for record in records]
+        if checkpoint:
+            self.resume_stats = (
+                len(resumed), sum(zinfo.file_size for zinfo in resumed), time.perf_counter() - resume_start
+            )
+        if journal:
+            journal.start(job_header, offset, records)
+        
+        self.volume_writer = volume_writer
+        self.job_files = job_files
+        self.resumed_count = self.journaled_count = len(resumed)
+        self.last_checkpoint = time.monotonic()
+        try:
+            # 创建ZIP文件，使用pyzipper实现可靠的密码保护
+            # 每个条目的压缩方式和级别都由我们自己设置（pyzipper不支持Zstandard），
+            # 因此这里不需要指定默认压缩方式
+            with pyzipper.AESZipFile(
+                volume_writer, 'w', 
+                encryption=pyzipper.WZ_AES if self.password else None
+            ) as zipf:
+                # 设置密码（如果有）
+                if self.password:
+                    zipf.setpassword(self.password.encode())
+                
+                # 从检查点恢复时，已完成的条目直接登记到中央目录
+                for zinfo in resumed:
+                    zipf.filelist.append(zinfo)
+                    zipf.NameToInfo[zinfo.filename] = zinfo
+                    self.processed_size += zinfo.file_size
+                self.zipf = zipf
+                self.journal = journal
+                
+                # 进度信号节流，避免每读取一块数据就发送一次信号
+                self.file_throttle = ProgressThrottle(self.on_file_progress)
+                self.total_throttle = ProgressThrottle(self.on_progress)
+                
+                # 压缩所有文件
+                if previous:
+                    self.compress_files_incremental(zipf, job_files, compression, previous)
+                else:
+                    self.compress_files(zipf, job_files, compression)
+                
+                # 写中央目录之前停止记录检查点
+                self.journal = None
+            
+            # 关闭最后一个分卷，并将其重命名为.zip
+            volumes = volume_writer.close()
+        except Exception:
+            self.journal = None
+            if journal and self.journaled_count > 0 and not self._cancel_event.is_set():
+                # 已经有检查点：保留分卷和任务日志，再次运行相同的任务时从检查点继续
+                volume_writer.suspend()
+                journal.close()
+                if previous:
+                    previous.close()
+                self.failure_note = "已保存检查点，再次开始相同的压缩任务即可从中断处继续"
+            else:
+                # 压缩失败时删除已经写出的分卷，避免留下不完整的压缩包，并恢复上次的分卷
+                volume_writer.abort()
+                if journal:
+                    journal.remove()
+                if previous:
+                    previous.close()
+                    self.restore_previous_volumes(previous.volumes)
+            raise
+        
+        if journal:
+            journal.remove()
+        if previous:
+            previous.close()
+        # 删除增量压缩用过的（或中断的任务留下的）上次分卷
+        for volume in list_volumes(output_base, ".prev"):
+            os.remove(volume)
+        if self.incremental:
+            # 记录本次的文件清单，供下次增量压缩判断哪些文件没有变化
+            save_manifest_cache(manifest_cache_path(output_base), self.compression_options(), files_list)
+        elif os.path.exists(manifest_cache_path(output_base)):
+            # 上次增量压缩留下的清单已经不对应这组分卷
+            os.remove(manifest_cache_path(output_base))
+        if self.checksum:
+            write_checksums(output_base, self.checksum, volumes, volume_writer.checksums)
+        elif os.path.exists(checksum_path(output_base)):
+            # 上次的校验文件已经不对应这组分卷
+            os.remove(checksum_path(output_base))
+        if parity_writer:
+            write_parity_manifest(
+                output_base, self.checksum, volumes, volume_writer.checksums, parity_writer.paths
+            )
+            self.parity_writer = parity_writer
+        else:
+            remove_parity(output_base)
+        if self.index:
+            try:
+                write_index(volumes)
+            except (OSError, pyzipper.BadZipFile):
+                # 索引只是加速用的，写不出来时列出和解压会改为读取中央目录
+                pass
+        
+        # 压缩完成，设置进度为100%
+        self.on_progress(100.0)
+        self.elapsed = time.perf_counter() - run_start
+        if self.stats is not None:
+            self.stats.processed_bytes = total_size
+            self.stats.processed_files = len(files_list)
+            self.emit_stats(done=True)
+        return volumes
+    
+    def format_summary(self, volumes):
+        """返回压缩完成后的说明：输出位置和各项统计"""
+        if len(volumes) == 1:
+            # 不需要分卷时只有一个.zip文件
+            message = f"压缩完成！输出位置：{volumes[0]}"
+        else:
+            message = f"压缩完成！输出位置：{self.output_base}.*"
+        if self.resume_stats:
+            resumed_count, resumed_size, resume_time = self.resume_stats
+            message += (
+                f"\n\n从检查点恢复：跳过{resumed_count}个已完成的文件 "
+                f"{resumed_size / 1024 / 1024:.1f} MB，恢复耗时{resume_time:.2f}秒"
+            )
+        if self.incremental:
+            reused_count, reused_size = self.reused_stats
+            message += f"\n\n增量压缩：复用{reused_count}个未变化的文件 {reused_size / 1024 / 1024:.1f} MB"
+            if self.incremental_note:
+                message += f"（{self.incremental_note}）"
+        if self.method_stats:
+            message += f"\n\n{self.format_method_stats()}"
+        if self.elapsed:
+            message += (
+                f"\n用时{self.elapsed:.1f}秒，每秒{self.file_count / self.elapsed:.0f}个文件，"
+                f"{self.total_size / self.elapsed / 1024 / 1024:.1f} MB/s"
+            )
+        if self.pipeline_stats:
+            message += f"\n\n流水线统计：{self.pipeline_summary}"
+        if self.parity_writer:
+            message += f"\n\n{self.parity_writer.format_summary()}"
+        if self.final_stats:
+            message += f"\n\n{format_snapshot(self.final_stats)}"
+        return message
+
+def compress_to_volumes(source_path, output_dir, volume_size, password=None, callbacks=None, **options):
+    """把文件或文件夹压缩为分卷ZIP，返回分卷路径列表
+    
+    options为CompressJob的其他参数（workers、compression、compresslevel、incremental等）。
+    """
+    return CompressJob(source_path, output_dir, volume_size, password, callbacks=callbacks, **options).run()
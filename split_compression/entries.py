@@ -0,0 +1,265 @@
+"""由我们自己压缩/加密的ZIP条目：整体压缩、按块并行DEFLATE和流式写入"""
+
+import functools
+import time
+import zlib
+
+import pyzipper
+
+from .codecs import ZIP_ZSTANDARD, choose_compression, get_compressor, set_entry_compression
+from .manifest import make_zipinfo
+
+def compress_entry(entry, compression, compresslevel, password, auto_store=False, stats=None):
+    """在工作线程中把单个文件压缩（并加密）为完整的条目数据
+    
+    返回(zinfo, payload)，payload包含AES加密头、压缩数据和HMAC，
+    zinfo中已填好CRC和大小，可以直接交给write_raw_entry按顺序写入。
+    zlib和pycryptodome在处理数据时会释放GIL，因此多个线程可以同时占用多个CPU核心。
+    stats为JobStats时记录读取、压缩和加密的耗时。
+    """
+    start = time.perf_counter()
+    with open(entry.path, 'rb') as f:
+        data = f.read()
+    if stats is not None:
+        stats.add("read", time.perf_counter() - start, len(data))
+    return compress_entry_data(entry, data, compression, compresslevel, password, auto_store, stats)
+
+def compress_entry_data(entry, data, compression, compresslevel, password, auto_store=False, stats=None):
+    """把已经读入内存的文件内容压缩（并加密）为完整的条目数据，返回值与compress_entry相同"""
+    zinfo = make_zipinfo(pyzipper.zipfile_aes.AESZipInfo, entry)
+    start = time.perf_counter()
+    
+    if auto_store:
+        # 数据已经在内存中，直接从中采样判断是否值得压缩
+        compression = choose_compression(entry.path, len(data), compression, data)
+    set_entry_compression(zinfo, compression, compresslevel)
+    
+    compressor = get_compressor(compression, compresslevel)
+    if compressor:
+        compressed = compressor.compress(data) + compressor.flush()
+    else:
+        compressed = data
+    
+    zinfo.flag_bits = 0
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+    if stats is not None:
+        now = time.perf_counter()
+        stats.add("compress", now - start, len(data))
+        start = now
+    if compression == pyzipper.ZIP_LZMA:
+        # LZMA压缩数据包含结束标记
+        zinfo.flag_bits |= 0x02
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    
+    if password:
+        # 每个条目使用独立的盐值和密钥（与pyzipper的WZ_AES写入方式相同）
+        encrypter = pyzipper.zipfile_aes.AESZipEncrypter(password)
+        zinfo.flag_bits |= 0x01
+        encrypter.update_zipinfo(zinfo)
+        payload = encrypter.encryption_header() + encrypter.encrypt(compressed) + encrypter.flush()
+        encrypter.finalize_zipinfo(zinfo)
+        if stats is not None:
+            # 包括每个条目的PBKDF2密钥派生
+            stats.add("encrypt", time.perf_counter() - start, len(compressed))
+    else:
+        payload = compressed
+    zinfo.compress_size = len(payload)
+    return zinfo, payload
+
+def read_files(entries, check_state=None, stats=None):
+    """依次读入一批小文件的全部内容（在预读线程中运行），返回与entries对应的数据列表"""
+    start = time.perf_counter()
+    contents = []
+    for entry in entries:
+        if check_state:
+            check_state()
+        with open(entry.path, 'rb') as f:
+            contents.append(f.read())
+    if stats is not None:
+        stats.add("read", time.perf_counter() - start, sum(len(data) for data in contents))
+    return contents
+
+def compress_batch(entries, contents, compression, compresslevel, password, auto_store=False, stats=None,
+                   check_state=None):
+    """在工作线程中压缩（并加密）一批已经读入内存的小文件，返回[(zinfo, payload), ...]
+    
+    每个条目仍然使用独立的盐值和密钥：WinZip AES的计数器从1开始，
+    共用密钥会让不同条目使用相同的密钥流，因此只能把密钥派生分散到多个线程中。
+    """
+    results = []
+    for entry, data in zip(entries, contents):
+        if check_state:
+            check_state()
+        results.append(compress_entry_data(entry, data, compression, compresslevel, password, auto_store, stats))
+    return results
+
+def check_entry_writable(zipf, zinfo):
+    """写入条目前的检查（pyzipper不认识Zstandard，按直接存储检查其余项目）"""
+    compress_type = zinfo.compress_type
+    if compress_type == ZIP_ZSTANDARD:
+        zinfo.compress_type = pyzipper.ZIP_STORED
+    try:
+        zipf._writecheck(zinfo)
+    finally:
+        zinfo.compress_type = compress_type
+
+def write_raw_entry(zipf, zinfo, payload):
+    """把已经压缩好的条目数据追加到打开的ZIP中，由pyzipper负责写出中央目录"""
+    zip64 = zipf._allowZip64 and (
+        zinfo.file_size > pyzipper.zipfile.ZIP64_LIMIT
+        or zinfo.compress_size > pyzipper.zipfile.ZIP64_LIMIT
+    )
+    zinfo.header_offset = zipf.fp.tell()
+    check_entry_writable(zipf, zinfo)
+    zipf._didModify = True
+    # 大小和CRC已知，本地文件头中直接写入，不需要数据描述符
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    zipf.fp.write(payload)
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+
+def _gf2_matrix_times(mat, vec):
+    """GF(2)上的矩阵乘向量（用于CRC32合并）"""
+    result = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            result ^= mat[i]
+        vec >>= 1
+        i += 1
+    return result
+
+def _gf2_matrix_compose(mat_a, mat_b):
+    """GF(2)上的矩阵乘法，返回先做mat_b再做mat_a的变换"""
+    return [_gf2_matrix_times(mat_a, column) for column in mat_b]
+
+@functools.lru_cache(maxsize=16)
+def _crc32_zeros_operator(length):
+    """返回"在数据后追加length个零字节"对CRC32寄存器的变换矩阵"""
+    # 一个零比特的变换：CRC32多项式（反射形式）
+    one_bit = [0xEDB88320] + [1 << n for n in range(31)]
+    power = one_bit
+    for _ in range(3):
+        power = _gf2_matrix_compose(power, power)  # 8个零比特 = 1个零字节
+    operator = None
+    while length:
+        if length & 1:
+            operator = power if operator is None else _gf2_matrix_compose(power, operator)
+        length >>= 1
+        if length:
+            power = _gf2_matrix_compose(power, power)
+    return operator
+
+def crc32_combine(crc1, crc2, len2):
+    """合并两段数据的CRC32：crc1为前一段的CRC，crc2为后一段（长度len2）的CRC"""
+    if len2 <= 0:
+        return crc1
+    return _gf2_matrix_times(_crc32_zeros_operator(len2), crc1) ^ crc2
+
+def deflate_block(data, dictionary, level, is_last):
+    """独立压缩一个数据块，返回(压缩数据, 数据块的CRC32)
+    
+    dictionary为前一个数据块末尾最多32KB的数据，用作预置字典，
+    这样块与块之间的重复内容仍然可以被引用，压缩率接近整体压缩。
+    非最后一块以Z_SYNC_FLUSH结束（按字节对齐且不设置结束标志），
+    依次拼接后就是一个合法的DEFLATE数据流。
+    """
+    if level is None:
+        level = zlib.Z_DEFAULT_COMPRESSION
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data)
+    compressed += compressor.flush(zlib.Z_FINISH if is_last else zlib.Z_SYNC_FLUSH)
+    return compressed, zlib.crc32(data)
+
+def store_block(data, dictionary, level, is_last):
+    """与deflate_block参数相同的直接存储版本：数据原样返回，只计算CRC32"""
+    return data, zlib.crc32(data)
+
+# 流式条目写入器
+class RawEntryWriter:
+    """按顺序写入一个由我们自己压缩的条目
+    
+    先写入本地文件头（使用数据描述符），再依次追加压缩数据块，
+    关闭时写入HMAC和数据描述符，并把条目登记到中央目录。
+    AES加密是流式的，因此在写入线程中按顺序完成；也可以传入已经在其他线程中
+    使用过的encrypter，再用write_prepared写入加密好的数据。
+    """
+    
+    def __init__(self, zipf, zinfo, password=None, encrypter=None, stats=None):
+        self.zipf = zipf
+        self.zinfo = zinfo
+        self.compress_size = 0
+        self.stats = stats
+        
+        zinfo.flag_bits = 0x08  # 使用数据描述符
+        if zinfo.compress_type == pyzipper.ZIP_LZMA:
+            # LZMA压缩数据包含结束标记
+            zinfo.flag_bits |= 0x02
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+        
+        if encrypter is None and password:
+            start = time.perf_counter()
+            encrypter = pyzipper.zipfile_aes.AESZipEncrypter(password)
+            if stats is not None:
+                stats.add("encrypt", time.perf_counter() - start)
+        self.encrypter = encrypter
+        if self.encrypter:
+            zinfo.flag_bits |= 0x01
+            self.encrypter.update_zipinfo(zinfo)
+        
+        # 压缩后可能比原数据略大，与pyzipper一样按1.05倍判断是否需要ZIP64
+        self.zip64 = zipf._allowZip64 and zinfo.file_size * 1.05 > pyzipper.zipfile.ZIP64_LIMIT
+        
+        zinfo.header_offset = zipf.fp.tell()
+        check_entry_writable(zipf, zinfo)
+        zipf._didModify = True
+        zipf.fp.write(zinfo.FileHeader(self.zip64))
+        if self.encrypter:
+            header = self.encrypter.encryption_header()
+            zipf.fp.write(header)
+            self.compress_size += len(header)
+    
+    def write(self, data):
+        if self.encrypter:
+            if self.stats is not None:
+                start = time.perf_counter()
+                size = len(data)
+                data = self.encrypter.encrypt(data)
+                self.stats.add("encrypt", time.perf_counter() - start, size)
+            else:
+                data = self.encrypter.encrypt(data)
+        self.zipf.fp.write(data)
+        self.compress_size += len(data)
+    
+    def write_prepared(self, data):
+        """写入已经加密好（或不需要加密）的数据"""
+        self.zipf.fp.write(data)
+        self.compress_size += len(data)
+    
+    def close(self, crc, file_size):
+        """写入条目结尾，crc和file_size为原始数据的CRC32和大小"""
+        zinfo = self.zinfo
+        if self.encrypter:
+            tail = self.encrypter.flush()
+            self.zipf.fp.write(tail)
+            self.compress_size += len(tail)
+        
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = self.compress_size
+        if self.encrypter:
+            self.encrypter.finalize_zipinfo(zinfo)
+        if not self.zip64 and max(file_size, self.compress_size) > pyzipper.zipfile.ZIP64_LIMIT:
+            raise RuntimeError("文件大小超出ZIP64限制")
+        
+        self.zipf.fp.write(zinfo.datadescripter(self.zip64))
+        self.zipf.start_dir = self.zipf.fp.tell()
+        self.zipf.filelist.append(zinfo)
+        self.zipf.NameToInfo[zinfo.filename] = zinfo
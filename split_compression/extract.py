@@ -0,0 +1,250 @@
+"""解压分卷压缩包：通过VolumeReader直接读取各分卷，不需要先把分卷合并成一个完整的ZIP文件"""
+
+import collections
+import copy
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import CompressCancelled, JobControl, ProgressThrottle, _ignore
+from .index import open_archive
+from .volumes import VolumeReader
+
+def member_target_path(output_dir, filename):
+    """返回条目解压后的路径，去掉盘符、绝对路径和..，保证不会写到输出目录之外"""
+    arcname = filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [part for part in arcname.split(os.path.sep) if part not in ("", os.path.curdir, os.path.pardir)]
+    if os.path.sep == "\\":
+        # Windows文件名中不能出现的字符替换为下划线，末尾的点和空格也会被系统去掉
+        table = str.maketrans(':<>|"?*', "_______")
+        parts = [part.translate(table).rstrip(". ") or "_" for part in parts]
+    if not parts:
+        return None
+    return os.path.join(output_dir, *parts)
+
+def select_members(zipf, members=None):
+    """返回要解压的条目；members为压缩包内的名称，文件夹名称会选中其中的所有条目"""
+    infos = zipf.infolist()
+    if not members:
+        return infos
+    selected = []
+    for name in members:
+        name = name.replace("\\", "/")
+        prefix = name.rstrip("/") + "/"
+        matched = [zinfo for zinfo in infos if zinfo.filename == name or zinfo.filename.startswith(prefix)]
+        if not matched:
+            raise KeyError(f"压缩包中没有：{name}")
+        selected.extend(matched)
+    # 去掉重复选中的条目，保持压缩包中的顺序
+    chosen = {id(zinfo) for zinfo in selected}
+    return [zinfo for zinfo in infos if id(zinfo) in chosen]
+
+def open_entry(zipf, zinfo):
+    """打开一个条目，密码错误或缺少密码时抛出ValueError"""
+    try:
+        return zipf.open(zinfo)
+    except RuntimeError as e:
+        if zinfo.flag_bits & 0x01:
+            raise ValueError(f"密码错误或未提供密码：{zinfo.filename}") from e
+        raise
+
+def partial_path(target):
+    """解压时先写入的临时文件：与目标在同一目录（os.replace不能跨文件系统），
+    文件名带进程和线程编号，不会与压缩包中的文件或其他线程的临时文件重名"""
+    directory, name = os.path.split(target)
+    return os.path.join(directory, f".{name}.{os.getpid()}-{threading.get_ident()}.part")
+
+def restore_attributes(target, zinfo):
+    """恢复修改时间，以及Unix上压缩时记录的权限"""
+    mtime = time.mktime(zinfo.date_time + (0, 0, -1))
+    os.utime(target, (mtime, mtime))
+    mode = (zinfo.external_attr >> 16) & 0o7777
+    if mode and zinfo.create_system == 3 and os.name != "nt":
+        os.chmod(target, mode)
+
+class ExtractJob(JobControl):
+    """把分卷压缩包解压到输出目录，不依赖Qt
+    
+    archive_path可以是任意一个分卷（.zip或.zNN）；callbacks与CompressJob相同：
+    "progress"(总进度0-100.0)、"current_file"(压缩包内名称)、"file_progress"(当前文件进度0-100.0)。
+    run()返回解压出的文件数，取消时抛出CompressCancelled，只写了一半的文件会被删除，
+    输出目录中原有的同名文件保持不变。
+    workers大于1时多个线程同时解压不同的文件，每个线程使用自己的分卷文件句柄；
+    workers为None时使用CPU核数（最多8）个线程。
+    """
+    
+    cancel_message = "解压已取消"
+    
+    def __init__(self, archive_path, output_dir, password=None, members=None, workers=None,
+                 buffer_size=1024 * 1024, callbacks=None):
+        super().__init__()
+        callbacks = callbacks or {}
+        self.on_progress = callbacks.get("progress") or _ignore
+        self.on_current_file = callbacks.get("current_file") or _ignore
+        self.on_file_progress = callbacks.get("file_progress") or _ignore
+        self.archive_path = archive_path
+        self.output_dir = output_dir
+        self.password = password
+        self.members = members
+        # 解压线程数，1表示逐个文件顺序解压
+        self.workers = max(1, workers or min(os.cpu_count() or 1, 8))
+        self.buffer_size = buffer_size
+        self.total_size = 0
+        self.processed_size = 0
+        self.extracted_count = 0
+        self._progress_lock = threading.Lock()
+    
+    def open_archive(self):
+        """打开整组分卷，返回(VolumeReader, AESZipFile)；有索引时不读取中央目录"""
+        reader, zipf = open_archive(self.archive_path)
+        if self.password:
+            zipf.setpassword(self.password.encode())
+        return reader, zipf
+    
+    def extract_member(self, zipf, zinfo):
+        """解压一个条目，返回解压出的路径（跳过的条目返回None）"""
+        target = member_target_path(self.output_dir, zinfo.filename)
+        if target is None:
+            return None
+        if zinfo.is_dir():
+            os.makedirs(target, exist_ok=True)
+            return None
+        
+        self.on_current_file(zinfo.filename)
+        # 多个线程同时解压时单个文件的进度没有意义，只显示总进度
+        show_file_progress = self.workers == 1 and zinfo.file_size > 0
+        if show_file_progress:
+            self.file_throttle.reset()
+            self.file_throttle.update(0.0, force=True)
+        parent = os.path.dirname(target)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        done = 0
+        # 先打开条目（密码错误时在这里就会报错），数据写入临时文件，CRC和HMAC都校验通过后
+        # 才替换目标文件；出错或取消时输出目录中原有的同名文件保持不变
+        temp_path = partial_path(target)
+        with open_entry(zipf, zinfo) as source:
+            try:
+                with open(temp_path, "wb") as f:
+                    while True:
+                        self.check_state()
+                        data = source.read(self.buffer_size)
+                        if not data:
+                            break
+                        f.write(data)
+                        done += len(data)
+                        if show_file_progress:
+                            self.file_throttle.update(round(done / zinfo.file_size * 100.0, 2))
+                        self.add_progress(len(data))
+            except BaseException:
+                # 不留下只写了一半的文件
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        os.replace(temp_path, target)
+        restore_attributes(target, zinfo)
+        if show_file_progress:
+            self.file_throttle.update(100.0, force=True)
+        return target
+    
+    def add_progress(self, size):
+        """累计已解压的字节数并发送总进度（节流）"""
+        with self._progress_lock:
+            self.processed_size += size
+            if self.total_size:
+                self.total_throttle.update(round(min(100.0, self.processed_size / self.total_size * 100.0), 2))
+    
+    def worker_archive(self, zipf, volumes):
+        """为工作线程复制一个压缩包对象：共用已解析的中央目录，但使用自己的分卷文件句柄
+        
+        AESZipFile读取条目时只用到fp和_lock，复制后替换这两个属性，
+        就不需要每个线程都重新读取一遍中央目录。
+        """
+        archive = copy.copy(zipf)
+        archive.fp = VolumeReader(volumes)
+        archive._lock = threading.RLock()
+        archive._fileRefCnt = 1
+        return archive
+    
+    def extract_parallel(self, zipf, volumes, files):
+        """多个线程同时解压，大文件排在前面，避免最后只剩一个线程在解压大文件"""
+        pending = collections.deque(sorted(files, key=lambda zinfo: zinfo.file_size, reverse=True))
+        
+        def work():
+            archive = self.worker_archive(zipf, volumes)
+            try:
+                while True:
+                    try:
+                        zinfo = pending.popleft()
+                    except IndexError:
+                        return
+                    self.check_state()
+                    if self.extract_member(archive, zinfo):
+                        with self._progress_lock:
+                            self.extracted_count += 1
+            except BaseException:
+                # 一个线程出错时让其他线程尽快停下
+                self.cancel()
+                raise
+            finally:
+                archive.fp.close()
+        
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(files))) as executor:
+            futures = [executor.submit(work) for _ in range(min(self.workers, len(files)))]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        # 优先报告真正的错误，而不是因此被取消的其他线程
+        for error in errors:
+            if not isinstance(error, CompressCancelled):
+                raise error
+        if errors:
+            raise errors[0]
+    
+    def prepare_files(self, infos):
+        """先建好所有文件夹，返回要解压的文件条目
+        
+        同名的条目只解压最后一个，与顺序解压时后写入的覆盖先写入的结果一致。
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        files = {}
+        for zinfo in infos:
+            target = member_target_path(self.output_dir, zinfo.filename)
+            if target is None:
+                continue
+            if zinfo.is_dir():
+                os.makedirs(target, exist_ok=True)
+            else:
+                files.pop(target, None)
+                files[target] = zinfo
+        return list(files.values())
+    
+    def run(self):
+        """执行解压，返回解压出的文件数"""
+        self.file_throttle = ProgressThrottle(self.on_file_progress)
+        self.total_throttle = ProgressThrottle(self.on_progress)
+        reader, zipf = self.open_archive()
+        try:
+            files = self.prepare_files(select_members(zipf, self.members))
+            self.total_size = sum(zinfo.file_size for zinfo in files)
+            self.processed_size = 0
+            self.on_progress(0.0)
+            
+            if self.workers > 1 and len(files) > 1:
+                self.extract_parallel(zipf, reader.volumes, files)
+            else:
+                for zinfo in files:
+                    self.check_state()
+                    if self.extract_member(zipf, zinfo):
+                        self.extracted_count += 1
+        finally:
+            zipf.close()
+            reader.close()
+        self.on_progress(100.0)
+        return self.extracted_count
+
+def extract_volumes(archive_path, output_dir, password=None, members=None, workers=None, callbacks=None):
+    """把分卷压缩包解压到输出目录，返回解压出的文件数"""
+    return ExtractJob(archive_path, output_dir, password, members, workers, callbacks=callbacks).run()
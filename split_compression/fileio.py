@@ -0,0 +1,108 @@
+"""大文件的顺序读写：可调的缓冲区大小、posix_fadvise和mmap输入
+
+压缩一个很大的文件夹时，源文件和分卷都只会顺序经过一次，留在页缓存里只会把
+其他程序常用的数据挤出去。支持posix_fadvise的系统（Linux等）上，打开源文件时
+声明为顺序读取（内核加大预读），每处理完一段就通知内核可以丢弃这段页缓存；
+不支持的系统（Windows）上这些调用都不做任何事。
+"""
+
+import mmap
+import os
+
+DEFAULT_READ_BUFFER = 1024 * 1024  # 每次读取并送入压缩器的数据块大小
+DEFAULT_WRITE_BUFFER = 1024 * 1024  # 分卷文件的写缓冲区，合并ZIP文件头等零碎的小块写入
+DROP_CACHE_INTERVAL = 8 * 1024 * 1024  # 每处理这么多字节通知内核一次，小于该大小的文件不处理
+
+def fadvise(fd, offset, length, advice):
+    """调用os.posix_fadvise，advice为os中的常量名（例如"POSIX_FADV_DONTNEED"），不支持时忽略"""
+    value = getattr(os, advice, None)
+    if value is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, value)
+    except OSError:
+        pass
+
+class CacheDropper:
+    """顺序读写一个文件时，每前进interval字节就丢弃已经处理过的那一段页缓存"""
+    
+    def __init__(self, fd, interval=DROP_CACHE_INTERVAL):
+        self.fd = fd
+        self.interval = interval
+        self.dropped = 0  # 已经通知过的位置
+    
+    def advance(self, position):
+        """position之前的数据已经处理完（写入时应已交给内核）"""
+        if position - self.dropped >= self.interval:
+            fadvise(self.fd, self.dropped, position - self.dropped, "POSIX_FADV_DONTNEED")
+            self.dropped = position
+    
+    def finish(self, size):
+        """文件处理完毕：不小于interval的文件丢弃全部页缓存"""
+        if size >= self.interval:
+            fadvise(self.fd, 0, 0, "POSIX_FADV_DONTNEED")
+
+class InputFile:
+    """顺序读取一个源文件的只读文件对象
+    
+    不使用Python的读缓冲区：每次read直接读入返回的bytes，没有中间复制。
+    文件不小于mmap_threshold（0表示不使用）时改为内存映射，read返回映射上的
+    memoryview切片，数据不复制，直接交给zlib、CRC32和AES处理。
+    drop_cache为True时打开时声明顺序读取，读过的部分定期丢弃页缓存。
+    """
+    
+    def __init__(self, path, drop_cache=False, mmap_threshold=0):
+        self._file = open(path, 'rb', buffering=0)
+        fd = self._file.fileno()
+        self.size = os.fstat(fd).st_size
+        self.position = 0
+        self._dropper = None
+        if drop_cache:
+            fadvise(fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            self._dropper = CacheDropper(fd)
+        self._map = None
+        self._view = None
+        if mmap_threshold and self.size >= mmap_threshold:
+            try:
+                self._map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # 某些文件系统或特殊文件不支持映射，改为普通读取
+                self._map = None
+            else:
+                if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+                self._view = memoryview(self._map)
+    
+    def read(self, size=-1):
+        if self._view is not None:
+            end = len(self._view) if size is None or size < 0 else min(len(self._view), self.position + size)
+            chunk = self._view[self.position:end]
+        elif size is None or size < 0:
+            chunk = self._file.readall()
+        else:
+            chunk = self._file.read(size)
+        self.position += len(chunk)
+        if self._dropper is not None:
+            self._dropper.advance(self.position)
+        return chunk
+    
+    def close(self):
+        if self._dropper is not None:
+            self._dropper.finish(self.size)
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # 还有数据块在其他线程中使用，映射在这些数据块释放后由垃圾回收解除
+                pass
+            self._map = None
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,133 @@
+"""增量压缩：清单缓存和上次生成的分卷"""
+
+import copy
+import functools
+import itertools
+import json
+import os
+import zlib
+
+import pyzipper
+
+from .entries import check_entry_writable
+from .volumes import VolumeReader
+
+def manifest_cache_path(output_base):
+    """增量压缩使用的清单缓存文件，保存在分卷旁边"""
+    return f"{output_base}.manifest.json"
+
+def load_manifest_cache(cache_path):
+    """读取清单缓存，返回(压缩选项, {压缩包内名称: [大小, 修改时间]})，不存在或损坏时返回None"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != 1:
+        return None
+    return cache.get("options"), cache.get("files", {})
+
+def save_manifest_cache(cache_path, options, manifest):
+    """保存本次压缩的文件清单，先写临时文件再替换，避免留下不完整的缓存"""
+    cache = {
+        "version": 1,
+        "options": options,
+        "files": {entry.arcname: [entry.size, entry.mtime] for entry in manifest},
+    }
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, cache_path)
+
+class PreviousArchive:
+    """上一次生成的分卷压缩包，增量压缩时从中直接复制未变化文件的条目数据
+    
+    条目按原样复制（本地文件头、压缩/加密后的数据和数据描述符），不需要解压和重新压缩，
+    只在中央目录中登记新的偏移量。
+    """
+    
+    def __init__(self, volumes, cached_files, password=None):
+        self.volumes = volumes
+        self.cached_files = cached_files
+        self.reader = VolumeReader(volumes)
+        try:
+            self.zipf = pyzipper.AESZipFile(self.reader)
+        except Exception:
+            self.reader.close()
+            raise
+        if password:
+            self.zipf.setpassword(password)
+        
+        # 我们写出的条目是连续排列的，每个条目的数据一直延续到下一个条目（或中央目录）开始
+        infos = sorted(self.zipf.infolist(), key=lambda zinfo: zinfo.header_offset)
+        self.entries = {}
+        for zinfo, next_info in itertools.zip_longest(infos, infos[1:]):
+            end = next_info.header_offset if next_info else self.zipf.start_dir
+            self.entries[zinfo.filename] = (zinfo, end)
+    
+    def check_password(self):
+        """检查密码与上次是否一致（只校验AES的密码验证值，不解压数据）"""
+        for zinfo, _ in self.entries.values():
+            if zinfo.flag_bits & 0x01:
+                try:
+                    self.zipf.open(zinfo).close()
+                except RuntimeError:
+                    return False
+                return True
+        return True
+    
+    def find_unchanged(self, entry, verify_content=False, check_state=None):
+        """返回上次压缩包中与该文件对应且内容未变化的条目，没有时返回None
+        
+        大小和修改时间都与缓存一致时认为未变化；verify_content为True时，
+        修改时间变化但大小相同的文件再比较一次CRC32（需要读取整个文件，但不压缩）。
+        """
+        cached = self.cached_files.get(entry.arcname)
+        found = self.entries.get(entry.arcname)
+        if cached is None or found is None:
+            return None
+        zinfo = found[0]
+        if cached[0] != entry.size or zinfo.file_size != entry.size:
+            return None
+        if cached[1] == entry.mtime:
+            return zinfo
+        # AE-2加密的条目不保存CRC，无法比较内容
+        if verify_content and not getattr(zinfo, 'wz_aes_version', None) == 2:
+            crc = 0
+            with open(entry.path, 'rb') as f:
+                for chunk in iter(functools.partial(f.read, 1024 * 1024), b''):
+                    if check_state:
+                        check_state()
+                    crc = zlib.crc32(chunk, crc)
+            if crc == zinfo.CRC:
+                return zinfo
+        return None
+    
+    def copy_entry(self, zipf, zinfo, buffer_size=1024 * 1024, check_state=None):
+        """把上次的条目原样复制到正在写入的ZIP中，返回新条目信息"""
+        start = zinfo.header_offset
+        end = self.entries[zinfo.filename][1]
+        new_zinfo = copy.copy(zinfo)
+        new_zinfo.header_offset = zipf.fp.tell()
+        check_entry_writable(zipf, new_zinfo)
+        zipf._didModify = True
+        
+        self.reader.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            if check_state:
+                check_state()
+            data = self.reader.read(min(buffer_size, remaining))
+            if not data:
+                raise pyzipper.BadZipFile(f"上次的压缩包不完整：{zinfo.filename}")
+            zipf.fp.write(data)
+            remaining -= len(data)
+        
+        zipf.start_dir = zipf.fp.tell()
+        zipf.filelist.append(new_zinfo)
+        zipf.NameToInfo[new_zinfo.filename] = new_zinfo
+        return new_zinfo
+    
+    def close(self):
+        self.zipf.close()
+        self.reader.close()
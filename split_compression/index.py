@@ -0,0 +1,184 @@
+"""只读取中央目录的快速列表，以及分卷旁边的索引文件
+
+列出或搜索压缩包时只需要读取结束记录和中央目录，它们位于最后一个（或最后几个）分卷中；
+索引文件（源文件名.index.json）在压缩完成时写出，记录每个条目的名称、偏移、所在分卷、
+大小和CRC，有索引时连中央目录都不用读，解压单个文件也只打开该文件所在的分卷。
+"""
+
+import fnmatch
+import json
+import os
+
+import pyzipper
+
+from .codecs import get_decompressor
+from .volumes import VolumeReader, find_volume_set, volume_base
+
+INDEX_VERSION = 1
+# 索引中每个条目按这个顺序保存为一个数组，比保存为对象小得多
+INDEX_FIELDS = (
+    "name", "offset", "volume", "csize", "size", "crc", "method", "flags",
+    "time", "attr", "system", "version", "aes",
+)
+
+class ArchiveEntryInfo(pyzipper.zipfile_aes.AESZipInfo):
+    """带有所在分卷序号（volume_index，从0开始）的条目信息"""
+    
+    __slots__ = ('volume_index',)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.volume_index = 0
+
+class ArchiveExtFile(pyzipper.zipfile_aes.AESZipExtFile):
+    """条目读取对象，在pyzipper的基础上支持Zstandard"""
+    
+    def get_decompressor(self, compress_type):
+        return get_decompressor(compress_type) or super().get_decompressor(compress_type)
+
+class ArchiveZipFile(pyzipper.AESZipFile):
+    """读取分卷压缩包的AESZipFile，条目信息使用ArchiveEntryInfo，并且能读取Zstandard条目"""
+    
+    zipinfo_cls = ArchiveEntryInfo
+    zipextfile_cls = ArchiveExtFile
+
+def index_path(output_base):
+    """索引文件保存在分卷旁边"""
+    return f"{output_base}.index.json"
+
+def volume_stamps(volumes):
+    """分卷的(大小, 修改时间)，用来判断索引是否还对应这组分卷"""
+    stamps = []
+    for volume in volumes:
+        stat = os.stat(volume)
+        stamps.append([stat.st_size, stat.st_mtime_ns])
+    return stamps
+
+def entry_to_row(zinfo, volume):
+    aes = None
+    if getattr(zinfo, 'wz_aes_vendor_id', None) is not None:
+        aes = [zinfo.wz_aes_version, zinfo.wz_aes_vendor_id.decode('ascii'), zinfo.wz_aes_strength]
+    return [
+        zinfo.filename, zinfo.header_offset, volume, zinfo.compress_size, zinfo.file_size,
+        zinfo.CRC, zinfo.compress_type, zinfo.flag_bits, list(zinfo.date_time), zinfo.external_attr,
+        zinfo.create_system, [zinfo.create_version, zinfo.extract_version], aes,
+    ]
+
+def entry_from_row(row):
+    record = dict(zip(INDEX_FIELDS, row))
+    zinfo = ArchiveEntryInfo(record["name"], tuple(record["time"]))
+    zinfo.header_offset = record["offset"]
+    zinfo.volume_index = record["volume"]
+    zinfo.compress_size = record["csize"]
+    zinfo.file_size = record["size"]
+    zinfo.CRC = record["crc"]
+    zinfo.compress_type = record["method"]
+    zinfo.flag_bits = record["flags"]
+    zinfo.external_attr = record["attr"]
+    zinfo.create_system = record["system"]
+    zinfo.create_version, zinfo.extract_version = record["version"]
+    if record["aes"]:
+        zinfo.wz_aes_version = record["aes"][0]
+        zinfo.wz_aes_vendor_id = record["aes"][1].encode('ascii')
+        zinfo.wz_aes_strength = record["aes"][2]
+    return zinfo
+
+def read_central_directory(reader):
+    """只读取结束记录和中央目录，返回条目列表，每个条目的volume_index为其所在的分卷序号"""
+    with ArchiveZipFile(reader) as zipf:
+        infos = zipf.infolist()
+        start_dir = zipf.start_dir
+    for zinfo in infos:
+        zinfo.volume_index = reader.locate(zinfo.header_offset)[0] if reader.size else 0
+    return infos, start_dir
+
+def write_index(volumes):
+    """读取这组分卷的中央目录，在分卷旁边写出索引文件，返回索引文件路径"""
+    output_base = volume_base(volumes[-1])
+    with VolumeReader(volumes) as reader:
+        infos, start_dir = read_central_directory(reader)
+    data = {
+        "version": INDEX_VERSION,
+        "volumes": [os.path.basename(volume) for volume in volumes],
+        "stamps": volume_stamps(volumes),
+        "start_dir": start_dir,
+        "fields": INDEX_FIELDS,
+        "entries": [entry_to_row(zinfo, zinfo.volume_index) for zinfo in infos],
+    }
+    path = index_path(output_base)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+    return path
+
+def load_index(volumes):
+    """读取这组分卷的索引，返回(条目列表, 中央目录位置)；没有索引或索引已过期时返回None"""
+    path = index_path(volume_base(volumes[-1]))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (data.get("version") != INDEX_VERSION
+            or data.get("fields") != list(INDEX_FIELDS)
+            or data.get("volumes") != [os.path.basename(volume) for volume in volumes]
+            or data.get("stamps") != volume_stamps(volumes)):
+        return None
+    try:
+        return [entry_from_row(row) for row in data["entries"]], data["start_dir"]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class IndexedZipFile(ArchiveZipFile):
+    """使用索引文件中的条目信息，不读取中央目录的AESZipFile"""
+    
+    def __init__(self, file, entries, start_dir):
+        self._index_entries = entries
+        self._index_start_dir = start_dir
+        super().__init__(file)
+    
+    def _RealGetContents(self):
+        self._comment = b""
+        self.start_dir = self._index_start_dir
+        for zinfo in self._index_entries:
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+
+def open_archive(path, use_index=True):
+    """打开path（任意一个分卷）所属的分卷压缩包，返回(VolumeReader, AESZipFile)
+    
+    有有效的索引时不读取中央目录；否则只读取最后几个分卷中的中央目录。
+    条目数据所在的分卷在读取时才会打开。
+    """
+    reader = VolumeReader.open(path)
+    try:
+        index = load_index(reader.volumes) if use_index else None
+        if index:
+            zipf = IndexedZipFile(reader, *index)
+        else:
+            zipf = ArchiveZipFile(reader)
+    except Exception:
+        reader.close()
+        raise
+    return reader, zipf
+
+def list_archive(path, use_index=True):
+    """返回压缩包中的条目列表，每个条目的volume_index为其所在的分卷序号"""
+    volumes = find_volume_set(path)
+    index = load_index(volumes) if use_index else None
+    if index:
+        return index[0]
+    with VolumeReader(volumes) as reader:
+        return read_central_directory(reader)[0]
+
+def search_entries(entries, pattern):
+    """按名称搜索条目：含有*?[时按通配符匹配完整路径或文件名，否则按子串匹配，都不区分大小写"""
+    pattern = pattern.lower()
+    if any(char in pattern for char in "*?["):
+        return [
+            zinfo for zinfo in entries
+            if fnmatch.fnmatchcase(zinfo.filename.lower(), pattern)
+            or fnmatch.fnmatchcase(zinfo.filename.rstrip("/").rsplit("/", 1)[-1].lower(), pattern)
+        ]
+    return [zinfo for zinfo in entries if pattern in zinfo.filename.lower()]
@@ -0,0 +1,96 @@
+"""一次扫描得到的源文件清单"""
+
+import itertools
+import os
+import time
+
+class ManifestEntry:
+    """文件清单中的一条记录（使用__slots__，数百万个文件时也只占用少量内存）"""
+    __slots__ = ('path', 'arcname', 'size', 'mtime', 'mode')
+    
+    def __init__(self, path, arcname, size, mtime, mode):
+        self.path = path
+        self.arcname = arcname
+        self.size = size
+        self.mtime = mtime
+        self.mode = mode
+
+def _scan_directory(dir_path, rel_dir):
+    """扫描单个目录，返回(文件记录列表, 子目录列表)，不递归"""
+    files = []
+    subdirs = []
+    with os.scandir(dir_path) as it:
+        for dir_entry in it:
+            arcname = os.path.join(rel_dir, dir_entry.name)
+            # 与os.walk一致：指向目录的符号链接不进入，指向文件的符号链接按文件处理
+            if dir_entry.is_dir():
+                if not dir_entry.is_symlink():
+                    subdirs.append((dir_entry.path, arcname))
+                continue
+            st = dir_entry.stat()
+            files.append(ManifestEntry(dir_entry.path, arcname, st.st_size, st.st_mtime, st.st_mode))
+    return files, subdirs
+
+def scan_source(path, workers=8, check_state=None):
+    """一次扫描得到要压缩的文件清单，返回ManifestEntry列表
+    
+    使用os.scandir，目录项自带的类型信息不需要额外的系统调用；同一层的子目录
+    在线程池中并行扫描（网络共享上主要是等待延迟）。结果顺序与os.walk自顶向下
+    遍历相同：先是目录中的文件，再依次是各子目录的内容。
+    """
+    if os.path.isfile(path):
+        st = os.stat(path)
+        return [ManifestEntry(path, os.path.basename(path), st.st_size, st.st_mtime, st.st_mode)]
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    results = {}  # 目录路径 -> (文件记录列表, 子目录列表)
+    level = [(path, '')]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while level:
+            if check_state:
+                check_state()
+            scanned = executor.map(lambda item: _scan_directory(*item), level)
+            next_level = []
+            for (dir_path, _), result in zip(level, scanned):
+                results[dir_path] = result
+                next_level.extend(result[1])
+            level = next_level
+    
+    # 按os.walk的顺序拼接各目录的扫描结果
+    manifest = []
+    stack = [path]
+    while stack:
+        files, subdirs = results.pop(stack.pop())
+        manifest.extend(files)
+        stack.extend(dir_path for dir_path, _ in reversed(subdirs))
+    return manifest
+
+def small_file_runs(files_list, size_limit, min_run):
+    """把文件清单按原顺序分成连续的段，返回[(是否为小文件段, 文件列表), ...]
+    
+    不超过size_limit字节的文件连续至少min_run个时单独成段，
+    更短的小文件段并入相邻的普通段，避免频繁切换压缩方式。
+    """
+    runs = []
+    for small, group in itertools.groupby(files_list, key=lambda entry: entry.size <= size_limit):
+        group = list(group)
+        small = small and len(group) >= min_run
+        if runs and runs[-1][0] == small:
+            runs[-1][1].extend(group)
+        else:
+            runs.append((small, group))
+    return runs
+
+def make_zipinfo(zipinfo_cls, entry):
+    """根据清单记录创建条目信息（与ZipInfo.from_file相同，但不再重复stat）"""
+    date_time = time.localtime(entry.mtime)[0:6]
+    # ZIP的时间戳只能表示1980-2107年
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    elif date_time[0] > 2107:
+        date_time = (2107, 12, 31, 23, 59, 59)
+    zinfo = zipinfo_cls(entry.arcname, date_time)
+    zinfo.external_attr = (entry.mode & 0xFFFF) << 16
+    zinfo.file_size = entry.size
+    return zinfo
@@ -0,0 +1,426 @@
+"""恢复卷（Reed–Solomon纠删码）：压缩时与分卷同步生成，分卷丢失或损坏时用来修复
+
+把每个分卷看作一个数据块（比分卷大小短的部分按0补齐），第j个恢复卷的第b个字节为
+    P_j[b] = C[j][0]·D_0[b] ⊕ C[j][1]·D_1[b] ⊕ ...    （GF(256)上的运算）
+C为柯西矩阵C[j][i] = 1/((255 - j) ⊕ i)，系数只与分卷序号有关，压缩时不需要预先知道分卷总数，
+每写入一块数据就累加到各恢复卷的相同位置。柯西矩阵的任意方阵子矩阵都可逆，
+因此m个恢复卷可以修复任意m个丢失或损坏的分卷（或恢复卷）。分卷数加上恢复卷数不能超过256。
+
+恢复卷为源文件名.r01, .r02...，源文件名.parity.json记录各分卷和恢复卷的大小和校验和。
+GF(256)乘法使用NumPy查表向量化计算：每次查两个字节（65536项的表），比逐字节查表快好几倍；
+numpy为可选依赖。
+"""
+
+import functools
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .checksums import hash_file
+
+PARITY_VERSION = 1
+GF_POLYNOMIAL = 0x11d  # GF(256)的本原多项式 x^8 + x^4 + x^3 + x^2 + 1
+MAX_SHARDS = 256  # 分卷数加恢复卷数的上限
+
+def _build_tables():
+    exp = [0] * 512
+    log = [0] * 256
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        log[value] = power
+        value <<= 1
+        if value & 0x100:
+            value ^= GF_POLYNOMIAL
+    for power in range(255, 512):
+        exp[power] = exp[power - 255]
+    return exp, log
+
+_EXP, _LOG = _build_tables()
+_mul_table = None
+
+def is_numpy_available():
+    """是否安装了numpy模块（恢复卷为可选功能），只查找不导入，不会拖慢界面启动"""
+    return importlib.util.find_spec("numpy") is not None
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("使用恢复卷需要安装numpy模块：pip install numpy")
+    return numpy
+
+def gf_inverse(value):
+    if value == 0:
+        raise ZeroDivisionError("GF(256)中0没有倒数")
+    return _EXP[255 - _LOG[value]]
+
+def mul_table():
+    """256×256的GF(256)乘法表，mul_table()[c][data]即为c乘以data中的每个字节"""
+    global _mul_table
+    if _mul_table is None:
+        np = _numpy()
+        log = np.array(_LOG, dtype=np.int32)
+        table = np.array(_EXP, dtype=np.uint8)[log[:, None] + log[None, :]]
+        table[0, :] = 0
+        table[:, 0] = 0
+        _mul_table = table
+    return _mul_table
+
+@functools.lru_cache(maxsize=64)
+def wide_mul_table(coefficient):
+    """按两个字节查的乘法表：wide_mul_table(c)[x]为c分别乘以uint16 x的两个字节"""
+    np = _numpy()
+    row = mul_table()[coefficient].astype(np.uint16)
+    pairs = np.arange(65536, dtype=np.uint32)
+    return (row[pairs >> 8] << 8) | row[pairs & 0xff]
+
+def multiply(coefficient, data, out):
+    """out = coefficient·data（data和out为等长的uint8数组）"""
+    np = _numpy()
+    even = len(data) & ~1
+    # mode="clip"跳过下标越界检查，uint16的下标不会越界
+    np.take(wide_mul_table(coefficient), data[:even].view(np.uint16), out=out[:even].view(np.uint16), mode="clip")
+    if even != len(data):
+        out[-1] = mul_table()[coefficient][data[-1]]
+    return out
+
+def parity_coefficient(parity_index, volume_index):
+    """第volume_index个分卷在第parity_index个恢复卷中的系数（序号都从0开始）"""
+    return gf_inverse((255 - parity_index) ^ volume_index)
+
+def combine(coefficients, chunks, size):
+    """返回 Σ coefficients[i]·chunks[i]，长度为size，较短的数据块按0补齐"""
+    np = _numpy()
+    result = np.zeros(size, dtype=np.uint8)
+    product = np.empty(size, dtype=np.uint8)
+    for coefficient, chunk in zip(coefficients, chunks):
+        if coefficient and len(chunk):
+            data = np.frombuffer(chunk, dtype=np.uint8)
+            if coefficient == 1:
+                result[:len(data)] ^= data
+            else:
+                result[:len(data)] ^= multiply(coefficient, data, product[:len(data)])
+    return result
+
+def invert_matrix(matrix):
+    """GF(256)上的矩阵求逆（高斯消元，每次处理一整行）"""
+    np = _numpy()
+    table = mul_table()
+    size = len(matrix)
+    left = np.array(matrix, dtype=np.uint8)
+    right = np.eye(size, dtype=np.uint8)
+    for column in range(size):
+        pivot = next((row for row in range(column, size) if left[row, column]), None)
+        if pivot is None:
+            raise ValueError("系数矩阵不可逆")
+        if pivot != column:
+            left[[column, pivot]] = left[[pivot, column]]
+            right[[column, pivot]] = right[[pivot, column]]
+        factor = gf_inverse(int(left[column, column]))
+        left[column] = table[factor][left[column]]
+        right[column] = table[factor][right[column]]
+        for row in range(size):
+            value = int(left[row, column])
+            if row != column and value:
+                left[row] ^= table[value][left[column]]
+                right[row] ^= table[value][right[column]]
+    return right
+
+def parity_volume_name(output_base, index):
+    """恢复卷文件名：.r01, .r02..."""
+    return f"{output_base}.r{str(index).zfill(2)}"
+
+def parity_manifest_path(output_base):
+    return f"{output_base}.parity.json"
+
+def list_parity_volumes(output_base):
+    """返回已有的恢复卷文件"""
+    volumes = []
+    index = 1
+    while os.path.isfile(parity_volume_name(output_base, index)):
+        volumes.append(parity_volume_name(output_base, index))
+        index += 1
+    return volumes
+
+def remove_parity(output_base):
+    """删除上次留下的恢复卷和恢复卷清单，它们已经不对应新的分卷"""
+    for path in list_parity_volumes(output_base) + [parity_manifest_path(output_base)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class ParityWriter:
+    """交给VolumeWriter使用，在写入分卷的同时累加生成恢复卷
+    
+    数据先攒到buffer_size再计算，每次计算把对应位置上已有的恢复卷数据读出来、
+    异或上本块数据的乘积后写回。恢复卷文件只有分卷大小那么大，内存占用与分卷数无关。
+    encode_time / encoded_bytes记录计算恢复卷的耗时和数据量，用来了解对压缩速度的影响。
+    """
+    
+    def __init__(self, output_base, count, buffer_size=4 * 1024 * 1024):
+        if not 1 <= count < MAX_SHARDS:
+            raise ValueError(f"恢复卷数必须在1-{MAX_SHARDS - 1}之间")
+        mul_table()  # 提前检查numpy是否可用
+        self.output_base = output_base
+        self.count = count
+        self.buffer_size = buffer_size
+        self.paths = [parity_volume_name(output_base, index + 1) for index in range(count)]
+        self.shard_size = 0  # 最长的分卷的大小，即每个恢复卷的大小
+        self.encode_time = 0.0
+        self.encoded_bytes = 0
+        self._files = None
+        self._buffer = bytearray()
+        self._volume_index = 0  # 缓冲区中的数据所属的分卷
+        self._offset = 0  # 缓冲区中的数据在该分卷中的位置
+    
+    @property
+    def max_volumes(self):
+        return MAX_SHARDS - self.count
+    
+    def reset(self):
+        """清空恢复卷，从头开始累加（从检查点恢复时，检查点之前的数据会重新送进来）"""
+        self._close_files()
+        self._files = [open(path, 'w+b') for path in self.paths]
+        self._buffer = bytearray()
+        self._volume_index = self._offset = 0
+        self.shard_size = 0
+    
+    def update(self, volume_index, data):
+        """第volume_index个分卷（从0开始）接着写入了data"""
+        if self._files is None:
+            self.reset()
+        if volume_index != self._volume_index:
+            self.flush()
+            self._volume_index = volume_index
+            self._offset = 0
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        """把缓冲区中的数据累加到各个恢复卷"""
+        if not self._buffer:
+            return
+        if self._volume_index >= self.max_volumes:
+            raise ValueError(f"使用{self.count}个恢复卷时最多只能有{self.max_volumes}个分卷，请增大分卷大小")
+        np = _numpy()
+        start = time.perf_counter()
+        size = len(self._buffer)
+        data = np.frombuffer(self._buffer, dtype=np.uint8)
+        product = np.empty(size, dtype=np.uint8)
+        existing = np.empty(size, dtype=np.uint8)
+        for parity_index, f in enumerate(self._files):
+            multiply(parity_coefficient(parity_index, self._volume_index), data, product)
+            # 读出恢复卷中对应位置已有的数据（第一个分卷时为空），异或后写回
+            f.seek(self._offset)
+            count = f.readinto(memoryview(existing))
+            product[:count] ^= existing[:count]
+            f.seek(self._offset)
+            f.write(product)
+        self._offset += size
+        self.shard_size = max(self.shard_size, self._offset)
+        self.encoded_bytes += size
+        self.encode_time += time.perf_counter() - start
+        self._buffer = bytearray()
+    
+    def _close_files(self):
+        if self._files is not None:
+            for f in self._files:
+                f.close()
+            self._files = None
+    
+    def close(self):
+        """写完所有恢复卷，返回恢复卷路径列表"""
+        if self._files is None:
+            self.reset()
+        self.flush()
+        self._close_files()
+        return self.paths
+    
+    def suspend(self):
+        """中断但保留恢复卷（从检查点恢复时会重新生成）"""
+        self._close_files()
+    
+    def abort(self):
+        """放弃写入，删除恢复卷"""
+        self._close_files()
+        for path in self.paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def format_summary(self):
+        speed = self.encoded_bytes / self.encode_time / 1024 / 1024 if self.encode_time else 0.0
+        return f"恢复卷：{self.count}个，生成耗时{self.encode_time:.2f}秒（{speed:.1f} MB/s）"
+
+def write_parity_manifest(output_base, algorithm, volumes, volume_digests, parity_volumes, workers=None):
+    """写出恢复卷清单：各分卷和恢复卷的文件名、大小和校验和（恢复卷的校验和在这里计算）"""
+    with ThreadPoolExecutor(max_workers=workers or min(len(parity_volumes), os.cpu_count() or 1)) as executor:
+        parity_digests = list(executor.map(lambda path: hash_file(path, algorithm), parity_volumes))
+    data = {
+        "version": PARITY_VERSION,
+        "algorithm": algorithm,
+        "shard_size": max(os.path.getsize(volume) for volume in volumes),
+        "volumes": [
+            [os.path.basename(path), os.path.getsize(path), digest]
+            for path, digest in zip(volumes, volume_digests)
+        ],
+        "parity": [
+            [os.path.basename(path), os.path.getsize(path), digest]
+            for path, digest in zip(parity_volumes, parity_digests)
+        ],
+    }
+    path = parity_manifest_path(output_base)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+    return path
+
+def load_parity_manifest(output_base):
+    """读取恢复卷清单，没有清单时抛出FileNotFoundError"""
+    with open(parity_manifest_path(output_base), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != PARITY_VERSION:
+        raise ValueError("恢复卷清单的版本不受支持")
+    return data
+
+def check_shards(output_base, manifest, workers=None, check_state=None):
+    """检查清单中的各分卷和恢复卷，返回每个文件是否完好的列表（分卷在前，恢复卷在后）"""
+    directory = os.path.dirname(output_base)
+    records = manifest["volumes"] + manifest["parity"]
+    
+    def check(record):
+        name, size, digest = record
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getsize(path) != size:
+                return False
+        except OSError:
+            return False
+        return hash_file(path, manifest["algorithm"], check_state=check_state) == digest
+    
+    workers = workers or min(len(records), os.cpu_count() or 1, 8)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(check, records))
+
+def _read_chunks(files, offset, size):
+    chunks = []
+    for f in files:
+        f.seek(offset)
+        chunks.append(f.read(size))
+    return chunks
+
+def _rebuild(sources, coefficient_rows, targets, shard_size, buffer_size, check_state):
+    """按块读取sources，把第t行系数的组合写入targets[t]（各自截断到记录的大小）"""
+    files = [open(path, 'rb') for path in sources]
+    outputs = [(open(path, 'wb'), size) for path, size in targets]
+    try:
+        for offset in range(0, shard_size, buffer_size):
+            if check_state:
+                check_state()
+            size = min(buffer_size, shard_size - offset)
+            chunks = _read_chunks(files, offset, size)
+            for coefficients, (f, target_size) in zip(coefficient_rows, outputs):
+                if offset < target_size:
+                    f.write(combine(coefficients, chunks, size)[:target_size - offset])
+    finally:
+        for f in files:
+            f.close()
+        for f, _ in outputs:
+            f.close()
+
+def repair_volumes(path, workers=None, buffer_size=1024 * 1024, check_state=None):
+    """用恢复卷修复path（任意一个分卷）所属的分卷组，返回修复的文件路径列表
+    
+    丢失或损坏的分卷和恢复卷合计不超过恢复卷数时才能修复，否则抛出ValueError。
+    修复结果先写到临时文件，校验和一致后才替换原文件。
+    """
+    from .volumes import volume_base
+    
+    output_base = volume_base(path)
+    manifest = load_parity_manifest(output_base)
+    directory = os.path.dirname(output_base)
+    volume_records = manifest["volumes"]
+    parity_records = manifest["parity"]
+    volume_count = len(volume_records)
+    shard_size = manifest["shard_size"]
+    
+    good = check_shards(output_base, manifest, workers, check_state)
+    bad = [index for index, ok in enumerate(good) if not ok]
+    if not bad:
+        return []
+    if len(bad) > len(parity_records):
+        raise ValueError(f"有{len(bad)}个分卷或恢复卷丢失或损坏，{len(parity_records)}个恢复卷最多只能修复{len(parity_records)}个")
+    
+    records = volume_records + parity_records
+    paths = [os.path.join(directory, record[0]) for record in records]
+    temp_paths = {index: paths[index] + ".repair" for index in bad}
+    bad_volumes = [index for index in bad if index < volume_count]
+    bad_parity = [index for index in bad if index >= volume_count]
+    try:
+        if bad_volumes:
+            # 取volume_count个完好的块：完好的分卷加上若干完好的恢复卷，解出丢失的分卷
+            rows = [index for index in range(volume_count) if good[index]]
+            rows += [index for index in range(volume_count, len(records)) if good[index]][:len(bad_volumes)]
+            matrix = [
+                [int(index == column) for column in range(volume_count)] if index < volume_count
+                else [parity_coefficient(index - volume_count, column) for column in range(volume_count)]
+                for index in rows
+            ]
+            inverse = invert_matrix(matrix)
+            _rebuild(
+                [paths[index] for index in rows],
+                [[int(value) for value in inverse[index]] for index in bad_volumes],
+                [(temp_paths[index], records[index][1]) for index in bad_volumes],
+                shard_size, buffer_size, check_state,
+            )
+        if bad_parity:
+            # 分卷都已齐全（丢失的已经解出到临时文件），重新计算丢失的恢复卷
+            sources = [temp_paths.get(index, paths[index]) for index in range(volume_count)]
+            _rebuild(
+                sources,
+                [[parity_coefficient(index - volume_count, column) for column in range(volume_count)]
+                 for index in bad_parity],
+                [(temp_paths[index], records[index][1]) for index in bad_parity],
+                shard_size, buffer_size, check_state,
+            )
+        for index in bad:
+            if hash_file(temp_paths[index], manifest["algorithm"]) != records[index][2]:
+                raise ValueError(f"修复后的校验和不一致：{paths[index]}")
+    except BaseException:
+        for temp_path in temp_paths.values():
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+        raise
+    for index in bad:
+        os.replace(temp_paths[index], paths[index])
+    return [paths[index] for index in bad]
+
+def benchmark_parity(volume_count=8, parity_count=2, volume_size=16 * 1024 * 1024, directory=None):
+    """测量生成恢复卷的速度，返回{"bytes", "seconds", "mb_per_s"}
+    
+    与压缩时一样按4MB的块送入随机数据，写到临时目录中的恢复卷里。
+    """
+    import tempfile
+    
+    block = os.urandom(4 * 1024 * 1024)
+    with tempfile.TemporaryDirectory(dir=directory) as temp_dir:
+        writer = ParityWriter(os.path.join(temp_dir, "bench"), parity_count)
+        for volume_index in range(volume_count):
+            for _ in range(0, volume_size, len(block)):
+                writer.update(volume_index, block)
+        writer.close()
+    seconds = writer.encode_time
+    return {
+        "bytes": writer.encoded_bytes,
+        "seconds": seconds,
+        "mb_per_s": writer.encoded_bytes / seconds / 1024 / 1024 if seconds else 0.0,
+    }
@@ -0,0 +1,256 @@
+"""读取 → 压缩 → 加密 → 写入流水线"""
+
+import queue
+import threading
+import time
+import zlib
+
+import pyzipper
+
+from .codecs import get_compressor, set_entry_compression
+from .entries import RawEntryWriter
+from .fileio import InputFile
+from .manifest import make_zipinfo
+
+class _PipelineAborted(Exception):
+    """流水线中其他阶段出错时，用于结束当前阶段"""
+
+# 压缩流水线
+class CompressPipeline:
+    """读取 → 压缩 → 加密 → 写入流水线，相邻阶段之间用有界队列连接
+    
+    读取、压缩、加密各自在独立线程中运行，写入在调用线程中完成（ZIP结构只在一个线程中修改）。
+    zlib和AES在处理数据时会释放GIL，所以磁盘读写和压缩/加密可以同时进行。
+    每个阶段都会统计等待上游（输入队列为空）和等待下游（输出队列已满）的时间和次数，
+    据此可以判断瓶颈在哪一个阶段。
+    """
+    
+    def __init__(self, zipf, password=None, queue_depth=8, buffer_size=1024 * 1024, compresslevel=None,
+                 check_state=None, job_stats=None, open_input=None, choose_compression=None):
+        self.zipf = zipf
+        self.password = password
+        self.compresslevel = compresslevel
+        # 读取阶段每读取一块数据前调用check_state(abort)，用于暂停（阻塞）和取消（抛出异常），
+        # 其他阶段出错时abort被设置，暂停中的check_state应当返回
+        self.check_state = check_state
+        # 任务的分阶段统计（stats.JobStats），为None时不计时
+        self.job_stats = job_stats
+        # 打开源文件用于顺序读取的函数（CompressJob.open_input按I/O设置使用fadvise和mmap）
+        self.open_input = open_input or InputFile
+        # choose_compression(路径, 大小, 压缩方式, 第一块数据)返回实际使用的压缩方式（自动存储），为None时不检测
+        self.choose_compression = choose_compression
+        self.queue_depth = max(1, queue_depth)
+        self.buffer_size = buffer_size
+        self.stages = ["读取", "压缩", "加密", "写入"] if password else ["读取", "压缩", "写入"]
+        self.stats = {
+            stage: {"busy": 0.0, "input_wait": 0.0, "output_wait": 0.0, "input_stalls": 0, "output_stalls": 0}
+            for stage in self.stages
+        }
+        self._abort = threading.Event()
+        self._error = None
+    
+    def _get(self, q, stage):
+        """从输入队列取出消息，队列为空时记录一次等待上游"""
+        try:
+            return q.get_nowait()
+        except queue.Empty:
+            pass
+        stats = self.stats[stage]
+        stats["input_stalls"] += 1
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    if self._abort.is_set():
+                        raise _PipelineAborted()
+        finally:
+            stats["input_wait"] += time.perf_counter() - start
+    
+    def _put(self, q, message, stage):
+        """把消息放入输出队列，队列已满时记录一次等待下游"""
+        try:
+            q.put_nowait(message)
+            return
+        except queue.Full:
+            pass
+        stats = self.stats[stage]
+        stats["output_stalls"] += 1
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    q.put(message, timeout=0.1)
+                    return
+                except queue.Full:
+                    if self._abort.is_set():
+                        raise _PipelineAborted()
+        finally:
+            stats["output_wait"] += time.perf_counter() - start
+    
+    def _run_stage(self, stage, func, *args):
+        """在线程中运行一个阶段，出错时通知其他阶段停止"""
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except _PipelineAborted:
+            pass
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._abort.set()
+        finally:
+            self._finish_stats(stage, time.perf_counter() - start)
+    
+    def _finish_stats(self, stage, elapsed):
+        stats = self.stats[stage]
+        stats["busy"] = max(0.0, elapsed - stats["input_wait"] - stats["output_wait"])
+    
+    def _read_chunk(self, f_in):
+        if self.check_state:
+            self.check_state(self._abort)
+            if self._abort.is_set():
+                raise _PipelineAborted()
+        if self.job_stats is None:
+            return f_in.read(self.buffer_size)
+        start = time.perf_counter()
+        chunk = f_in.read(self.buffer_size)
+        self.job_stats.add("read", time.perf_counter() - start, len(chunk))
+        return chunk
+    
+    def _read_stage(self, entries, out_q):
+        for entry, compression in entries:
+            with self.open_input(entry.path) as f_in:
+                # 先读第一块数据，自动存储检测在这块数据上采样，不需要另外读取文件
+                chunk = self._read_chunk(f_in)
+                if self.choose_compression:
+                    compression = self.choose_compression(entry.path, entry.size, compression, chunk)
+                zinfo = make_zipinfo(self.zipf.zipinfo_cls, entry)
+                set_entry_compression(zinfo, compression, self.compresslevel)
+                self._put(out_q, ("begin", zinfo), "读取")
+                while chunk:
+                    self._put(out_q, ("data", chunk, len(chunk)), "读取")
+                    chunk = self._read_chunk(f_in)
+            self._put(out_q, ("end",), "读取")
+        self._put(out_q, ("finish",), "读取")
+    
+    def _compress_stage(self, in_q, out_q):
+        compressor = None
+        crc = 0
+        file_size = 0
+        while True:
+            message = self._get(in_q, "压缩")
+            kind = message[0]
+            if kind == "data":
+                chunk = message[1]
+                if self.job_stats is not None:
+                    start = time.perf_counter()
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                data = compressor.compress(chunk) if compressor else chunk
+                if self.job_stats is not None:
+                    self.job_stats.add("compress", time.perf_counter() - start, len(chunk))
+                # 即使压缩器暂时没有输出，也要把已消耗的字节数传给写入阶段用于进度
+                self._put(out_q, ("data", data, message[2]), "压缩")
+            elif kind == "begin":
+                zinfo = message[1]
+                compressor = get_compressor(zinfo.compress_type, zinfo._compresslevel)
+                crc = 0
+                file_size = 0
+                self._put(out_q, message, "压缩")
+            elif kind == "end":
+                if compressor:
+                    self._put(out_q, ("data", compressor.flush(), 0), "压缩")
+                self._put(out_q, ("end", crc, file_size), "压缩")
+            else:
+                self._put(out_q, message, "压缩")
+                return
+    
+    def _encrypt_stage(self, in_q, out_q):
+        encrypter = None
+        while True:
+            message = self._get(in_q, "加密")
+            kind = message[0]
+            if kind == "data":
+                if self.job_stats is not None:
+                    start = time.perf_counter()
+                    data = encrypter.encrypt(message[1])
+                    self.job_stats.add("encrypt", time.perf_counter() - start, len(message[1]))
+                else:
+                    data = encrypter.encrypt(message[1])
+                self._put(out_q, ("data", data, message[2]), "加密")
+            elif kind == "begin":
+                # 每个条目独立的盐值和PBKDF2密钥派生也在本阶段完成，不占用写入线程
+                start = time.perf_counter()
+                encrypter = pyzipper.zipfile_aes.AESZipEncrypter(self.password)
+                if self.job_stats is not None:
+                    self.job_stats.add("encrypt", time.perf_counter() - start)
+                self._put(out_q, ("begin", message[1], encrypter), "加密")
+            elif kind == "end":
+                self._put(out_q, message, "加密")
+            else:
+                self._put(out_q, message, "加密")
+                return
+    
+    def run(self, entries, on_entry_start=None, on_progress=None, on_entry_done=None):
+        """压缩entries中的所有条目，entries为(清单记录, 压缩方式)
+        
+        回调都在调用线程（写入阶段）中执行：on_entry_start(zinfo)、
+        on_progress(本次写入对应的原始字节数)、on_entry_done(zinfo)。
+        """
+        queues = [queue.Queue(self.queue_depth) for _ in range(len(self.stages) - 1)]
+        workers = [
+            threading.Thread(target=self._run_stage, args=("读取", self._read_stage, entries, queues[0]), daemon=True),
+            threading.Thread(target=self._run_stage, args=("压缩", self._compress_stage, queues[0], queues[1]), daemon=True),
+        ]
+        if self.password:
+            workers.append(threading.Thread(
+                target=self._run_stage, args=("加密", self._encrypt_stage, queues[1], queues[2]), daemon=True
+            ))
+        for worker in workers:
+            worker.start()
+        
+        start = time.perf_counter()
+        try:
+            entry_writer = None
+            while True:
+                message = self._get(queues[-1], "写入")
+                kind = message[0]
+                if kind == "data":
+                    entry_writer.write_prepared(message[1])
+                    if on_progress and message[2]:
+                        on_progress(message[2])
+                elif kind == "begin":
+                    zinfo = message[1]
+                    encrypter = message[2] if len(message) > 2 else None
+                    entry_writer = RawEntryWriter(self.zipf, zinfo, encrypter=encrypter)
+                    if on_entry_start:
+                        on_entry_start(zinfo)
+                elif kind == "end":
+                    entry_writer.close(message[1], message[2])
+                    if on_entry_done:
+                        on_entry_done(entry_writer.zinfo)
+                else:
+                    break
+        except _PipelineAborted:
+            pass
+        finally:
+            self._finish_stats("写入", time.perf_counter() - start)
+            # 正常结束时各阶段已经退出；出错时通知仍在运行的阶段尽快停止
+            self._abort.set()
+            for worker in workers:
+                worker.join()
+        if self._error is not None:
+            raise self._error
+    
+    def format_stats(self):
+        """返回各阶段忙碌/等待时间的简要说明"""
+        parts = []
+        for stage in self.stages:
+            stats = self.stats[stage]
+            parts.append(
+                f"{stage} 忙碌{stats['busy']:.1f}s 等待上游{stats['input_wait']:.1f}s({stats['input_stalls']}次) "
+                f"等待下游{stats['output_wait']:.1f}s({stats['output_stalls']}次)"
+            )
+        return "；".join(parts)
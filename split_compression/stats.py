@@ -0,0 +1,157 @@
+"""压缩任务的分阶段统计：各阶段的累计耗时和字节数、当前/平均速度和剩余时间
+
+统计是可选的：CompressJob没有启用统计时self.stats为None，热点路径上只多一次is None判断。
+启用后每个阶段在处理完一块数据时调用add(阶段, 秒数, 字节数)，snapshot()返回可以直接
+保存为JSON的字典，StatsLog把每次的快照按行追加到JSON Lines日志中。
+"""
+
+import json
+import threading
+import time
+
+# 阶段名称（JSON中使用英文键）和界面中显示的名称
+STAGE_LABELS = {
+    "scan": "扫描",
+    "read": "读取",
+    "compress": "压缩",
+    "encrypt": "加密",
+    "write": "写入",
+    "checksum": "校验和",
+    "parity": "恢复卷",
+    "split": "分割",
+}
+
+class JobStats:
+    """线程安全的分阶段计时器
+    
+    各阶段的耗时为所有线程的时间之和，多线程压缩时可能超过实际经过的时间。
+    当前速度为按smoothing指数平滑的瞬时速度，剩余时间按当前速度估算。
+    """
+    
+    def __init__(self, total_bytes=0, smoothing=0.3, sample_interval=0.5):
+        self.total_bytes = total_bytes
+        self.processed_bytes = 0  # 已完成的原始字节数（与总进度一致）
+        self.total_files = 0
+        self.processed_files = 0  # 已写入的条目数，小文件多时每秒文件数比MB/s更能反映速度
+        self.smoothing = smoothing
+        self.sample_interval = sample_interval
+        self.stages = {}  # 阶段 -> [秒数, 字节数]
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+        self._rate = None  # 平滑后的速度（字节/秒）
+        self._last_sample = (self.start_time, 0)
+    
+    def add(self, stage, seconds, size=0):
+        with self._lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = [0.0, 0]
+            totals[0] += seconds
+            totals[1] += size
+    
+    def seconds(self, stage):
+        totals = self.stages.get(stage)
+        return totals[0] if totals else 0.0
+    
+    def _sample(self, now):
+        last_time, last_bytes = self._last_sample
+        elapsed = now - last_time
+        if elapsed < self.sample_interval:
+            return
+        rate = max(0, self.processed_bytes - last_bytes) / elapsed
+        if self._rate is None:
+            self._rate = rate
+        else:
+            self._rate = self.smoothing * rate + (1 - self.smoothing) * self._rate
+        self._last_sample = (now, self.processed_bytes)
+    
+    def snapshot(self, done=False):
+        """返回当前统计（秒、字节、MB/s），可以直接保存为JSON"""
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        with self._lock:
+            self._sample(now)
+            stages = {
+                stage: {
+                    "seconds": round(seconds, 4),
+                    "bytes": size,
+                    "mb_s": round(size / seconds / 1024 / 1024, 2) if seconds > 0 and size else None,
+                }
+                for stage, (seconds, size) in self.stages.items()
+            }
+        average = self.processed_bytes / elapsed if elapsed > 0 else 0.0
+        current = average if done or self._rate is None else self._rate
+        remaining = max(0, self.total_bytes - self.processed_bytes)
+        if done:
+            eta = 0.0
+        elif current > 0:
+            eta = remaining / current
+        else:
+            eta = None
+        return {
+            "elapsed": round(elapsed, 3),
+            "processed_bytes": self.processed_bytes,
+            "total_bytes": self.total_bytes,
+            "percent": round(self.processed_bytes / self.total_bytes * 100.0, 2) if self.total_bytes else None,
+            "current_mb_s": round(current / 1024 / 1024, 2),
+            "average_mb_s": round(average / 1024 / 1024, 2),
+            "eta": round(eta, 1) if eta is not None else None,
+            "processed_files": self.processed_files,
+            "total_files": self.total_files,
+            "files_s": round(self.processed_files / elapsed, 1) if elapsed > 0 else 0.0,
+            "stages": stages,
+            "done": done,
+        }
+
+def timed(stats, stage, size, func, *args):
+    """调用func(*args)并把耗时计入stage（用于交给线程池的任务）"""
+    start = time.perf_counter()
+    result = func(*args)
+    stats.add(stage, time.perf_counter() - start, size)
+    return result
+
+def format_duration(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+def format_snapshot(snapshot):
+    """把统计快照格式化为多行文字"""
+    line = (
+        f"已用时间 {format_duration(snapshot['elapsed'])}，剩余 {format_duration(snapshot['eta'])}，"
+        f"当前 {snapshot['current_mb_s']:.1f} MB/s，平均 {snapshot['average_mb_s']:.1f} MB/s"
+    )
+    if snapshot["total_files"]:
+        line += f"，每秒 {snapshot['files_s']:.0f} 个文件"
+    lines = [line]
+    for stage, label in STAGE_LABELS.items():
+        values = snapshot["stages"].get(stage)
+        if values is None:
+            continue
+        line = f"  {label}：{values['seconds']:.2f}秒"
+        if values["bytes"]:
+            line += f" {values['bytes'] / 1024 / 1024:.1f} MB"
+        if values["mb_s"] is not None:
+            line += f"（{values['mb_s']:.1f} MB/s）"
+        lines.append(line)
+    return "\n".join(lines)
+
+class StatsLog:
+    """把统计快照按行追加到JSON Lines文件，可以直接作为回调使用"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def __call__(self, snapshot):
+        record = dict(snapshot, time=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+    
+    def close(self):
+        self._file.close()
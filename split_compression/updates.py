@@ -0,0 +1,245 @@
+"""检查和下载程序更新，不依赖Qt
+
+版本信息按ETag缓存：缓存未过期时不发送请求，过期后带If-None-Match询问，
+GitHub返回304时直接使用缓存（304不计入API的频率限制）。
+更新包先下载到.part文件，连接中断后用HTTP Range从已下载的位置继续，
+下载完成后检查大小和SHA-256，通过后才改为正式的文件名。
+所有函数都可以传入其他地址和Session，方便用本地HTTP服务器测试。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+RELEASES_URL = "https://api.github.com/repos/CODMzhuzai/Split-Compression/releases/latest"
+RELEASE_CACHE_TTL = 6 * 3600  # 版本信息缓存的有效时间（秒）
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 下载时每次写入的数据块大小
+DOWNLOAD_RETRIES = 5  # 连接中断后自动续传的次数
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """返回进程内共用的requests.Session，检查更新和下载复用同一个连接池"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            # 只自动重试建立连接阶段的错误；数据传输中断由download_file按Range续传
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                  max_retries=Retry(connect=3, read=0, backoff_factor=0.5))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = "Split-Compression-Updater"
+            _session = session
+        return _session
+
+def default_cache_path():
+    """版本信息缓存文件的默认位置（Windows为%LOCALAPPDATA%，其他系统为~/.cache）"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "split_compression", "release.json")
+
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_json(path, data):
+    """先写临时文件再替换，写到一半中断时不会留下损坏的文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def fetch_release(url=RELEASES_URL, cache_path=None, ttl=RELEASE_CACHE_TTL, session=None, timeout=10):
+    """返回最新版本的发布信息（GitHub API的JSON）
+    
+    cache_path为None时使用default_cache_path()，为False时不使用缓存。
+    缓存不超过ttl秒时不发送请求；否则带上次的ETag发送条件请求。
+    """
+    if cache_path is None:
+        cache_path = default_cache_path()
+    cache = _load_json(cache_path) if cache_path else None
+    if cache is not None and cache.get("url") != url:
+        cache = None
+    if cache is not None and time.time() - cache.get("fetched", 0) < ttl:
+        return cache["data"]
+    
+    headers = {"Accept": "application/vnd.github+json"}
+    if cache is not None and cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    response = (session or get_session()).get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cache is not None:
+        data = cache["data"]
+        etag = cache.get("etag")
+    else:
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+    if cache_path:
+        try:
+            _save_json(cache_path, {"url": url, "etag": etag, "fetched": time.time(), "data": data})
+        except OSError:
+            # 缓存只是为了少发请求，写不出来不影响检查更新
+            pass
+    return data
+
+def parse_release(release_data, session=None, timeout=10):
+    """从发布信息中取出(版本号, 下载链接, SHA-256)，没有zip更新包时下载链接为None
+    
+    SHA-256优先使用GitHub为每个附件提供的digest，其次使用同名的.sha256附件，
+    都没有时为None（只能检查大小）。
+    """
+    latest_version = release_data.get("tag_name", "")
+    # 提取数字版本号（移除可能的前缀）
+    if latest_version.startswith("%"):
+        latest_version = latest_version[1:]
+    
+    assets = release_data.get("assets", [])
+    package = None
+    for asset in assets:
+        if asset.get("name", "").endswith(".zip"):
+            package = asset
+            break
+    if package is None:
+        return latest_version, None, None
+    
+    sha256 = None
+    digest = package.get("digest") or ""
+    if digest.startswith("sha256:"):
+        sha256 = digest[len("sha256:"):].lower()
+    else:
+        for asset in assets:
+            if asset.get("name") == package["name"] + ".sha256":
+                response = (session or get_session()).get(asset["browser_download_url"], timeout=timeout)
+                response.raise_for_status()
+                sha256 = response.text.split()[0].lower() if response.text.split() else None
+                break
+    return latest_version, package.get("browser_download_url"), sha256
+
+def _hash_file(path, hasher):
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(DOWNLOAD_CHUNK_SIZE)
+            if not data:
+                return
+            hasher.update(data)
+
+def _content_range(response):
+    """解析206响应的Content-Range，返回(起始位置, 总大小)，格式不对时返回(None, None)"""
+    value = response.headers.get("Content-Range", "")
+    try:
+        unit, rest = value.split(" ", 1)
+        span, total = rest.split("/", 1)
+        if unit != "bytes":
+            return None, None
+        return int(span.split("-", 1)[0]), (int(total) if total != "*" else None)
+    except ValueError:
+        return None, None
+
+def download_file(url, path, sha256=None, session=None, chunk_size=DOWNLOAD_CHUNK_SIZE, progress=None,
+                  retries=DOWNLOAD_RETRIES, timeout=30):
+    """把url下载到path，返回path；支持断点续传和SHA-256校验
+    
+    下载中的数据保存在path.part，path.part.json记录对应的地址、ETag和总大小。
+    再次下载同一个地址时，从.part已有的位置用Range请求继续（If-Range保证服务器上的
+    文件没有变化，变化时服务器返回完整内容，从头下载）。传输中断时自动续传retries次。
+    progress(已下载字节数, 总字节数)在每个数据块之后调用，总大小未知时为0。
+    sha256不匹配时删除下载的文件并抛出ValueError。
+    """
+    import requests
+    
+    session = session or get_session()
+    part_path = f"{path}.part"
+    meta_path = f"{part_path}.json"
+    meta = _load_json(meta_path)
+    if meta is None or meta.get("url") != url or not os.path.exists(part_path):
+        meta = {"url": url}
+        for stale in (part_path, meta_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+    
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        validator = meta.get("etag") or meta.get("last_modified")
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        elif offset:
+            # 无法确认服务器上的文件没有变化，从头下载
+            offset = 0
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416 and offset:
+                    if offset == meta.get("size"):
+                        # .part已经完整，只差校验和改名
+                        break
+                    # 已下载的部分比服务器上的文件还大，从头下载
+                    os.remove(part_path)
+                    continue
+                response.raise_for_status()
+                start, range_total = _content_range(response) if response.status_code == 206 else (None, None)
+                if start == offset:
+                    total = meta.get("size") or range_total or 0
+                    mode = 'ab'
+                else:
+                    # 服务器返回了完整内容（不支持Range或文件已经变化）
+                    offset = 0
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length and "Content-Encoding" not in response.headers else 0
+                    meta = {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "size": total or None,
+                    }
+                    _save_json(meta_path, meta)
+                    mode = 'wb'
+                downloaded = offset
+                if progress and offset:
+                    progress(downloaded, total)
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        if progress:
+                            progress(downloaded, total)
+                if total and downloaded < total:
+                    raise requests.exceptions.ChunkedEncodingError(f"连接提前结束（{downloaded}/{total}字节）")
+            break
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout):
+            attempt += 1
+            if attempt > retries:
+                raise
+            time.sleep(min(30, 2 ** attempt * 0.5))
+    
+    size = os.path.getsize(part_path)
+    if meta.get("size") and size != meta["size"]:
+        os.remove(part_path)
+        os.remove(meta_path)
+        raise ValueError(f"下载的文件大小不正确（{size}/{meta['size']}字节）")
+    if sha256:
+        hasher = hashlib.sha256()
+        _hash_file(part_path, hasher)
+        if hasher.hexdigest() != sha256.lower():
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise ValueError("下载的文件SHA-256校验失败，已删除，请重新下载")
+    os.replace(part_path, path)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    return path
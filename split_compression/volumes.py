@@ -0,0 +1,509 @@
+"""分卷的写入、读取和已有ZIP文件的分割"""
+
+import os
+import io
+import re
+import sys
+import time
+import zipfile
+import bisect
+import itertools
+import collections
+
+from .fileio import DEFAULT_WRITE_BUFFER, CacheDropper
+
+
+def get_volume_name(output_base, index, is_last=False):
+    """获取分卷文件名：前面的分卷为.z01, .z02...，最后一个分卷为.zip"""
+    if is_last:
+        return f"{output_base}.zip"
+    return f"{output_base}.z{str(index).zfill(2)}"
+
+# 分卷写入器
+class VolumeWriter:
+    """按分卷大小滚动写入的文件对象，直接交给pyzipper.AESZipFile使用
+    
+    当前分卷写满volume_size后自动切换到下一个.zNN文件，关闭时把最后一个分卷
+    重命名为.zip。不支持seek，pyzipper会改用数据描述符记录CRC和大小，
+    因此每个字节只写入磁盘一次，内存占用与压缩包大小无关。
+    提供hasher_factory时在写入的同时计算每个分卷的校验和，不需要再读一遍分卷；
+    提供parity（parity.ParityWriter）时同时生成恢复卷。
+    提供stats（stats.JobStats）时记录写入、校验和和恢复卷各自的耗时。
+    buffer_size为分卷文件的写缓冲区大小；drop_cache为True时写完的数据通知内核丢弃页缓存。
+    """
+    
+    def __init__(self, output_base, volume_size, durable=False, hasher_factory=None, parity=None, stats=None,
+                 buffer_size=DEFAULT_WRITE_BUFFER, drop_cache=False):
+        if volume_size <= 0:
+            raise ValueError("分卷大小必须大于0")
+        self.output_base = output_base
+        self.volume_size = volume_size
+        self.durable = durable  # 切换分卷时把写满的分卷同步到磁盘（用于检查点）
+        self.volumes = []  # 已创建的分卷文件路径
+        self.closed = False
+        self._current = None  # 当前分卷的文件对象
+        self._current_size = 0  # 当前分卷已写入的字节数
+        self._position = 0  # 整个ZIP数据流中的逻辑写入位置
+        self.hasher_factory = hasher_factory
+        self.checksums = []  # 已写完的分卷的校验和（十六进制），与volumes一一对应
+        self._hasher = None  # 当前分卷的哈希对象
+        self.parity = parity
+        self.stats = stats
+        self.buffer_size = buffer_size
+        self.drop_cache = drop_cache
+        self._dropper = None  # 当前分卷的页缓存丢弃器
+    
+    def _finish_checksum(self):
+        if self._hasher is not None:
+            self.checksums.append(self._hasher.hexdigest())
+            self._hasher = None
+    
+    def _open_next_volume(self):
+        """关闭当前分卷并打开下一个分卷"""
+        if self._current is not None:
+            if self.durable:
+                self.sync()
+            self._close_current()
+            self._finish_checksum()
+        volume_name = get_volume_name(self.output_base, len(self.volumes) + 1)
+        self._open_current(volume_name, 'wb')
+        self._current_size = 0
+        self.volumes.append(volume_name)
+        if self.hasher_factory:
+            self._hasher = self.hasher_factory()
+    
+    def _open_current(self, volume_name, mode):
+        self._current = open(volume_name, mode, buffering=self.buffer_size)
+        if self.drop_cache:
+            self._dropper = CacheDropper(self._current.fileno())
+    
+    def _close_current(self):
+        """关闭当前分卷，写完的分卷不会再读取，丢弃它的页缓存"""
+        if self._dropper is not None:
+            self._current.flush()
+            self._dropper.finish(self._current_size)
+            self._dropper = None
+        self._current.close()
+        self._current = None
+    
+    def write(self, data):
+        if self.closed:
+            raise ValueError("分卷写入器已关闭")
+        view = memoryview(data).cast('B')
+        written = len(view)
+        while view:
+            # 只有在确实还有数据时才打开新分卷，避免产生空的尾部分卷
+            if self._current is None or self._current_size >= self.volume_size:
+                self._open_next_volume()
+            room = self.volume_size - self._current_size
+            chunk = view[:room]
+            if self.stats is not None:
+                self._write_timed(chunk)
+            else:
+                self._current.write(chunk)
+                if self._hasher is not None:
+                    self._hasher.update(chunk)
+                if self.parity is not None:
+                    self.parity.update(len(self.volumes) - 1, chunk)
+            self._current_size += len(chunk)
+            if self._dropper is not None:
+                # 写缓冲区中的数据还没有交给内核
+                self._dropper.advance(self._current_size - self.buffer_size)
+            view = view[len(chunk):]
+        self._position += written
+        return written
+    
+    def _write_timed(self, chunk):
+        """与write中相同的三步，分别计入写入、校验和和恢复卷阶段"""
+        stats = self.stats
+        size = len(chunk)
+        start = time.perf_counter()
+        self._current.write(chunk)
+        now = time.perf_counter()
+        stats.add("write", now - start, size)
+        if self._hasher is not None:
+            start = now
+            self._hasher.update(chunk)
+            now = time.perf_counter()
+            stats.add("checksum", now - start, size)
+        if self.parity is not None:
+            start = now
+            self.parity.update(len(self.volumes) - 1, chunk)
+            stats.add("parity", time.perf_counter() - start, size)
+    
+    def tell(self):
+        return self._position
+    
+    def seekable(self):
+        return False
+    
+    def seek(self, offset, whence=0):
+        raise io.UnsupportedOperation("分卷写入器不支持seek")
+    
+    def flush(self):
+        if self._current is not None:
+            self._current.flush()
+    
+    def sync(self):
+        """把当前分卷已写入的数据同步到磁盘"""
+        if self._current is not None:
+            self._current.flush()
+            os.fsync(self._current.fileno())
+    
+    def resume(self, offset):
+        """从已有分卷的offset处继续写入（从检查点恢复），offset之后的数据被截断"""
+        if self.volumes or self._current is not None:
+            raise ValueError("只能在写入之前恢复")
+        count = -(-offset // self.volume_size)  # offset之前的数据占用的分卷数
+        last_volume = get_volume_name(self.output_base, 0, is_last=True)
+        volumes = []
+        for index in range(1, count + 1):
+            volume_name = get_volume_name(self.output_base, index)
+            if not os.path.exists(volume_name) and index == count and os.path.exists(last_volume):
+                # 上次在重命名最后一个分卷之后中断
+                os.replace(last_volume, volume_name)
+            expected = min(self.volume_size, offset - (index - 1) * self.volume_size)
+            if os.path.getsize(volume_name) < expected:
+                raise ValueError(f"分卷不完整：{volume_name}")
+            volumes.append(volume_name)
+        
+        # 删除检查点之后产生的分卷
+        remove_stale_volumes(self.output_base, count + 1)
+        if os.path.exists(last_volume):
+            os.remove(last_volume)
+        
+        if volumes:
+            self._open_current(volumes[-1], 'r+b')
+            self._current_size = offset - (count - 1) * self.volume_size
+            self._current.truncate(self._current_size)
+            self._current.seek(self._current_size)
+        self.volumes = volumes
+        self._position = offset
+        if self.hasher_factory or self.parity is not None:
+            # 检查点之前写出的数据需要重新读一遍才能继续计算校验和和恢复卷
+            self.checksums = []
+            if self.parity is not None:
+                self.parity.reset()
+            for index, volume_name in enumerate(volumes):
+                hasher = self.hasher_factory() if self.hasher_factory else None
+                remaining = self._current_size if index == len(volumes) - 1 else self.volume_size
+                with open(volume_name, 'rb') as f:
+                    while remaining > 0:
+                        data = f.read(min(1024 * 1024, remaining))
+                        if not data:
+                            break
+                        if hasher is not None:
+                            hasher.update(data)
+                        if self.parity is not None:
+                            self.parity.update(index, data)
+                        remaining -= len(data)
+                if hasher is None:
+                    continue
+                if index == len(volumes) - 1:
+                    self._hasher = hasher
+                else:
+                    self.checksums.append(hasher.hexdigest())
+    
+    def close(self):
+        """关闭写入器，把最后一个分卷重命名为.zip，返回所有分卷路径"""
+        if self.closed:
+            return self.volumes
+        self.closed = True
+        if self._current is not None:
+            self._close_current()
+        self._finish_checksum()
+        if self.parity is not None:
+            self.parity.close()
+        if self.volumes:
+            final_name = get_volume_name(self.output_base, len(self.volumes), is_last=True)
+            os.replace(self.volumes[-1], final_name)
+            self.volumes[-1] = final_name
+            # 上次写出的分卷更多时，编号更大的.zNN已经不属于这组分卷
+            remove_stale_volumes(self.output_base, len(self.volumes))
+        return self.volumes
+    
+    def suspend(self):
+        """中断写入但保留已经产生的分卷文件，稍后可以从检查点恢复"""
+        self.closed = True
+        if self._current is not None:
+            self._close_current()
+        if self.parity is not None:
+            self.parity.suspend()
+    
+    def abort(self):
+        """放弃写入，删除已经产生的分卷文件"""
+        self.closed = True
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        if self.parity is not None:
+            self.parity.abort()
+        for volume_name in self.volumes:
+            try:
+                os.remove(volume_name)
+            except OSError:
+                pass
+        self.volumes = []
+
+def list_volumes(output_base, suffix=""):
+    """按顺序返回已有的一组分卷文件（.z01, .z02, ..., .zip），没有.zip时返回空列表
+    
+    suffix用于查找改过名的分卷，例如增量压缩时的.prev。
+    """
+    last_volume = get_volume_name(output_base, 0, is_last=True) + suffix
+    if not os.path.isfile(last_volume):
+        return []
+    volumes = []
+    index = 1
+    while os.path.isfile(get_volume_name(output_base, index) + suffix):
+        volumes.append(get_volume_name(output_base, index) + suffix)
+        index += 1
+    volumes.append(last_volume)
+    return volumes
+
+def numbered_volumes(output_base):
+    """返回目录中所有output_base.zNN文件 {编号: 路径}，包括不属于当前这组分卷的文件"""
+    directory = os.path.dirname(os.path.abspath(output_base))
+    prefix = os.path.basename(output_base) + ".z"
+    volumes = {}
+    for name in os.listdir(directory):
+        if name.lower().startswith(prefix.lower()) and name[len(prefix):].isdigit():
+            volumes[int(name[len(prefix):])] = os.path.join(os.path.dirname(output_base), name)
+    return volumes
+
+def remove_stale_volumes(output_base, count):
+    """删除编号大于等于count的.zNN文件（以前写出的分卷比这次多时留下的）"""
+    for number, volume_name in numbered_volumes(output_base).items():
+        if number >= count:
+            os.remove(volume_name)
+
+def volume_base(path):
+    """由分卷路径（.zip或.zNN）得到分卷的公共路径"""
+    root, ext = os.path.splitext(path)
+    if ext.lower() == ".zip" or re.fullmatch(r"\.[zZ]\d{2,}", ext):
+        return root
+    return path
+
+def find_volume_set(path):
+    """返回path（任意一个分卷或公共路径）所属的整组分卷，缺少分卷时抛出FileNotFoundError"""
+    output_base = volume_base(path)
+    volumes = list_volumes(output_base)
+    if not volumes:
+        raise FileNotFoundError(f"找不到最后一个分卷：{get_volume_name(output_base, 0, is_last=True)}")
+    # list_volumes遇到第一个缺失的.zNN就停止，后面如果还有分卷说明中间缺了一个，
+    # 或者它们是以前写出的更多分卷留下的多余文件
+    orphans = [volume_name for number, volume_name in sorted(numbered_volumes(output_base).items())
+               if number >= len(volumes)]
+    if orphans:
+        names = "、".join(os.path.basename(volume_name) for volume_name in orphans)
+        raise FileNotFoundError(
+            f"缺少分卷：{get_volume_name(output_base, len(volumes))}"
+            f"（{names}排在它之后；如果它们是以前留下的多余分卷，删除后即可打开这个压缩包）"
+        )
+    return volumes
+
+# 分卷读取器
+class VolumeReader:
+    """把一组分卷当作一个连续的只读文件，可以直接交给pyzipper.AESZipFile读取
+    
+    分卷是按顺序切开的同一个ZIP数据流，读取时按逻辑位置定位到对应的分卷，
+    跨分卷的读取会自动拼接，不需要先把分卷合并成一个完整的文件。
+    分卷文件在第一次用到时才打开，最多同时保持max_open个打开的文件，
+    超过时关闭最久没有用到的分卷，几千个分卷的压缩包也不会耗尽文件句柄。
+    """
+    
+    def __init__(self, volumes, max_open=8):
+        self.volumes = list(volumes)
+        self._sizes = [os.path.getsize(volume) for volume in self.volumes]
+        self._starts = [0] + list(itertools.accumulate(self._sizes))[:-1]
+        self.size = sum(self._sizes)
+        self.max_open = max(1, max_open)
+        self._files = collections.OrderedDict()  # 分卷序号 -> 已打开的文件对象，按最近使用排序
+        self._position = 0
+        self.closed = False
+    
+    @classmethod
+    def open(cls, path, max_open=8):
+        """打开path（任意一个分卷或公共路径）所属的整组分卷"""
+        return cls(find_volume_set(path), max_open)
+    
+    def locate(self, position):
+        """把逻辑位置换算为(分卷序号, 分卷内偏移)"""
+        if not 0 <= position < self.size:
+            raise ValueError(f"位置超出分卷范围：{position}")
+        index = bisect.bisect_right(self._starts, position) - 1
+        return index, position - self._starts[index]
+    
+    def _volume_file(self, index):
+        f = self._files.get(index)
+        if f is not None:
+            self._files.move_to_end(index)
+            return f
+        while len(self._files) >= self.max_open:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        f = self._files[index] = open(self.volumes[index], 'rb')
+        return f
+    
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("分卷读取器已关闭")
+        if size is None or size < 0:
+            size = self.size - self._position
+        parts = []
+        while size > 0 and self._position < self.size:
+            index, offset = self.locate(self._position)
+            f = self._volume_file(index)
+            f.seek(offset)
+            data = f.read(min(size, self._sizes[index] - offset))
+            if not data:
+                break
+            parts.append(data)
+            self._position += len(data)
+            size -= len(data)
+        return b''.join(parts)
+    
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            position = offset
+        elif whence == 1:
+            position = self._position + offset
+        elif whence == 2:
+            position = self.size + offset
+        else:
+            raise ValueError("无效的whence参数")
+        if position < 0:
+            raise ValueError("seek位置不能为负数")
+        self._position = position
+        return position
+    
+    def tell(self):
+        return self._position
+    
+    def seekable(self):
+        return True
+    
+    def readable(self):
+        return True
+    
+    def close(self):
+        self.closed = True
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def copy_file_range_to(src_fd, dst_fd, offset, count):
+    """把src_fd中从offset开始的count字节追加写入dst_fd的当前位置
+    
+    优先使用os.copy_file_range / os.sendfile在内核中完成复制，数据不经过Python；
+    两者都不可用时（例如Windows）退回到mmap分段切片写入，内存占用保持在一个窗口大小。
+    """
+    remaining = count
+    
+    # 1. copy_file_range：同一文件系统上可能直接使用reflink/服务器端复制
+    if remaining > 0 and hasattr(os, "copy_file_range"):
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            # 跨文件系统或内核不支持时继续尝试下一种方式
+            pass
+    
+    # 2. sendfile：Linux上输出端可以是普通文件
+    if remaining > 0 and hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        try:
+            while remaining > 0:
+                copied = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if copied == 0:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            pass
+    
+    # 3. mmap切片：按窗口映射源文件，直接把映射区域写入目标文件
+    if remaining > 0:
+        import mmap
+        window_size = 64 * 1024 * 1024  # 每次映射64MB
+        while remaining > 0:
+            # mmap的偏移必须按分配粒度对齐
+            aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+            delta = offset - aligned
+            length = min(remaining, window_size)
+            with mmap.mmap(src_fd, delta + length, offset=aligned, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    written = 0
+                    while written < length:
+                        written += os.write(dst_fd, view[delta + written:delta + length])
+            offset += length
+            remaining -= length
+
+def split_zip_file(zip_path, output_base, volume_size, progress_callback=None, stats=None):
+    """把已有的ZIP文件按volume_size分割为output_base.z01, .z02...和output_base.zip
+    
+    各分卷的字节区间在内核中直接复制，不会把压缩包读入内存。
+    progress_callback(已复制字节数, 总字节数)在每个分卷完成后调用。返回分卷路径列表。
+    stats（stats.JobStats）不为None时把复制的耗时计入分割阶段。
+    """
+    if volume_size <= 0:
+        raise ValueError("分卷大小必须大于0")
+    if not zipfile.is_zipfile(zip_path):
+        raise ValueError(f"不是有效的ZIP文件：{zip_path}")
+    
+    total_size = os.path.getsize(zip_path)
+    if stats is not None:
+        stats.total_bytes = total_size
+    num_volumes = max(1, (total_size + volume_size - 1) // volume_size)
+    final_zip = get_volume_name(output_base, num_volumes, is_last=True)
+    # 输出的.zip与源文件同名时，先写入临时文件，读取结束后再替换
+    overwrite_source = os.path.abspath(final_zip) == os.path.abspath(zip_path)
+    if overwrite_source and num_volumes == 1:
+        # 源文件本身就是唯一的分卷
+        return [final_zip]
+    
+    volumes = []
+    try:
+        with open(zip_path, 'rb') as src:
+            src_fd = src.fileno()
+            for i in range(num_volumes):
+                start = i * volume_size
+                count = min(volume_size, total_size - start)
+                if i == num_volumes - 1:
+                    volume_name = f"{final_zip}.part" if overwrite_source else final_zip
+                else:
+                    volume_name = get_volume_name(output_base, i + 1)
+                volumes.append(volume_name)
+                copy_start = time.perf_counter()
+                with open(volume_name, 'wb') as dst:
+                    copy_file_range_to(src_fd, dst.fileno(), start, count)
+                if stats is not None:
+                    stats.add("split", time.perf_counter() - copy_start, count)
+                    stats.processed_bytes = start + count
+                if progress_callback:
+                    progress_callback(start + count, total_size)
+        if overwrite_source:
+            os.replace(volumes[-1], final_zip)
+            volumes[-1] = final_zip
+    except Exception:
+        # 分割失败时删除已经产生的分卷（不删除源文件）
+        for volume_name in volumes:
+            if os.path.abspath(volume_name) == os.path.abspath(zip_path):
+                continue
+            try:
+                os.remove(volume_name)
+            except OSError:
+                pass
+        raise
+    # 输出目录中以前写出的分卷更多时，删除编号更大的.zNN
+    remove_stale_volumes(output_base, num_volumes)
+    return volumes
@@ -0,0 +1,56 @@
+"""解压出错或取消时不能破坏输出目录中已有的文件"""
+
+import os
+
+import pytest
+
+from split_compression import CompressCancelled, CompressJob, ExtractJob
+
+def make_archive(tmp_path, password):
+    source = tmp_path / "源"
+    source.mkdir()
+    (source / "empty.txt").write_bytes(b"")
+    (source / "data.txt").write_bytes(b"new content " * 1000)
+    (tmp_path / "out").mkdir()
+    volumes = CompressJob(str(source), str(tmp_path / "out"), 10 * 1024 * 1024, password).run()
+    return volumes[-1]
+
+def existing_files(tmp_path):
+    output = tmp_path / "解压"
+    output.mkdir()
+    (output / "empty.txt").write_bytes(b"keep me")
+    (output / "data.txt").write_bytes(b"old content")
+    return output
+
+def test_wrong_password_keeps_existing_files(tmp_path):
+    archive = make_archive(tmp_path, "secret")
+    output = existing_files(tmp_path)
+    
+    with pytest.raises(ValueError):
+        ExtractJob(archive, str(output), "wrong").run()
+    
+    assert (output / "empty.txt").read_bytes() == b"keep me"
+    assert (output / "data.txt").read_bytes() == b"old content"
+    assert sorted(os.listdir(output)) == ["data.txt", "empty.txt"]
+
+def test_cancel_keeps_existing_files(tmp_path):
+    archive = make_archive(tmp_path, None)
+    output = existing_files(tmp_path)
+    job = ExtractJob(archive, str(output))
+    job.cancel()
+    
+    with pytest.raises(CompressCancelled):
+        job.run()
+    
+    assert (output / "data.txt").read_bytes() == b"old content"
+    assert sorted(os.listdir(output)) == ["data.txt", "empty.txt"]
+
+def test_successful_extract_replaces_existing_files(tmp_path):
+    archive = make_archive(tmp_path, "secret")
+    output = existing_files(tmp_path)
+    
+    assert ExtractJob(archive, str(output), "secret").run() == 2
+    
+    assert (output / "empty.txt").read_bytes() == b""
+    assert (output / "data.txt").read_bytes() == b"new content " * 1000
+    assert sorted(os.listdir(output)) == ["data.txt", "empty.txt"]
@@ -0,0 +1,49 @@
+"""暂停中的流水线在写入出错时也要结束，并报告错误"""
+
+import os
+import threading
+
+import pytest
+
+from split_compression import CompressJob
+from split_compression.volumes import VolumeWriter
+
+def test_write_error_while_paused_fails_the_job(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "data.bin").write_bytes(os.urandom(4 * 1024 * 1024))
+    (tmp_path / "out").mkdir()
+    job = None
+    
+    def on_progress(percent):
+        # 写入阶段写出第一块数据后暂停任务，随后的写入全部失败
+        if percent > 0 and not job.is_paused():
+            job.pause()
+    
+    write = VolumeWriter.write
+    
+    def failing_write(self, data):
+        if job.is_paused():
+            raise OSError("磁盘已满")
+        return write(self, data)
+    
+    monkeypatch.setattr(VolumeWriter, "write", failing_write)
+    job = CompressJob(str(source), str(tmp_path / "out"), 1024 * 1024, pipeline_depth=4,
+                      buffer_size=64 * 1024, checkpoint=False, callbacks={"progress": on_progress})
+    result = {}
+    
+    def run():
+        try:
+            job.run()
+        except Exception as e:
+            result["error"] = e
+    
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(10)
+    
+    if worker.is_alive():
+        job.cancel()
+        pytest.fail("暂停中的任务在写入出错后没有结束")
+    assert isinstance(result.get("error"), OSError)
+    assert job.is_paused()
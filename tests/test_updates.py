@@ -0,0 +1,171 @@
+"""用本地HTTP服务器测试更新包的断点续传、If-Range和版本信息的ETag缓存"""
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from split_compression import updates
+
+PAYLOAD = bytes(range(256)) * 8192  # 2 MB
+CUT_AT = 768 * 1024 + 100
+CHUNK_SIZE = 64 * 1024  # 小于CUT_AT，断开前已经写入.part的数据才能续传
+
+class Server:
+    """提供/package（支持Range和If-Range）和/release（支持If-None-Match）的本地服务器"""
+    
+    def __init__(self):
+        self.payload = PAYLOAD
+        self.etag = '"v1"'
+        self.cuts = 0  # 接下来几次下载在CUT_AT处断开连接
+        self.requests = []  # [(路径, 请求头), ...]
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                if self.path == "/release":
+                    self.send_release()
+                else:
+                    self.send_package()
+            
+            def send_release(self):
+                if self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", server.etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps({"tag_name": "2.0", "assets": []}).encode()
+                self.send_response(200)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def send_package(self):
+                payload = server.payload
+                start = 0
+                range_header = self.headers.get("Range")
+                # If-Range与当前ETag不同时忽略Range，返回完整内容
+                if range_header and self.headers.get("If-Range") == server.etag:
+                    start = int(range_header.split("=")[1].split("-")[0])
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(payload) - 1}/{len(payload)}")
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(payload) - start))
+                self.end_headers()
+                body = payload[start:]
+                if server.cuts:
+                    server.cuts -= 1
+                    self.wfile.write(body[:CUT_AT - start])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def package_requests(self):
+        return [headers for path, headers in self.requests if path == "/package"]
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+def download(server, session, path, sha256=None, **kwargs):
+    return updates.download_file(server.url + "/package", path, sha256, session=session,
+                                 chunk_size=CHUNK_SIZE, **kwargs)
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(updates.time, "sleep", lambda seconds: None)
+
+def test_interrupted_download_resumes_with_range(server, session, tmp_path):
+    server.cuts = 1
+    path = str(tmp_path / "update.zip")
+    sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+    
+    assert download(server, session, path, sha256) == path
+    
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    first, retry = server.package_requests()
+    assert "Range" not in first
+    offset = int(retry["Range"][len("bytes="):-1])
+    assert retry["Range"] == f"bytes={offset}-" and 0 < offset <= CUT_AT
+    assert retry["If-Range"] == '"v1"'
+    assert not os.path.exists(path + ".part") and not os.path.exists(path + ".part.json")
+
+def test_resume_across_calls(server, session, tmp_path):
+    server.cuts = 1
+    path = str(tmp_path / "update.zip")
+    
+    with pytest.raises(requests.exceptions.RequestException):
+        download(server, session, path, retries=0)
+    partial_size = os.path.getsize(path + ".part")
+    assert 0 < partial_size <= CUT_AT
+    
+    download(server, session, path, hashlib.sha256(PAYLOAD).hexdigest())
+    
+    assert server.package_requests()[-1]["Range"] == f"bytes={partial_size}-"
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+def test_changed_etag_restarts_from_zero(server, session, tmp_path):
+    server.cuts = 1
+    path = str(tmp_path / "update.zip")
+    with pytest.raises(requests.exceptions.RequestException):
+        download(server, session, path, retries=0)
+    
+    # 服务器上的文件换成了新版本：If-Range不匹配，服务器返回完整内容
+    server.payload = PAYLOAD[::-1]
+    server.etag = '"v2"'
+    download(server, session, path, hashlib.sha256(server.payload).hexdigest())
+    
+    last = server.package_requests()[-1]
+    assert last["If-Range"] == '"v1"'
+    with open(path, "rb") as f:
+        assert f.read() == server.payload
+
+def test_sha256_mismatch_removes_download(server, session, tmp_path):
+    path = str(tmp_path / "update.zip")
+    
+    with pytest.raises(ValueError):
+        download(server, session, path, "0" * 64)
+    
+    assert os.listdir(tmp_path) == []
+
+def test_release_cache_uses_ttl_and_etag(server, session, tmp_path):
+    cache_path = str(tmp_path / "release.json")
+    url = server.url + "/release"
+    
+    data = updates.fetch_release(url, cache_path, session=session)
+    assert updates.fetch_release(url, cache_path, session=session) == data
+    assert len(server.requests) == 1  # 缓存未过期，不发送请求
+    
+    assert updates.fetch_release(url, cache_path, ttl=0, session=session) == data
+    assert server.requests[-1][1]["If-None-Match"] == '"v1"'
+    assert len(server.requests) == 2
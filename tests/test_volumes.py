@@ -0,0 +1,50 @@
+"""分卷变少时删除多余的分卷；缺少分卷时说明后面还有哪些分卷"""
+
+import os
+
+import pytest
+
+from split_compression import CompressJob, VerifyJob, find_volume_set, split_zip_file
+
+VOLUME_SIZE = 1024 * 1024
+
+def compress(tmp_path, size):
+    source = tmp_path / "src"
+    source.mkdir(exist_ok=True)
+    (source / "data.bin").write_bytes(os.urandom(size))
+    (tmp_path / "out").mkdir(exist_ok=True)
+    return CompressJob(str(source), str(tmp_path / "out"), VOLUME_SIZE).run()
+
+def volume_files(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path / "out") if name.startswith("src.z"))
+
+def test_fewer_volumes_remove_stale_volumes(tmp_path):
+    assert len(compress(tmp_path, 5 * VOLUME_SIZE)) == 6
+    
+    volumes = compress(tmp_path, VOLUME_SIZE + VOLUME_SIZE // 2)
+    
+    assert volume_files(tmp_path) == ["src.z01", "src.zip"]
+    assert find_volume_set(volumes[-1]) == volumes
+    assert VerifyJob(volumes[-1]).run().ok
+
+def test_split_removes_stale_volumes(tmp_path):
+    volumes = compress(tmp_path, 3 * VOLUME_SIZE)
+    whole = tmp_path / "whole.zip"
+    with open(whole, 'wb') as f:
+        for volume in volumes:
+            with open(volume, 'rb') as part:
+                f.write(part.read())
+    
+    split_zip_file(str(whole), str(tmp_path / "out" / "src"), 2 * VOLUME_SIZE)
+    
+    assert volume_files(tmp_path) == ["src.z01", "src.zip"]
+
+def test_missing_volume_names_orphans(tmp_path):
+    volumes = compress(tmp_path, 3 * VOLUME_SIZE)
+    os.remove(volumes[1])
+    
+    with pytest.raises(FileNotFoundError) as excinfo:
+        find_volume_set(volumes[-1])
+    
+    message = str(excinfo.value)
+    assert "src.z02" in message and "src.z03" in message
@@ -1,854 +1,1457 @@
-import sys
-import os
-import pyzipper
-import shutil
-import requests
-import json
-import tempfile
-import zipfile
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QFileDialog, QProgressBar,
-    QCheckBox, QComboBox, QGroupBox, QGridLayout, QMessageBox,
-    QSpinBox, QDoubleSpinBox
-)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QPalette, QColor
-
-class CompressThread(QThread):
-    progress = pyqtSignal(float)
-    current_file = pyqtSignal(str)
-    file_progress = pyqtSignal(float)  # 单个文件的进度信号（0-100.0）
-    finished = pyqtSignal(bool, str)
-    
-    def __init__(self, source_path, output_dir, volume_size, password):
-        super().__init__()
-        self.source_path = source_path
-        self.output_dir = output_dir
-        self.volume_size = volume_size
-        self.password = password
-    
-    def get_total_size(self, path):
-        """计算文件或文件夹的总大小"""
-        total = 0
-        if os.path.isfile(path):
-            total += os.path.getsize(path)
-        else:
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    total += os.path.getsize(os.path.join(root, file))
-        return total
-    
-    def get_files_list(self, path):
-        """获取所有文件的列表，包括相对路径，确保没有重复"""
-        files = []
-        seen_files = set()  # 用于去重
-        base_dir = os.path.dirname(path) if os.path.isfile(path) else path
-        
-        if os.path.isfile(path):
-            arcname = os.path.basename(path)
-            if arcname not in seen_files:
-                files.append((path, arcname))
-                seen_files.add(arcname)
-        else:
-            for root, dirs, file_list in os.walk(path):
-                for file in file_list:
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, base_dir)
-                    if rel_path not in seen_files:
-                        files.append((file_path, rel_path))
-                        seen_files.add(rel_path)
-        return files
-    
-    def run(self):
-        try:
-            # 获取源文件/文件夹信息
-            source_name = os.path.basename(self.source_path)
-            output_base = os.path.join(self.output_dir, source_name)
-            
-            # 计算总大小和获取文件列表
-            total_size = self.get_total_size(self.source_path)
-            files_list = self.get_files_list(self.source_path)
-            
-            if total_size == 0 or not files_list:
-                self.finished.emit(False, "源文件或文件夹为空")
-                return
-            
-            # 初始化进度
-            processed_size = 0
-            
-            # 发送初始进度
-            self.progress.emit(0.0)
-            
-            # 创建临时完整ZIP文件
-            temp_zip = f"{output_base}.temp.zip"
-            
-            # 设置压缩参数
-            compression = pyzipper.ZIP_DEFLATED
-            
-            # 创建完整ZIP文件，使用pyzipper实现可靠的密码保护
-            with pyzipper.AESZipFile(
-                temp_zip, 'w', 
-                compression=compression,
-                encryption=pyzipper.WZ_AES if self.password else None
-            ) as zipf:
-                # 设置密码（如果有）
-                if self.password:
-                    zipf.setpassword(self.password.encode())
-                
-                # 压缩所有文件
-                for file_path, arcname in files_list:
-                    # 发送当前文件名信号
-                    self.current_file.emit(arcname)
-                    
-                    # 获取文件大小
-                    file_size = os.path.getsize(file_path)
-                    
-                    # 初始化文件进度
-                    self.file_progress.emit(0.0)
-                    
-                    # 使用pyzipper的write方法写入文件，它会自动处理压缩
-                    # 对于大文件，我们使用分块读取来模拟进度更新
-                    buffer_size = 8192  # 8KB缓冲区
-                    bytes_processed = 0
-                    
-                    # 打开原始文件，模拟进度更新
-                    with open(file_path, 'rb') as f_in:
-                        # 先读取整个文件以获取总大小（已经获取过，但这里用于模拟）
-                        while True:
-                            # 读取一块数据（不实际使用，只是为了计算进度）
-                            buffer = f_in.read(buffer_size)
-                            if not buffer:
-                                break
-                            # 更新已处理字节数
-                            bytes_processed += len(buffer)
-                            
-                            # 计算当前模拟进度
-                            file_progress = (bytes_processed / file_size) * 100.0
-                            # 确保进度在0-100之间
-                            file_progress = max(0.0, min(100.0, file_progress))
-                            # 发送文件进度更新
-                            self.file_progress.emit(file_progress)
-                    
-                    # 实际写入文件
-                    zipf.write(file_path, arcname)
-                    
-                    # 文件压缩完成，确保发送100%进度
-                    self.file_progress.emit(100.0)
-                    
-                    # 更新已处理大小
-                    processed_size += file_size
-                    
-                    # 计算当前总进度（使用100%表示完整压缩过程）
-                    current_progress = (processed_size / total_size) * 100.0
-                    
-                    # 确保进度值在0-100之间
-                    current_progress = max(0.0, min(100.0, current_progress))
-                    
-                    # 四舍五入到小数点后两位
-                    progress = round(current_progress, 2)
-                    
-                    # 发送总进度更新信号
-                    self.progress.emit(progress)
-            
-            # 检查ZIP文件大小
-            zip_size = os.path.getsize(temp_zip)
-            
-            # 如果不需要分卷，直接重命名并完成
-            if zip_size <= self.volume_size:
-                final_zip = f"{output_base}.zip"
-                os.rename(temp_zip, final_zip)
-                # 压缩完成，设置进度为100%
-                self.progress.emit(100.0)
-                self.finished.emit(True, f"压缩完成！输出位置：{final_zip}")
-                return
-            
-            # 需要分卷，分割成标准ZIP分卷格式
-            # 标准格式：base.zip (最后一个分卷), base.z01, base.z02... (前面的分卷)
-            
-            # 读取完整ZIP文件内容
-            with open(temp_zip, 'rb') as f:
-                zip_data = f.read()
-            
-            # 删除临时文件
-            os.remove(temp_zip)
-            
-            # 计算分卷数量
-            num_volumes = (zip_size + self.volume_size - 1) // self.volume_size
-            
-            # 分割文件成分卷
-            volumes = []
-            for i in range(num_volumes):
-                start = i * self.volume_size
-                end = min((i + 1) * self.volume_size, zip_size)
-                volume_data = zip_data[start:end]
-                
-                # 确定分卷文件名
-                if i == num_volumes - 1:
-                    # 最后一个分卷使用.zip扩展名
-                    volume_name = f"{output_base}.zip"
-                else:
-                    # 前面的分卷使用.z01, .z02...扩展名
-                    volume_name = f"{output_base}.z{str(i + 1).zfill(2)}"
-                
-                # 写入分卷文件
-                with open(volume_name, 'wb') as f:
-                    f.write(volume_data)
-                volumes.append(volume_name)
-            
-            # 压缩完成，设置进度为100%
-            self.progress.emit(100.0)
-            self.finished.emit(True, f"压缩完成！输出位置：{output_base}.*")
-        except Exception as e:
-            self.finished.emit(False, f"压缩失败：{str(e)}")
-
-# 更新检测线程
-class UpdateCheckThread(QThread):
-    update_available = pyqtSignal(str, str)  # 版本号, 下载链接
-    no_update = pyqtSignal()
-    error = pyqtSignal(str)
-    
-    def run(self):
-        try:
-            # 检测GitHub Release中的最新版本
-            url = "https://api.github.com/repos/CODMzhuzai/Split-Compression/releases/latest"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            release_data = response.json()
-            latest_version = release_data.get("tag_name", "")
-            
-            # 提取数字版本号（移除可能的前缀）
-            if latest_version.startswith("%"):
-                latest_version = latest_version[1:]
-            
-            # 获取下载链接
-            assets = release_data.get("assets", [])
-            download_url = None
-            for asset in assets:
-                if asset.get("name", "").endswith(".zip"):
-                    download_url = asset.get("browser_download_url")
-                    break
-            
-            if latest_version and download_url:
-                self.update_available.emit(latest_version, download_url)
-            else:
-                self.no_update.emit()
-        except Exception as e:
-            self.error.emit(str(e))
-
-# 更新下载线程
-class UpdateDownloadThread(QThread):
-    progress = pyqtSignal(int)  # 进度值 (0-100)
-    finished = pyqtSignal(str)  # 下载的文件路径
-    error = pyqtSignal(str)
-    
-    def __init__(self, download_url, save_path):
-        super().__init__()
-        self.download_url = download_url
-        self.save_path = save_path
-    
-    def run(self):
-        try:
-            response = requests.get(self.download_url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get("content-length", 0))
-            downloaded_size = 0
-            
-            with open(self.save_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        if total_size > 0:
-                            progress = (downloaded_size / total_size) * 100
-                            self.progress.emit(int(progress))
-            
-            self.finished.emit(self.save_path)
-        except Exception as e:
-            self.error.emit(str(e))
-
-class VolumeCompressor(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.current_version = "1.02"  # 当前版本
-        self.init_ui()
-        # 启动时检查更新
-        self.check_for_updates()
-        
-    def init_ui(self):
-        # 设置窗口样式
-        self.setWindowTitle("分卷压缩工具")
-        self.setGeometry(100, 100, 800, 500)
-        self.setMinimumSize(1200, 800)
-        
-        # 设置字体
-        font = QFont("Segoe UI", 10)
-        self.setFont(font)
-        
-        # 创建主部件和布局
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        
-        main_layout = QVBoxLayout(central_widget)
-        main_layout.setSpacing(20)
-        main_layout.setContentsMargins(30, 30, 30, 30)
-        
-        # 源文件选择
-        source_group = QGroupBox("源文件/文件夹")
-        source_layout = QHBoxLayout()
-        
-        self.source_line = QLineEdit()
-        self.source_line.setPlaceholderText("请选择要压缩的文件或文件夹")
-        self.source_line.setReadOnly(True)
-        
-        source_btn = QPushButton("浏览...")
-        source_btn.clicked.connect(self.select_source)
-        source_btn.setStyleSheet(self.get_button_style())
-        
-        source_layout.addWidget(self.source_line, 1)
-        source_layout.addWidget(source_btn)
-        source_group.setLayout(source_layout)
-        main_layout.addWidget(source_group)
-        
-        # 输出目录选择
-        output_group = QGroupBox("输出目录")
-        output_layout = QHBoxLayout()
-        
-        self.output_line = QLineEdit()
-        self.output_line.setPlaceholderText("请选择输出目录")
-        self.output_line.setReadOnly(True)
-        
-        output_btn = QPushButton("浏览...")
-        output_btn.clicked.connect(self.select_output)
-        output_btn.setStyleSheet(self.get_button_style())
-        
-        output_layout.addWidget(self.output_line, 1)
-        output_layout.addWidget(output_btn)
-        output_group.setLayout(output_layout)
-        main_layout.addWidget(output_group)
-        
-        # 压缩设置
-        settings_group = QGroupBox("压缩设置")
-        settings_layout = QGridLayout()
-        
-        # 分卷大小设置
-        settings_layout.addWidget(QLabel("分卷大小："), 0, 0)
-        
-        size_layout = QHBoxLayout()
-        self.size_spin = QDoubleSpinBox()
-        self.size_spin.setRange(1, 10240)
-        self.size_spin.setValue(100)
-        self.size_spin.setSuffix(" MB")
-        self.size_spin.setDecimals(0)
-        
-        self.size_unit = QComboBox()
-        self.size_unit.addItems(["MB", "GB"])
-        self.size_unit.currentTextChanged.connect(self.update_size_suffix)
-        
-        size_layout.addWidget(self.size_spin, 1)
-        size_layout.addWidget(self.size_unit, 0)
-        size_layout.setSpacing(10)
-        
-        settings_layout.addLayout(size_layout, 0, 1)
-        
-        # 密码设置
-        settings_layout.addWidget(QLabel("密码保护："), 1, 0)
-        
-        password_layout = QHBoxLayout()
-        self.password_check = QCheckBox("设置密码")
-        self.password_check.stateChanged.connect(self.toggle_password)
-        
-        self.password_edit = QLineEdit()
-        self.password_edit.setEchoMode(QLineEdit.Password)
-        self.password_edit.setEnabled(False)
-        
-        password_layout.addWidget(self.password_check)
-        password_layout.addWidget(self.password_edit, 1)
-        
-        settings_layout.addLayout(password_layout, 1, 1)
-        
-        settings_group.setLayout(settings_layout)
-        main_layout.addWidget(settings_group)
-        
-        # 总进度条 - 使用0-100范围支持整数精度
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setValue(0)
-        self.progress_bar.setStyleSheet(self.get_progress_style())
-        # 删除进度条显示格式，不显示任何文本
-        self.progress_bar.setFormat("")
-        # 使用0-100范围，支持1%精度
-        self.progress_bar.setMinimum(0)
-        self.progress_bar.setMaximum(100)
-        main_layout.addWidget(self.progress_bar)
-        
-        # 当前压缩文件标签
-        self.current_file_label = QLabel("准备压缩...")
-        self.current_file_label.setAlignment(Qt.AlignCenter)
-        self.current_file_label.setStyleSheet("color: #333; font-style: italic;")
-        main_layout.addWidget(self.current_file_label)
-        
-        # 单个文件进度条 - 显示当前文件的压缩进度，与主进度条保持相同大小
-        self.file_progress_bar = QProgressBar()
-        self.file_progress_bar.setValue(0)
-        self.file_progress_bar.setStyleSheet(self.get_progress_style())  # 使用与主进度条相同的样式
-        # 删除进度条显示格式，不显示任何文本
-        self.file_progress_bar.setFormat("")
-        # 使用0-100范围，支持1%精度
-        self.file_progress_bar.setMinimum(0)
-        self.file_progress_bar.setMaximum(100)
-        main_layout.addWidget(self.file_progress_bar)
-        
-        # 状态标签
-        self.status_label = QLabel("就绪")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet("color: #666;")
-        main_layout.addWidget(self.status_label)
-        
-        # 按钮布局
-        button_layout = QHBoxLayout()
-        button_layout.setSpacing(20)
-        
-        self.compress_btn = QPushButton("开始压缩")
-        self.compress_btn.clicked.connect(self.start_compress)
-        self.compress_btn.setStyleSheet(self.get_primary_button_style())
-        self.compress_btn.setMinimumHeight(40)
-        
-        clear_btn = QPushButton("清空")
-        clear_btn.clicked.connect(self.clear_all)
-        clear_btn.setStyleSheet(self.get_button_style())
-        clear_btn.setMinimumHeight(40)
-        
-        button_layout.addWidget(self.compress_btn, 1)
-        button_layout.addWidget(clear_btn)
-        
-        main_layout.addLayout(button_layout)
-        
-        # 版本号显示
-        version_layout = QHBoxLayout()
-        self.version_label = QLabel(f"版本：{self.current_version}")
-        self.version_label.setStyleSheet("color: #666; font-size: 12px;")
-        version_layout.addWidget(self.version_label)
-        version_layout.addStretch()  # 推到左边
-        main_layout.addLayout(version_layout)
-        
-        # 设置样式
-        self.setStyleSheet(self.get_global_style())
-    
-    def get_global_style(self):
-        return """
-            QMainWindow {
-                background-color: #f5f5f7;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 1px solid #e0e0e0;
-                border-radius: 8px;
-                margin-top: 10px;
-                padding: 15px;
-                background-color: white;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-                color: #333;
-            }
-            QLineEdit {
-                padding: 8px 12px;
-                border: 1px solid #e0e0e0;
-                border-radius: 6px;
-                background-color: white;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border-color: #007AFF;
-                outline: none;
-            }
-            QPushButton {
-                padding: 8px 16px;
-                border: none;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                cursor: pointer;
-            }
-            QCheckBox {
-                font-size: 14px;
-                color: #333;
-            }
-            QSpinBox, QDoubleSpinBox, QComboBox {
-                padding: 8px 12px;
-                border: 1px solid #e0e0e0;
-                border-radius: 6px;
-                background-color: white;
-                font-size: 14px;
-            }
-            QLabel {
-                font-size: 14px;
-                color: #333;
-            }
-        """
-    
-    def get_button_style(self):
-        return """
-            QPushButton {
-                background-color: #f0f0f0;
-                color: #333;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:pressed {
-                background-color: #d0d0d0;
-            }
-        """
-    
-    def get_primary_button_style(self):
-        return """
-            QPushButton {
-                background-color: #007AFF;
-                color: white;
-            }
-            QPushButton:hover {
-                background-color: #0056cc;
-            }
-            QPushButton:pressed {
-                background-color: #004099;
-            }
-            QPushButton:disabled {
-                background-color: #c7c7cc;
-                color: #ffffff;
-            }
-        """
-    
-    def get_progress_style(self):
-        return """
-            QProgressBar {
-                border: 1px solid #cccccc;
-                border-radius: 0px;
-                background-color: #f0f0f0;
-                height: 20px;
-                text-align: center;
-                font-size: 12px;
-            }
-            QProgressBar::chunk {
-                border-radius: 0px;
-                background-color: #4CAF50;
-            }
-        """
-    
-    def get_file_progress_style(self):
-        return """
-            QProgressBar {
-                border: 1px solid #cccccc;
-                border-radius: 0px;
-                background-color: #f0f0f0;
-                height: 16px;
-                text-align: center;
-                font-size: 10px;
-            }
-            QProgressBar::chunk {
-                border-radius: 0px;
-                background-color: #2196F3;
-            }
-        """
-    
-    def select_source(self):
-        # 先尝试选择文件
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "选择要压缩的文件", "", "所有文件 (*.*)"
-        )
-        
-        if not file_path:
-            # 如果没有选择文件，尝试选择文件夹
-            file_path = QFileDialog.getExistingDirectory(
-                self, "选择要压缩的文件夹", "", QFileDialog.ShowDirsOnly
-            )
-        
-        if file_path:
-            self.source_line.setText(file_path)
-    
-    def select_output(self):
-        dir_path = QFileDialog.getExistingDirectory(
-            self, "选择输出目录", ""
-        )
-        if dir_path:
-            self.output_line.setText(dir_path)
-    
-    def update_size_suffix(self, unit):
-        if unit == "MB":
-            self.size_spin.setRange(1, 10240)
-            self.size_spin.setValue(100)
-        else:
-            self.size_spin.setRange(1, 10)
-            self.size_spin.setValue(1)
-        self.size_spin.setSuffix(f" {unit}")
-    
-    def toggle_password(self, state):
-        self.password_edit.setEnabled(state == Qt.Checked)
-    
-    def start_compress(self):
-        # 检查输入
-        source_path = self.source_line.text()
-        output_dir = self.output_line.text()
-        
-        if not source_path:
-            QMessageBox.warning(self, "警告", "请选择要压缩的文件或文件夹")
-            return
-        
-        if not output_dir:
-            QMessageBox.warning(self, "警告", "请选择输出目录")
-            return
-        
-        # 计算分卷大小（转换为字节）
-        size_value = self.size_spin.value()
-        size_unit = self.size_unit.currentText()
-        volume_size = int(size_value * 1024 * 1024)  # MB
-        if size_unit == "GB":
-            volume_size = int(size_value * 1024 * 1024 * 1024)  # GB
-        
-        # 获取密码
-        password = self.password_edit.text() if self.password_check.isChecked() else None
-        
-        # 禁用按钮
-        self.compress_btn.setEnabled(False)
-        self.status_label.setText("正在压缩...")
-        
-        # 创建压缩线程
-        self.compress_thread = CompressThread(source_path, output_dir, volume_size, password)
-        self.compress_thread.progress.connect(self.update_progress)
-        self.compress_thread.current_file.connect(self.update_current_file)
-        self.compress_thread.file_progress.connect(self.update_file_progress)  # 连接单个文件进度信号
-        self.compress_thread.finished.connect(self.compress_finished)
-        self.compress_thread.start()
-    
-    def update_current_file(self, filename):
-        """更新当前压缩文件标签"""
-        self.current_file_label.setText(f"正在压缩：{filename}")
-    
-    def update_progress(self, value):
-        """更新总进度条"""
-        # 将浮点数进度值（0-100.0）转换为整数（0-100）以支持1%精度
-        clamped_value = max(0.0, min(100.0, value))
-        # 四舍五入到一位小数
-        progress_value = round(clamped_value, 1)
-        # 确保进度值在0-100范围内
-        progress_value = max(0.0, min(100.0, progress_value))
-        # 进度条使用整数范围0-100，直接转换为整数
-        self.progress_bar.setValue(int(round(progress_value)))
-        # 更新状态标签，显示当前进度值（一位小数）
-        self.status_label.setText(f"压缩中... {progress_value:.1f}%")
-    
-    def update_file_progress(self, value):
-        """更新单个文件进度条"""
-        # 将浮点数进度值（0-100.0）转换为整数（0-100）以支持1%精度
-        clamped_value = max(0.0, min(100.0, value))
-        # 四舍五入到一位小数
-        progress_value = round(clamped_value, 1)
-        # 确保进度值在0-100范围内
-        progress_value = max(0.0, min(100.0, progress_value))
-        # 进度条使用整数范围0-100，直接转换为整数
-        self.file_progress_bar.setValue(int(round(progress_value)))
-    
-    def compress_finished(self, success, message):
-        self.compress_btn.setEnabled(True)
-        self.status_label.setText("就绪")
-        self.current_file_label.setText("准备压缩...")
-        
-        if success:
-            QMessageBox.information(self, "成功", message)
-        else:
-            QMessageBox.critical(self, "失败", message)
-        
-        # 重置所有进度条为0
-        self.progress_bar.setValue(0)
-        self.file_progress_bar.setValue(0)
-    
-    def clear_all(self):
-        self.source_line.clear()
-        self.output_line.clear()
-        self.size_spin.setValue(100)
-        self.size_unit.setCurrentIndex(0)
-        self.password_check.setChecked(False)
-        self.password_edit.clear()
-        self.progress_bar.setValue(0)
-        self.file_progress_bar.setValue(0)  # 重置单个文件进度条
-        self.current_file_label.setText("准备压缩...")
-        self.status_label.setText("就绪")
-    
-    def check_for_updates(self):
-        """检查更新"""
-        self.update_thread = UpdateCheckThread()
-        self.update_thread.update_available.connect(self.on_update_available)
-        self.update_thread.no_update.connect(self.on_no_update)
-        self.update_thread.error.connect(self.on_update_error)
-        self.update_thread.start()
-    
-    def compare_versions(self, version1, version2):
-        """比较版本号，返回True如果version1 < version2"""
-        try:
-            # 将版本号转换为浮点数进行比较
-            v1 = float(version1)
-            v2 = float(version2)
-            return v1 < v2
-        except ValueError:
-            return False
-    
-    def on_update_available(self, latest_version, download_url):
-        """发现新版本"""
-        if self.compare_versions(self.current_version, latest_version):
-            # 显示更新对话框，不可取消
-            reply = QMessageBox.information(
-                self,
-                "发现新版本",
-                f"当前版本：{self.current_version}\n最新版本：{latest_version}\n\n正在准备下载更新...",
-                QMessageBox.Ok,
-                QMessageBox.Ok
-            )
-            
-            if reply == QMessageBox.Ok:
-                self.download_update(latest_version, download_url)
-    
-    def on_no_update(self):
-        """没有新版本"""
-        # 只在调试时显示，实际运行时可以隐藏
-        # QMessageBox.information(self, "更新检查", "当前已是最新版本")
-        pass
-    
-    def on_update_error(self, error):
-        """更新检查错误"""
-        # 只在调试时显示，实际运行时可以隐藏
-        # QMessageBox.warning(self, "更新检查失败", f"检查更新时出错：{error}")
-        pass
-    
-    def download_update(self, latest_version, download_url):
-        """下载更新"""
-        # 创建更新下载对话框
-        self.update_progress_dialog = QWidget(self)
-        self.update_progress_dialog.setWindowTitle("更新中")
-        self.update_progress_dialog.setGeometry(200, 200, 400, 150)
-        self.update_progress_dialog.setWindowModality(Qt.ApplicationModal)  # 不可取消
-        
-        layout = QVBoxLayout()
-        
-        label = QLabel(f"正在下载更新 {latest_version}...")
-        layout.addWidget(label)
-        
-        self.update_progress_bar = QProgressBar()
-        self.update_progress_bar.setRange(0, 100)
-        self.update_progress_bar.setValue(0)
-        layout.addWidget(self.update_progress_bar)
-        
-        status_label = QLabel("0%")
-        status_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(status_label)
-        
-        self.update_progress_dialog.setLayout(layout)
-        self.update_progress_dialog.show()
-        
-        # 创建临时文件保存更新包
-        temp_dir = tempfile.gettempdir()
-        self.update_file = os.path.join(temp_dir, f"update_{latest_version}.zip")
-        
-        # 开始下载
-        self.download_thread = UpdateDownloadThread(download_url, self.update_file)
-        self.download_thread.progress.connect(self.update_progress_bar.setValue)
-        self.download_thread.progress.connect(lambda value: status_label.setText(f"{value}%"))
-        self.download_thread.finished.connect(self.on_update_downloaded)
-        self.download_thread.error.connect(self.on_update_download_error)
-        self.download_thread.start()
-    
-    def on_update_downloaded(self, file_path):
-        """更新下载完成"""
-        try:
-            # 关闭下载对话框
-            self.update_progress_dialog.close()
-            
-            # 解压更新包
-            temp_dir = tempfile.gettempdir()
-            extract_dir = os.path.join(temp_dir, "update_extract")
-            if not os.path.exists(extract_dir):
-                os.makedirs(extract_dir)
-            
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # 查找主程序文件
-            main_file = None
-            for root, dirs, files in os.walk(extract_dir):
-                for file in files:
-                    if file == "分卷压缩工具.exe":
-                        main_file = os.path.join(root, file)
-                        break
-                if main_file:
-                    break
-            
-            if main_file:
-                # 获取当前程序信息
-                current_exe = sys.executable
-                current_dir = os.path.dirname(current_exe)
-                
-                # 新程序路径（放在同一目录下）
-                new_exe = os.path.join(current_dir, "分卷压缩工具.exe")
-                
-                # 关闭当前程序并替换
-                QMessageBox.information(
-                    self,
-                    "更新完成",
-                    "更新已成功下载！程序将重启以应用更新。",
-                    QMessageBox.Ok,
-                    QMessageBox.Ok
-                )
-                
-                # 清理临时文件
-                os.remove(file_path)
-                
-                # 创建更新脚本
-                update_script = os.path.join(temp_dir, "update_script.bat")
-                with open(update_script, "w") as f:
-                    f.write(f"@echo off\n")
-                    f.write(f"echo 正在更新程序...\n")
-                    f.write(f"timeout /t 2 /nobreak >nul\n")
-                    # 替换旧版本
-                    f.write(f"if exist \"{current_exe}\" del /f /q \"{current_exe}\"\n")
-                    # 将新程序移动到当前程序位置
-                    f.write(f"copy /y \"{main_file}\" \"{new_exe}\"\n")
-                    # 删除备份文件（如果存在）
-                    f.write(f"if exist \"{current_exe}.bak\" del /f /q \"{current_exe}.bak\"\n")
-                    # 启动新程序
-                    f.write(f"start \"\" \"{new_exe}\"\n")
-                    # 清理自身
-                    f.write(f"del /f /q \"{update_script}\"\n")
-                    # 删除临时解压目录
-                    f.write(f"rd /s /q \"{extract_dir}\"\n")
-                
-                # 退出当前程序并运行更新脚本
-                QApplication.quit()
-                os.startfile(update_script)
-            else:
-                QMessageBox.critical(self, "更新失败", "未找到主程序文件")
-                # 清理临时文件
-                os.remove(file_path)
-                shutil.rmtree(extract_dir)
-        except Exception as e:
-            QMessageBox.critical(self, "更新失败", f"更新安装失败：{str(e)}")
-            # 清理临时文件
-            try:
-                os.remove(file_path)
-                shutil.rmtree(extract_dir)
-            except:
-                pass
-    
-    def on_update_download_error(self, error):
-        """更新下载错误"""
-        self.update_progress_dialog.close()
-        QMessageBox.critical(self, "下载失败", f"更新下载失败：{error}")
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = VolumeCompressor()
-    window.show()
-    sys.exit(app.exec_())
+import sys
+import os
+import json
+import time
+import importlib.util
+
+_MODULE_START = time.perf_counter()
+_PRELOADED_MODULES = set(sys.modules)  # 解释器启动时已经加载的模块（例如site导入的）
+
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLabel, QLineEdit, QFileDialog, QProgressBar,
+    QCheckBox, QComboBox, QGroupBox, QGridLayout, QMessageBox,
+    QSpinBox, QDoubleSpinBox, QTableWidget, QTableWidgetItem, QHeaderView,
+    QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QThread, QObject, QTimer, QEvent, pyqtSignal
+from PyQt5.QtGui import QFont, QPalette, QColor
+
+_QT_IMPORTED = time.perf_counter()
+
+# 这里只导入建立界面需要的轻量模块；压缩引擎（pyzipper等）、requests、zipfile和shutil
+# 在第一次压缩、解压、分割或检查更新时才导入，窗口可以尽快显示出来
+from split_compression.batch import CANCELLED, DONE, FAILED, PENDING, RUNNING, JobScheduler, load_job_list
+from split_compression.codecs import COMPRESSION_METHODS, COMPRESSION_PRESETS, is_zstd_available
+from split_compression.stats import STAGE_LABELS, format_duration
+
+_MODULES_IMPORTED = time.perf_counter()
+
+# 启动时不应加载的模块，--startup-benchmark发现它们在首次绘制前被导入时报告失败
+DEFERRED_MODULES = [
+    "pyzipper", "requests", "zipfile", "shutil", "numpy", "zstandard", "xxhash",
+    "split_compression.engine", "split_compression.extract", "split_compression.volumes",
+]
+
+# 分割已有ZIP文件的线程
+class SplitThread(QThread):
+    progress = pyqtSignal(float)
+    finished = pyqtSignal(bool, str)
+    
+    def __init__(self, zip_path, output_dir, volume_size):
+        super().__init__()
+        self.zip_path = zip_path
+        self.output_dir = output_dir
+        self.volume_size = volume_size
+    
+    def on_progress(self, copied_size, total_size):
+        if total_size > 0:
+            self.progress.emit(round(copied_size / total_size * 100.0, 2))
+    
+    def run(self):
+        from split_compression.volumes import split_zip_file
+        
+        try:
+            # 分卷名沿用源ZIP的文件名（去掉.zip扩展名）
+            zip_name = os.path.splitext(os.path.basename(self.zip_path))[0]
+            output_base = os.path.join(self.output_dir, zip_name)
+            
+            self.progress.emit(0.0)
+            volumes = split_zip_file(self.zip_path, output_base, self.volume_size, self.on_progress)
+            self.progress.emit(100.0)
+            
+            if len(volumes) == 1:
+                self.finished.emit(True, f"ZIP文件小于分卷大小，无需分割。输出位置：{volumes[0]}")
+            else:
+                self.finished.emit(True, f"分割完成！共{len(volumes)}个分卷，输出位置：{output_base}.*")
+        except Exception as e:
+            self.finished.emit(False, f"分割失败：{str(e)}")
+
+class CompressThread(QThread):
+    """在后台线程中运行压缩引擎，把进度回调转换为Qt信号"""
+    progress = pyqtSignal(float)
+    current_file = pyqtSignal(str)
+    file_progress = pyqtSignal(float)  # 单个文件的进度信号（0-100.0）
+    stats = pyqtSignal(object)  # 分阶段统计快照（只在启用统计时发送）
+    finished = pyqtSignal(bool, str)
+    
+    def __init__(self, source_path, output_dir, volume_size, password, stats=False, **options):
+        super().__init__()
+        from split_compression.engine import CompressJob
+        
+        callbacks = {
+            "progress": self.progress.emit,
+            "current_file": self.current_file.emit,
+            "file_progress": self.file_progress.emit,
+        }
+        if stats:
+            callbacks["stats"] = self.stats.emit
+        self.job = CompressJob(source_path, output_dir, volume_size, password, callbacks=callbacks, **options)
+    
+    def cancel(self):
+        self.job.cancel()
+    
+    def pause(self):
+        self.job.pause()
+    
+    def resume(self):
+        self.job.resume()
+    
+    def is_paused(self):
+        return self.job.is_paused()
+    
+    def run(self):
+        from split_compression.engine import CompressCancelled
+        
+        try:
+            volumes = self.job.run()
+            self.finished.emit(True, self.job.format_summary(volumes))
+        except CompressCancelled:
+            self.finished.emit(False, "压缩已取消，未完成的分卷已删除")
+        except Exception as e:
+            message = f"压缩失败：{str(e)}"
+            if self.job.failure_note:
+                message += f"\n\n{self.job.failure_note}"
+            self.finished.emit(False, message)
+
+class QueueSignals(QObject):
+    """把批量任务调度器在工作线程中的回调转换为Qt信号"""
+    state_changed = pyqtSignal(object)
+    progress = pyqtSignal(object)
+    all_done = pyqtSignal()
+
+class ExtractThread(QThread):
+    """直接从分卷中解压，不需要先合并分卷"""
+    progress = pyqtSignal(float)
+    current_file = pyqtSignal(str)
+    file_progress = pyqtSignal(float)
+    finished = pyqtSignal(bool, str)
+    
+    def __init__(self, archive_path, output_dir, password, workers=1):
+        super().__init__()
+        from split_compression.extract import ExtractJob
+        
+        self.output_dir = output_dir
+        self.job = ExtractJob(
+            archive_path, output_dir, password, workers=workers,
+            callbacks={
+                "progress": self.progress.emit,
+                "current_file": self.current_file.emit,
+                "file_progress": self.file_progress.emit,
+            },
+        )
+    
+    def run(self):
+        try:
+            count = self.job.run()
+            self.finished.emit(True, f"解压完成！共{count}个文件，输出位置：{self.output_dir}")
+        except Exception as e:
+            self.finished.emit(False, f"解压失败：{str(e)}")
+
+# 更新检测线程
+class UpdateCheckThread(QThread):
+    update_available = pyqtSignal(str, str, str)  # 版本号, 下载链接, SHA-256（未知时为空）
+    no_update = pyqtSignal()
+    error = pyqtSignal(str)
+    
+    def run(self):
+        from split_compression.updates import fetch_release, parse_release
+        
+        try:
+            # 检测GitHub Release中的最新版本（按ETag缓存，缓存未过期时不发送请求）
+            release_data = fetch_release()
+            latest_version, download_url, sha256 = parse_release(release_data)
+            
+            if latest_version and download_url:
+                self.update_available.emit(latest_version, download_url, sha256 or "")
+            else:
+                self.no_update.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+# 更新下载线程
+class UpdateDownloadThread(QThread):
+    progress = pyqtSignal(int)  # 进度值 (0-100)
+    finished = pyqtSignal(str)  # 下载的文件路径
+    error = pyqtSignal(str)
+    
+    def __init__(self, download_url, save_path, sha256=None):
+        super().__init__()
+        self.download_url = download_url
+        self.save_path = save_path
+        self.sha256 = sha256 or None
+        self.last_progress = -1
+    
+    def on_progress(self, downloaded_size, total_size):
+        if total_size > 0:
+            progress = int(downloaded_size / total_size * 100)
+            # 只在百分比变化时发送信号
+            if progress != self.last_progress:
+                self.last_progress = progress
+                self.progress.emit(progress)
+    
+    def run(self):
+        from split_compression.updates import download_file
+        
+        try:
+            # 下载到.part文件，中断后再次下载时从已下载的位置继续，完成后校验SHA-256
+            download_file(self.download_url, self.save_path, self.sha256, progress=self.on_progress)
+            self.finished.emit(self.save_path)
+        except Exception as e:
+            self.error.emit(str(e))
+
+class VolumeCompressor(QMainWindow):
+    UPDATE_CHECK_DELAY = 2000  # 启动后多久检查更新（毫秒）
+    
+    # 读写缓冲区的可选大小
+    IO_BUFFER_SIZES = {
+        "256 KB": 256 * 1024,
+        "1 MB": 1024 * 1024,
+        "4 MB": 4 * 1024 * 1024,
+        "16 MB": 16 * 1024 * 1024,
+    }
+    
+    def __init__(self):
+        super().__init__()
+        self.current_version = "1.02"  # 当前版本
+        self.init_ui()
+        # 窗口显示出来以后再检查更新，网络请求和requests的导入不拖慢启动
+        QTimer.singleShot(self.UPDATE_CHECK_DELAY, self.check_for_updates)
+        
+    def init_ui(self):
+        # 设置窗口样式
+        self.setWindowTitle("分卷压缩工具")
+        self.setGeometry(100, 100, 800, 500)
+        self.setMinimumSize(1200, 800)
+        
+        # 设置字体
+        font = QFont("Segoe UI", 10)
+        self.setFont(font)
+        
+        # 创建主部件和布局
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setSpacing(20)
+        main_layout.setContentsMargins(30, 30, 30, 30)
+        
+        # 源文件选择
+        source_group = QGroupBox("源文件/文件夹")
+        source_layout = QHBoxLayout()
+        
+        self.source_line = QLineEdit()
+        self.source_line.setPlaceholderText("请选择要压缩的文件或文件夹")
+        self.source_line.setReadOnly(True)
+        
+        source_btn = QPushButton("浏览...")
+        source_btn.clicked.connect(self.select_source)
+        source_btn.setStyleSheet(self.get_button_style())
+        
+        source_layout.addWidget(self.source_line, 1)
+        source_layout.addWidget(source_btn)
+        source_group.setLayout(source_layout)
+        main_layout.addWidget(source_group)
+        
+        # 输出目录选择
+        output_group = QGroupBox("输出目录")
+        output_layout = QHBoxLayout()
+        
+        self.output_line = QLineEdit()
+        self.output_line.setPlaceholderText("请选择输出目录")
+        self.output_line.setReadOnly(True)
+        
+        output_btn = QPushButton("浏览...")
+        output_btn.clicked.connect(self.select_output)
+        output_btn.setStyleSheet(self.get_button_style())
+        
+        output_layout.addWidget(self.output_line, 1)
+        output_layout.addWidget(output_btn)
+        output_group.setLayout(output_layout)
+        main_layout.addWidget(output_group)
+        
+        # 压缩设置
+        settings_group = QGroupBox("压缩设置")
+        settings_layout = QGridLayout()
+        
+        # 分卷大小设置
+        settings_layout.addWidget(QLabel("分卷大小："), 0, 0)
+        
+        size_layout = QHBoxLayout()
+        self.size_spin = QDoubleSpinBox()
+        self.size_spin.setRange(1, 10240)
+        self.size_spin.setValue(100)
+        self.size_spin.setSuffix(" MB")
+        self.size_spin.setDecimals(0)
+        
+        self.size_unit = QComboBox()
+        self.size_unit.addItems(["MB", "GB"])
+        self.size_unit.currentTextChanged.connect(self.update_size_suffix)
+        
+        size_layout.addWidget(self.size_spin, 1)
+        size_layout.addWidget(self.size_unit, 0)
+        size_layout.setSpacing(10)
+        
+        settings_layout.addLayout(size_layout, 0, 1)
+        
+        # 密码设置
+        settings_layout.addWidget(QLabel("密码保护："), 1, 0)
+        
+        password_layout = QHBoxLayout()
+        self.password_check = QCheckBox("设置密码")
+        self.password_check.stateChanged.connect(self.toggle_password)
+        
+        self.password_edit = QLineEdit()
+        self.password_edit.setEchoMode(QLineEdit.Password)
+        self.password_edit.setEnabled(False)
+        
+        password_layout.addWidget(self.password_check)
+        password_layout.addWidget(self.password_edit, 1)
+        
+        settings_layout.addLayout(password_layout, 1, 1)
+        
+        # 压缩线程数设置（大于1时启用多核并行压缩）
+        settings_layout.addWidget(QLabel("压缩线程："), 2, 0)
+        
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(1)
+        self.workers_spin.setSuffix(" 线程")
+        settings_layout.addWidget(self.workers_spin, 2, 1)
+        
+        # 自动存储设置（已压缩的文件不再重复压缩）
+        settings_layout.addWidget(QLabel("智能存储："), 3, 0)
+        
+        self.auto_store_check = QCheckBox("自动跳过已压缩的文件（图片、视频、压缩包等直接存储）")
+        self.auto_store_check.setChecked(True)
+        settings_layout.addWidget(self.auto_store_check, 3, 1)
+        
+        # 压缩方式和级别设置
+        settings_layout.addWidget(QLabel("压缩方式："), 4, 0)
+        
+        method_layout = QHBoxLayout()
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(["自定义"] + list(COMPRESSION_PRESETS))
+        self.preset_combo.currentTextChanged.connect(self.apply_preset)
+        
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(list(COMPRESSION_METHODS))
+        if not is_zstd_available():
+            # 未安装zstandard模块时不能选择ZSTD
+            index = self.method_combo.findText("ZSTD")
+            self.method_combo.model().item(index).setEnabled(False)
+            self.method_combo.setItemData(index, "需要安装zstandard模块", Qt.ToolTipRole)
+        self.method_combo.currentTextChanged.connect(self.update_level_range)
+        
+        self.level_spin = QSpinBox()
+        self.level_spin.setPrefix("级别 ")
+        self.level_spin.valueChanged.connect(self.mark_custom_preset)
+        
+        method_layout.addWidget(self.preset_combo, 0)
+        method_layout.addWidget(self.method_combo, 1)
+        method_layout.addWidget(self.level_spin, 0)
+        method_layout.setSpacing(10)
+        
+        settings_layout.addLayout(method_layout, 4, 1)
+        self.preset_combo.setCurrentText("均衡")
+        
+        # 增量压缩设置（未变化的文件直接复用上次压缩包中的数据）
+        settings_layout.addWidget(QLabel("增量压缩："), 5, 0)
+        
+        self.incremental_check = QCheckBox("复用输出目录中上次压缩包里未变化的文件")
+        settings_layout.addWidget(self.incremental_check, 5, 1)
+        
+        # 恢复卷设置（丢失或损坏的分卷可以用恢复卷修复）
+        settings_layout.addWidget(QLabel("恢复卷："), 6, 0)
+        
+        self.parity_spin = QSpinBox()
+        self.parity_spin.setRange(0, 16)
+        self.parity_spin.setValue(0)
+        self.parity_spin.setSuffix(" 个")
+        self.parity_spin.setToolTip("同时生成的恢复卷数，最多可以修复这么多个丢失或损坏的分卷")
+        # 与parity.is_numpy_available相同，只是不导入parity模块（导入时要建GF(256)运算表）
+        if importlib.util.find_spec("numpy") is None:
+            # 未安装numpy模块时不能生成恢复卷
+            self.parity_spin.setEnabled(False)
+            self.parity_spin.setToolTip("需要安装numpy模块")
+        settings_layout.addWidget(self.parity_spin, 6, 1)
+        
+        # 性能统计设置（关闭时压缩引擎不计时）
+        settings_layout.addWidget(QLabel("性能统计："), 7, 0)
+        
+        self.stats_check = QCheckBox("显示各阶段的耗时、速度和剩余时间")
+        self.stats_check.toggled.connect(self.toggle_stats_panel)
+        settings_layout.addWidget(self.stats_check, 7, 1)
+        
+        # 读写缓冲区设置（高速SSD阵列或网络存储上使用更大的缓冲区）
+        settings_layout.addWidget(QLabel("读写缓冲："), 8, 0)
+        
+        io_layout = QHBoxLayout()
+        self.io_buffer_combo = QComboBox()
+        self.io_buffer_combo.addItems(list(self.IO_BUFFER_SIZES))
+        self.io_buffer_combo.setCurrentText("1 MB")
+        
+        self.mmap_check = QCheckBox("大文件（64MB以上）使用内存映射读取")
+        
+        io_layout.addWidget(self.io_buffer_combo, 0)
+        io_layout.addWidget(self.mmap_check, 1)
+        io_layout.setSpacing(10)
+        settings_layout.addLayout(io_layout, 8, 1)
+        
+        settings_group.setLayout(settings_layout)
+        main_layout.addWidget(settings_group)
+        
+        # 性能统计面板：当前/平均速度、剩余时间和各阶段的累计耗时
+        self.stats_group = QGroupBox("性能统计")
+        stats_layout = QVBoxLayout()
+        
+        self.stats_label = QLabel("开始压缩后显示统计")
+        self.stats_label.setStyleSheet("color: #666;")
+        stats_layout.addWidget(self.stats_label)
+        
+        self.stats_table = QTableWidget(0, 4)
+        self.stats_table.setHorizontalHeaderLabels(["阶段", "耗时", "数据量", "速度"])
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.setMinimumHeight(120)
+        stats_layout.addWidget(self.stats_table)
+        
+        self.stats_group.setLayout(stats_layout)
+        self.stats_group.setVisible(False)
+        main_layout.addWidget(self.stats_group)
+        
+        # 批量任务队列：按CPU核数和每个磁盘的并发写入数同时运行多个压缩任务
+        queue_group = QGroupBox("批量任务")
+        queue_layout = QVBoxLayout()
+        
+        self.queue_table = QTableWidget(0, 4)
+        self.queue_table.setHorizontalHeaderLabels(["源文件/文件夹", "输出目录", "状态", "进度"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.queue_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.setMinimumHeight(120)
+        queue_layout.addWidget(self.queue_table)
+        
+        queue_button_layout = QHBoxLayout()
+        queue_button_layout.setSpacing(10)
+        
+        add_queue_btn = QPushButton("加入队列")
+        add_queue_btn.clicked.connect(self.add_to_queue)
+        add_queue_btn.setStyleSheet(self.get_button_style())
+        
+        import_queue_btn = QPushButton("导入任务列表...")
+        import_queue_btn.clicked.connect(self.import_job_list)
+        import_queue_btn.setStyleSheet(self.get_button_style())
+        
+        self.start_queue_btn = QPushButton("开始队列")
+        self.start_queue_btn.clicked.connect(self.start_queue)
+        self.start_queue_btn.setStyleSheet(self.get_button_style())
+        
+        self.cancel_queue_btn = QPushButton("取消队列")
+        self.cancel_queue_btn.clicked.connect(self.cancel_queue)
+        self.cancel_queue_btn.setStyleSheet(self.get_button_style())
+        self.cancel_queue_btn.setEnabled(False)
+        
+        clear_queue_btn = QPushButton("清除已结束")
+        clear_queue_btn.clicked.connect(self.clear_finished_jobs)
+        clear_queue_btn.setStyleSheet(self.get_button_style())
+        
+        self.io_limit_spin = QSpinBox()
+        self.io_limit_spin.setRange(1, 8)
+        self.io_limit_spin.setValue(1)
+        self.io_limit_spin.setPrefix("每个磁盘同时 ")
+        self.io_limit_spin.setSuffix(" 个任务")
+        self.io_limit_spin.valueChanged.connect(self.update_io_limit)
+        
+        queue_button_layout.addWidget(add_queue_btn)
+        queue_button_layout.addWidget(import_queue_btn)
+        queue_button_layout.addWidget(self.start_queue_btn)
+        queue_button_layout.addWidget(self.cancel_queue_btn)
+        queue_button_layout.addWidget(clear_queue_btn)
+        queue_button_layout.addStretch()
+        queue_button_layout.addWidget(self.io_limit_spin)
+        queue_layout.addLayout(queue_button_layout)
+        
+        # 队列的合计进度和吞吐量
+        self.queue_status_label = QLabel("队列为空")
+        self.queue_status_label.setStyleSheet("color: #666;")
+        queue_layout.addWidget(self.queue_status_label)
+        
+        queue_group.setLayout(queue_layout)
+        main_layout.addWidget(queue_group)
+        
+        # 调度器的回调在工作线程中执行，通过信号回到界面线程
+        self.queue_signals = QueueSignals()
+        self.queue_signals.state_changed.connect(self.update_queue_row)
+        self.queue_signals.progress.connect(self.update_queue_row)
+        self.queue_signals.all_done.connect(self.queue_finished)
+        self.scheduler = JobScheduler(io_limit=self.io_limit_spin.value(), callbacks={
+            "state": self.queue_signals.state_changed.emit,
+            "progress": self.queue_signals.progress.emit,
+            "all_done": self.queue_signals.all_done.emit,
+        })
+        self.queue_rows = {}  # 任务编号 -> 表格行
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(1000)
+        self.queue_timer.timeout.connect(self.update_queue_status)
+        
+        # 总进度条 - 使用0-100范围支持整数精度
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setStyleSheet(self.get_progress_style())
+        # 删除进度条显示格式，不显示任何文本
+        self.progress_bar.setFormat("")
+        # 使用0-100范围，支持1%精度
+        self.progress_bar.setMinimum(0)
+        self.progress_bar.setMaximum(100)
+        main_layout.addWidget(self.progress_bar)
+        
+        # 当前压缩文件标签
+        self.current_file_label = QLabel("准备压缩...")
+        self.current_file_label.setAlignment(Qt.AlignCenter)
+        self.current_file_label.setStyleSheet("color: #333; font-style: italic;")
+        main_layout.addWidget(self.current_file_label)
+        
+        # 单个文件进度条 - 显示当前文件的压缩进度，与主进度条保持相同大小
+        self.file_progress_bar = QProgressBar()
+        self.file_progress_bar.setValue(0)
+        self.file_progress_bar.setStyleSheet(self.get_progress_style())  # 使用与主进度条相同的样式
+        # 删除进度条显示格式，不显示任何文本
+        self.file_progress_bar.setFormat("")
+        # 使用0-100范围，支持1%精度
+        self.file_progress_bar.setMinimum(0)
+        self.file_progress_bar.setMaximum(100)
+        main_layout.addWidget(self.file_progress_bar)
+        
+        # 状态标签
+        self.status_label = QLabel("就绪")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: #666;")
+        main_layout.addWidget(self.status_label)
+        
+        # 按钮布局
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+        
+        self.compress_btn = QPushButton("开始压缩")
+        self.compress_btn.clicked.connect(self.start_compress)
+        self.compress_btn.setStyleSheet(self.get_primary_button_style())
+        self.compress_btn.setMinimumHeight(40)
+        
+        clear_btn = QPushButton("清空")
+        clear_btn.clicked.connect(self.clear_all)
+        clear_btn.setStyleSheet(self.get_button_style())
+        clear_btn.setMinimumHeight(40)
+        
+        # 分割已有ZIP文件按钮
+        self.split_btn = QPushButton("分割已有ZIP")
+        self.split_btn.clicked.connect(self.start_split)
+        self.split_btn.setStyleSheet(self.get_button_style())
+        self.split_btn.setMinimumHeight(40)
+        
+        # 直接从分卷解压按钮
+        self.extract_btn = QPushButton("解压分卷")
+        self.extract_btn.clicked.connect(self.start_extract)
+        self.extract_btn.setStyleSheet(self.get_button_style())
+        self.extract_btn.setMinimumHeight(40)
+        
+        # 暂停/继续和取消按钮，只在压缩过程中可用
+        self.pause_btn = QPushButton("暂停")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.setStyleSheet(self.get_button_style())
+        self.pause_btn.setMinimumHeight(40)
+        self.pause_btn.setEnabled(False)
+        
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.clicked.connect(self.cancel_compress)
+        self.cancel_btn.setStyleSheet(self.get_button_style())
+        self.cancel_btn.setMinimumHeight(40)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_requested = False
+        
+        button_layout.addWidget(self.compress_btn, 1)
+        button_layout.addWidget(self.pause_btn)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.split_btn)
+        button_layout.addWidget(self.extract_btn)
+        button_layout.addWidget(clear_btn)
+        
+        main_layout.addLayout(button_layout)
+        
+        # 版本号显示
+        version_layout = QHBoxLayout()
+        self.version_label = QLabel(f"版本：{self.current_version}")
+        self.version_label.setStyleSheet("color: #666; font-size: 12px;")
+        version_layout.addWidget(self.version_label)
+        version_layout.addStretch()  # 推到左边
+        main_layout.addLayout(version_layout)
+        
+        # 设置样式
+        self.setStyleSheet(self.get_global_style())
+    
+    def get_global_style(self):
+        return """
+            QMainWindow {
+                background-color: #f5f5f7;
+            }
+            QGroupBox {
+                font-weight: bold;
+                border: 1px solid #e0e0e0;
+                border-radius: 8px;
+                margin-top: 10px;
+                padding: 15px;
+                background-color: white;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px 0 5px;
+                color: #333;
+            }
+            QLineEdit {
+                padding: 8px 12px;
+                border: 1px solid #e0e0e0;
+                border-radius: 6px;
+                background-color: white;
+                font-size: 14px;
+            }
+            QLineEdit:focus {
+                border-color: #007AFF;
+                outline: none;
+            }
+            QPushButton {
+                padding: 8px 16px;
+                border: none;
+                border-radius: 6px;
+                font-size: 14px;
+                font-weight: bold;
+                cursor: pointer;
+            }
+            QCheckBox {
+                font-size: 14px;
+                color: #333;
+            }
+            QSpinBox, QDoubleSpinBox, QComboBox {
+                padding: 8px 12px;
+                border: 1px solid #e0e0e0;
+                border-radius: 6px;
+                background-color: white;
+                font-size: 14px;
+            }
+            QLabel {
+                font-size: 14px;
+                color: #333;
+            }
+        """
+    
+    def get_button_style(self):
+        return """
+            QPushButton {
+                background-color: #f0f0f0;
+                color: #333;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+            QPushButton:pressed {
+                background-color: #d0d0d0;
+            }
+        """
+    
+    def get_primary_button_style(self):
+        return """
+            QPushButton {
+                background-color: #007AFF;
+                color: white;
+            }
+            QPushButton:hover {
+                background-color: #0056cc;
+            }
+            QPushButton:pressed {
+                background-color: #004099;
+            }
+            QPushButton:disabled {
+                background-color: #c7c7cc;
+                color: #ffffff;
+            }
+        """
+    
+    def get_progress_style(self):
+        return """
+            QProgressBar {
+                border: 1px solid #cccccc;
+                border-radius: 0px;
+                background-color: #f0f0f0;
+                height: 20px;
+                text-align: center;
+                font-size: 12px;
+            }
+            QProgressBar::chunk {
+                border-radius: 0px;
+                background-color: #4CAF50;
+            }
+        """
+    
+    def get_file_progress_style(self):
+        return """
+            QProgressBar {
+                border: 1px solid #cccccc;
+                border-radius: 0px;
+                background-color: #f0f0f0;
+                height: 16px;
+                text-align: center;
+                font-size: 10px;
+            }
+            QProgressBar::chunk {
+                border-radius: 0px;
+                background-color: #2196F3;
+            }
+        """
+    
+    def select_source(self):
+        # 先尝试选择文件
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择要压缩的文件", "", "所有文件 (*.*)"
+        )
+        
+        if not file_path:
+            # 如果没有选择文件，尝试选择文件夹
+            file_path = QFileDialog.getExistingDirectory(
+                self, "选择要压缩的文件夹", "", QFileDialog.ShowDirsOnly
+            )
+        
+        if file_path:
+            self.source_line.setText(file_path)
+    
+    def select_output(self):
+        dir_path = QFileDialog.getExistingDirectory(
+            self, "选择输出目录", ""
+        )
+        if dir_path:
+            self.output_line.setText(dir_path)
+    
+    def update_size_suffix(self, unit):
+        if unit == "MB":
+            self.size_spin.setRange(1, 10240)
+            self.size_spin.setValue(100)
+        else:
+            self.size_spin.setRange(1, 10)
+            self.size_spin.setValue(1)
+        self.size_spin.setSuffix(f" {unit}")
+    
+    def toggle_password(self, state):
+        self.password_edit.setEnabled(state == Qt.Checked)
+    
+    def apply_preset(self, preset):
+        """选择预设时同时设置压缩方式和级别"""
+        if preset not in COMPRESSION_PRESETS:
+            return
+        method, level = COMPRESSION_PRESETS[preset]
+        self.method_combo.setCurrentText(method)
+        self.update_level_range(method)
+        self.level_spin.setValue(level)
+        # 设置级别时会把预设改为“自定义”，这里恢复为所选的预设
+        self.preset_combo.blockSignals(True)
+        self.preset_combo.setCurrentText(preset)
+        self.preset_combo.blockSignals(False)
+    
+    def update_level_range(self, method):
+        """根据压缩方式更新级别范围，并切换为该方式的默认级别"""
+        _, (low, high), default = COMPRESSION_METHODS[method]
+        self.level_spin.setRange(low, high)
+        self.level_spin.setValue(default)
+        self.mark_custom_preset()
+    
+    def mark_custom_preset(self, *args):
+        """手动修改压缩方式或级别后，预设显示为“自定义”"""
+        preset = COMPRESSION_PRESETS.get(self.preset_combo.currentText())
+        if preset != (self.method_combo.currentText(), self.level_spin.value()):
+            self.preset_combo.blockSignals(True)
+            self.preset_combo.setCurrentText("自定义")
+            self.preset_combo.blockSignals(False)
+    
+    def start_compress(self):
+        # 检查输入
+        source_path = self.source_line.text()
+        output_dir = self.output_line.text()
+        
+        if not source_path:
+            QMessageBox.warning(self, "警告", "请选择要压缩的文件或文件夹")
+            return
+        
+        if not output_dir:
+            QMessageBox.warning(self, "警告", "请选择输出目录")
+            return
+        
+        # 计算分卷大小（转换为字节）
+        volume_size = self.get_volume_size()
+        
+        # 获取密码
+        password = self.password_edit.text() if self.password_check.isChecked() else None
+        
+        # 禁用按钮
+        self.compress_btn.setEnabled(False)
+        self.split_btn.setEnabled(False)
+        self.extract_btn.setEnabled(False)
+        self.status_label.setText("正在压缩...")
+        
+        # 创建压缩线程
+        self.compress_thread = CompressThread(
+            source_path, output_dir, volume_size, password,
+            stats=self.stats_check.isChecked(), **self.get_compress_options()
+        )
+        self.compress_thread.progress.connect(self.update_progress)
+        self.compress_thread.current_file.connect(self.update_current_file)
+        self.compress_thread.file_progress.connect(self.update_file_progress)  # 连接单个文件进度信号
+        self.compress_thread.stats.connect(self.update_stats)
+        self.compress_thread.finished.connect(self.compress_finished)
+        self.compress_thread.start()
+        
+        self.cancel_requested = False
+        self.pause_btn.setText("暂停")
+        self.pause_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(True)
+    
+    def toggle_pause(self):
+        """暂停或继续压缩"""
+        if self.compress_thread.is_paused():
+            self.compress_thread.resume()
+            self.pause_btn.setText("暂停")
+            self.status_label.setText("压缩中...")
+        else:
+            self.compress_thread.pause()
+            self.pause_btn.setText("继续")
+            self.status_label.setText("已暂停")
+    
+    def cancel_compress(self):
+        """取消压缩，压缩线程会在处理下一个数据块时停止并删除未完成的分卷"""
+        self.cancel_requested = True
+        self.compress_thread.cancel()
+        self.pause_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("正在取消...")
+    
+    def get_compress_options(self):
+        """根据界面设置返回压缩引擎的选项（不包括分卷大小和密码）"""
+        return {
+            "workers": self.workers_spin.value(),
+            "auto_store": self.auto_store_check.isChecked(),
+            "compression": COMPRESSION_METHODS[self.method_combo.currentText()][0],
+            "compresslevel": self.level_spin.value(),
+            "incremental": self.incremental_check.isChecked(),
+            "parity": self.parity_spin.value(),
+            "buffer_size": self.IO_BUFFER_SIZES[self.io_buffer_combo.currentText()],
+            "write_buffer": self.IO_BUFFER_SIZES[self.io_buffer_combo.currentText()],
+            "mmap_threshold": 64 * 1024 * 1024 if self.mmap_check.isChecked() else 0,
+        }
+    
+    def queue_job(self, source_path, output_dir):
+        """用当前的压缩设置把一个任务加入队列，返回是否成功"""
+        password = self.password_edit.text() if self.password_check.isChecked() else None
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            batch_job = self.scheduler.add(
+                source_path, output_dir, self.get_volume_size(), password, **self.get_compress_options()
+            )
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "警告", f"无法加入队列：{source_path}\n{str(e)}")
+            return False
+        
+        self.add_queue_row(batch_job)
+        self.update_queue_status()
+        return True
+    
+    def add_queue_row(self, batch_job):
+        """在队列表格末尾添加一个任务"""
+        row = self.queue_table.rowCount()
+        self.queue_table.insertRow(row)
+        self.queue_table.setItem(row, 0, QTableWidgetItem(batch_job.source_path))
+        self.queue_table.setItem(row, 1, QTableWidgetItem(batch_job.output_dir))
+        self.queue_table.setItem(row, 2, QTableWidgetItem(batch_job.state))
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setStyleSheet(self.get_file_progress_style())
+        self.queue_table.setCellWidget(row, 3, progress_bar)
+        self.queue_rows[batch_job.job_id] = row
+        self.update_queue_row(batch_job)
+    
+    def add_to_queue(self):
+        """把当前选择的源文件和输出目录加入批量任务队列"""
+        source_path = self.source_line.text()
+        output_dir = self.output_line.text()
+        if not source_path:
+            QMessageBox.warning(self, "警告", "请选择要压缩的文件或文件夹")
+            return
+        if not output_dir:
+            QMessageBox.warning(self, "警告", "请选择输出目录")
+            return
+        if self.queue_job(source_path, output_dir):
+            self.source_line.clear()
+    
+    def import_job_list(self):
+        """从任务列表文件导入：每行一个源路径，可用制表符分隔再指定输出目录"""
+        list_path, _ = QFileDialog.getOpenFileName(
+            self, "选择任务列表", "", "文本文件 (*.txt);;所有文件 (*.*)"
+        )
+        if not list_path:
+            return
+        try:
+            job_list = load_job_list(list_path)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.critical(self, "失败", f"无法读取任务列表：{str(e)}")
+            return
+        
+        default_output = self.output_line.text()
+        if not default_output and any(output_dir is None for _, output_dir in job_list):
+            QMessageBox.warning(self, "警告", "任务列表中有未指定输出目录的任务，请先选择输出目录")
+            return
+        for source_path, output_dir in job_list:
+            self.queue_job(source_path, output_dir or default_output)
+    
+    def start_queue(self):
+        """开始运行队列中的任务，队列运行期间加入的任务会自动开始"""
+        if all(batch_job.finished for batch_job in self.scheduler.jobs):
+            QMessageBox.warning(self, "警告", "队列中没有任务")
+            return
+        self.scheduler.start()
+        self.start_queue_btn.setEnabled(False)
+        self.cancel_queue_btn.setEnabled(True)
+        self.queue_timer.start()
+        self.update_queue_status()
+    
+    def cancel_queue(self):
+        """取消队列中所有未结束的任务"""
+        self.scheduler.cancel_all()
+        self.cancel_queue_btn.setEnabled(False)
+    
+    def clear_finished_jobs(self):
+        """从队列中移除已结束的任务"""
+        self.scheduler.remove_finished()
+        self.queue_table.setRowCount(0)
+        self.queue_rows = {}
+        for batch_job in self.scheduler.jobs:
+            self.add_queue_row(batch_job)
+        self.update_queue_status()
+    
+    def update_io_limit(self, value):
+        self.scheduler.io_limit = value
+    
+    def update_queue_row(self, batch_job):
+        """更新队列表格中一个任务的状态和进度"""
+        row = self.queue_rows.get(batch_job.job_id)
+        if row is None:
+            return
+        item = self.queue_table.item(row, 2)
+        item.setText(batch_job.state)
+        item.setToolTip(batch_job.message)
+        progress = 100.0 if batch_job.state == DONE else batch_job.progress
+        self.queue_table.cellWidget(row, 3).setValue(int(round(max(0.0, min(100.0, progress)))))
+    
+    def update_queue_status(self):
+        """显示队列的合计进度和吞吐量"""
+        jobs = self.scheduler.jobs
+        if not jobs:
+            self.queue_status_label.setText("队列为空")
+            return
+        states = [batch_job.state for batch_job in jobs]
+        processed, total = self.scheduler.totals()
+        text = (
+            f"运行中{states.count(RUNNING)}个，等待{states.count(PENDING)}个，"
+            f"完成{states.count(DONE)}个，失败{states.count(FAILED)}个，取消{states.count(CANCELLED)}个"
+        )
+        if total:
+            # 运行中显示最近几秒的合计速度，全部结束后显示平均速度
+            if RUNNING in states:
+                speed = f"合计速度 {self.scheduler.throughput() / 1024 / 1024:.1f} MB/s"
+            else:
+                speed = f"平均速度 {self.scheduler.average_throughput() / 1024 / 1024:.1f} MB/s"
+            text += f"；已处理 {processed / 1024 / 1024:.1f} / {total / 1024 / 1024:.1f} MB，{speed}"
+        self.queue_status_label.setText(text)
+    
+    def queue_finished(self):
+        """队列中的任务全部结束"""
+        self.queue_timer.stop()
+        self.update_queue_status()
+        self.start_queue_btn.setEnabled(True)
+        self.cancel_queue_btn.setEnabled(False)
+    
+    def get_volume_size(self):
+        """根据界面设置计算分卷大小（字节）"""
+        size_value = self.size_spin.value()
+        size_unit = self.size_unit.currentText()
+        volume_size = int(size_value * 1024 * 1024)  # MB
+        if size_unit == "GB":
+            volume_size = int(size_value * 1024 * 1024 * 1024)  # GB
+        return volume_size
+    
+    def start_split(self):
+        """把已有的ZIP文件分割为标准分卷"""
+        zip_path, _ = QFileDialog.getOpenFileName(
+            self, "选择要分割的ZIP文件", "", "ZIP文件 (*.zip)"
+        )
+        if not zip_path:
+            return
+        
+        # 未选择输出目录时，分卷输出到ZIP文件所在目录
+        output_dir = self.output_line.text() or os.path.dirname(zip_path)
+        
+        # 禁用按钮
+        self.compress_btn.setEnabled(False)
+        self.split_btn.setEnabled(False)
+        self.extract_btn.setEnabled(False)
+        self.status_label.setText("正在分割...")
+        self.current_file_label.setText(f"正在分割：{os.path.basename(zip_path)}")
+        
+        # 创建分割线程
+        self.split_thread = SplitThread(zip_path, output_dir, self.get_volume_size())
+        self.split_thread.progress.connect(self.update_split_progress)
+        self.split_thread.finished.connect(self.compress_finished)
+        self.split_thread.start()
+    
+    def start_extract(self):
+        """选择任意一个分卷，直接从整组分卷中解压"""
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self, "选择要解压的分卷", "", "分卷压缩包 (*.zip *.z01);;所有文件 (*.*)"
+        )
+        if not archive_path:
+            return
+        
+        from split_compression.volumes import volume_base
+        
+        # 未选择输出目录时，解压到分卷旁边与压缩包同名的文件夹
+        base = volume_base(archive_path)
+        output_dir = self.output_line.text() or base
+        password = self.password_edit.text() if self.password_check.isChecked() else None
+        
+        # 禁用按钮
+        self.compress_btn.setEnabled(False)
+        self.split_btn.setEnabled(False)
+        self.extract_btn.setEnabled(False)
+        self.status_label.setText("正在解压...")
+        
+        # 解压线程数沿用“压缩线程”的设置
+        self.extract_thread = ExtractThread(archive_path, output_dir, password, self.workers_spin.value())
+        self.extract_thread.progress.connect(self.update_extract_progress)
+        self.extract_thread.current_file.connect(self.update_extract_file)
+        self.extract_thread.file_progress.connect(self.update_file_progress)
+        self.extract_thread.finished.connect(self.compress_finished)
+        self.extract_thread.start()
+    
+    def update_extract_progress(self, value):
+        """更新解压进度"""
+        progress_value = round(max(0.0, min(100.0, value)), 1)
+        self.progress_bar.setValue(int(round(progress_value)))
+        self.status_label.setText(f"解压中... {progress_value:.1f}%")
+    
+    def update_extract_file(self, filename):
+        self.current_file_label.setText(f"正在解压：{filename}")
+    
+    def update_split_progress(self, value):
+        """更新分割进度"""
+        progress_value = round(max(0.0, min(100.0, value)), 1)
+        self.progress_bar.setValue(int(round(progress_value)))
+        self.status_label.setText(f"分割中... {progress_value:.1f}%")
+    
+    def update_current_file(self, filename):
+        """更新当前压缩文件标签"""
+        self.current_file_label.setText(f"正在压缩：{filename}")
+    
+    def update_progress(self, value):
+        """更新总进度条"""
+        # 将浮点数进度值（0-100.0）转换为整数（0-100）以支持1%精度
+        clamped_value = max(0.0, min(100.0, value))
+        # 四舍五入到一位小数
+        progress_value = round(clamped_value, 1)
+        # 确保进度值在0-100范围内
+        progress_value = max(0.0, min(100.0, progress_value))
+        # 进度条使用整数范围0-100，直接转换为整数
+        self.progress_bar.setValue(int(round(progress_value)))
+        # 更新状态标签，显示当前进度值（一位小数）
+        if self.cancel_requested:
+            return
+        state = "已暂停" if self.compress_thread.is_paused() else "压缩中..."
+        self.status_label.setText(f"{state} {progress_value:.1f}%")
+    
+    def update_file_progress(self, value):
+        """更新单个文件进度条"""
+        # 将浮点数进度值（0-100.0）转换为整数（0-100）以支持1%精度
+        clamped_value = max(0.0, min(100.0, value))
+        # 四舍五入到一位小数
+        progress_value = round(clamped_value, 1)
+        # 确保进度值在0-100范围内
+        progress_value = max(0.0, min(100.0, progress_value))
+        # 进度条使用整数范围0-100，直接转换为整数
+        self.file_progress_bar.setValue(int(round(progress_value)))
+    
+    def toggle_stats_panel(self, checked):
+        """显示或隐藏性能统计面板"""
+        self.stats_group.setVisible(checked)
+    
+    def update_stats(self, snapshot):
+        """用统计快照更新性能统计面板"""
+        self.stats_label.setText(
+            f"已用时间 {format_duration(snapshot['elapsed'])}    剩余时间 {format_duration(snapshot['eta'])}    "
+            f"当前速度 {snapshot['current_mb_s']:.1f} MB/s    平均速度 {snapshot['average_mb_s']:.1f} MB/s    "
+            f"每秒 {snapshot['files_s']:.0f} 个文件"
+        )
+        rows = [(label, snapshot["stages"][stage]) for stage, label in STAGE_LABELS.items()
+                if stage in snapshot["stages"]]
+        self.stats_table.setRowCount(len(rows))
+        for row, (label, values) in enumerate(rows):
+            size = f"{values['bytes'] / 1024 / 1024:.1f} MB" if values["bytes"] else ""
+            speed = f"{values['mb_s']:.1f} MB/s" if values["mb_s"] is not None else ""
+            for column, text in enumerate([label, f"{values['seconds']:.2f} 秒", size, speed]):
+                self.stats_table.setItem(row, column, QTableWidgetItem(text))
+    
+    def compress_finished(self, success, message):
+        self.compress_btn.setEnabled(True)
+        self.split_btn.setEnabled(True)
+        self.extract_btn.setEnabled(True)
+        self.pause_btn.setText("暂停")
+        self.pause_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("就绪")
+        self.current_file_label.setText("准备压缩...")
+        
+        if success:
+            QMessageBox.information(self, "成功", message)
+        elif self.cancel_requested:
+            self.cancel_requested = False
+            QMessageBox.information(self, "已取消", message)
+        else:
+            QMessageBox.critical(self, "失败", message)
+        
+        # 重置所有进度条为0
+        self.progress_bar.setValue(0)
+        self.file_progress_bar.setValue(0)
+    
+    def clear_all(self):
+        self.source_line.clear()
+        self.output_line.clear()
+        self.size_spin.setValue(100)
+        self.size_unit.setCurrentIndex(0)
+        self.password_check.setChecked(False)
+        self.password_edit.clear()
+        self.workers_spin.setValue(1)
+        self.auto_store_check.setChecked(True)
+        self.preset_combo.setCurrentText("均衡")
+        self.incremental_check.setChecked(False)
+        self.parity_spin.setValue(0)
+        self.stats_check.setChecked(False)
+        self.io_buffer_combo.setCurrentText("1 MB")
+        self.mmap_check.setChecked(False)
+        self.stats_label.setText("开始压缩后显示统计")
+        self.stats_table.setRowCount(0)
+        self.progress_bar.setValue(0)
+        self.file_progress_bar.setValue(0)  # 重置单个文件进度条
+        self.current_file_label.setText("准备压缩...")
+        self.status_label.setText("就绪")
+    
+    def check_for_updates(self):
+        """检查更新"""
+        self.update_thread = UpdateCheckThread()
+        self.update_thread.update_available.connect(self.on_update_available)
+        self.update_thread.no_update.connect(self.on_no_update)
+        self.update_thread.error.connect(self.on_update_error)
+        self.update_thread.start()
+    
+    def compare_versions(self, version1, version2):
+        """比较版本号，返回True如果version1 < version2"""
+        try:
+            # 将版本号转换为浮点数进行比较
+            v1 = float(version1)
+            v2 = float(version2)
+            return v1 < v2
+        except ValueError:
+            return False
+    
+    def on_update_available(self, latest_version, download_url, sha256):
+        """发现新版本"""
+        if self.compare_versions(self.current_version, latest_version):
+            # 显示更新对话框，不可取消
+            reply = QMessageBox.information(
+                self,
+                "发现新版本",
+                f"当前版本：{self.current_version}\n最新版本：{latest_version}\n\n正在准备下载更新...",
+                QMessageBox.Ok,
+                QMessageBox.Ok
+            )
+            
+            if reply == QMessageBox.Ok:
+                self.download_update(latest_version, download_url, sha256)
+    
+    def on_no_update(self):
+        """没有新版本"""
+        # 只在调试时显示，实际运行时可以隐藏
+        # QMessageBox.information(self, "更新检查", "当前已是最新版本")
+        pass
+    
+    def on_update_error(self, error):
+        """更新检查错误"""
+        # 只在调试时显示，实际运行时可以隐藏
+        # QMessageBox.warning(self, "更新检查失败", f"检查更新时出错：{error}")
+        pass
+    
+    def download_update(self, latest_version, download_url, sha256=""):
+        """下载更新"""
+        import tempfile
+        
+        # 创建更新下载对话框
+        self.update_progress_dialog = QWidget(self)
+        self.update_progress_dialog.setWindowTitle("更新中")
+        self.update_progress_dialog.setGeometry(200, 200, 400, 150)
+        self.update_progress_dialog.setWindowModality(Qt.ApplicationModal)  # 不可取消
+        
+        layout = QVBoxLayout()
+        
+        label = QLabel(f"正在下载更新 {latest_version}...")
+        layout.addWidget(label)
+        
+        self.update_progress_bar = QProgressBar()
+        self.update_progress_bar.setRange(0, 100)
+        self.update_progress_bar.setValue(0)
+        layout.addWidget(self.update_progress_bar)
+        
+        status_label = QLabel("0%")
+        status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(status_label)
+        
+        self.update_progress_dialog.setLayout(layout)
+        self.update_progress_dialog.show()
+        
+        # 创建临时文件保存更新包（文件名固定，上次未下载完时可以继续）
+        temp_dir = tempfile.gettempdir()
+        self.update_file = os.path.join(temp_dir, f"update_{latest_version}.zip")
+        
+        # 开始下载
+        self.download_thread = UpdateDownloadThread(download_url, self.update_file, sha256)
+        self.download_thread.progress.connect(self.update_progress_bar.setValue)
+        self.download_thread.progress.connect(lambda value: status_label.setText(f"{value}%"))
+        self.download_thread.finished.connect(self.on_update_downloaded)
+        self.download_thread.error.connect(self.on_update_download_error)
+        self.download_thread.start()
+    
+    def on_update_downloaded(self, file_path):
+        """更新下载完成"""
+        import shutil
+        import tempfile
+        import zipfile
+        
+        try:
+            # 关闭下载对话框
+            self.update_progress_dialog.close()
+            
+            # 解压更新包
+            temp_dir = tempfile.gettempdir()
+            extract_dir = os.path.join(temp_dir, "update_extract")
+            if not os.path.exists(extract_dir):
+                os.makedirs(extract_dir)
+            
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                zip_ref.extractall(extract_dir)
+            
+            # 查找主程序文件
+            main_file = None
+            for root, dirs, files in os.walk(extract_dir):
+                for file in files:
+                    if file == "分卷压缩工具.exe":
+                        main_file = os.path.join(root, file)
+                        break
+                if main_file:
+                    break
+            
+            if main_file:
+                # 获取当前程序信息
+                current_exe = sys.executable
+                current_dir = os.path.dirname(current_exe)
+                
+                # 新程序路径（放在同一目录下）
+                new_exe = os.path.join(current_dir, "分卷压缩工具.exe")
+                
+                # 关闭当前程序并替换
+                QMessageBox.information(
+                    self,
+                    "更新完成",
+                    "更新已成功下载！程序将重启以应用更新。",
+                    QMessageBox.Ok,
+                    QMessageBox.Ok
+                )
+                
+                # 清理临时文件
+                os.remove(file_path)
+                
+                # 创建更新脚本
+                update_script = os.path.join(temp_dir, "update_script.bat")
+                with open(update_script, "w") as f:
+                    f.write(f"@echo off\n")
+                    f.write(f"echo 正在更新程序...\n")
+                    f.write(f"timeout /t 2 /nobreak >nul\n")
+                    # 替换旧版本
+                    f.write(f"if exist \"{current_exe}\" del /f /q \"{current_exe}\"\n")
+                    # 将新程序移动到当前程序位置
+                    f.write(f"copy /y \"{main_file}\" \"{new_exe}\"\n")
+                    # 删除备份文件（如果存在）
+                    f.write(f"if exist \"{current_exe}.bak\" del /f /q \"{current_exe}.bak\"\n")
+                    # 启动新程序
+                    f.write(f"start \"\" \"{new_exe}\"\n")
+                    # 清理自身
+                    f.write(f"del /f /q \"{update_script}\"\n")
+                    # 删除临时解压目录
+                    f.write(f"rd /s /q \"{extract_dir}\"\n")
+                
+                # 退出当前程序并运行更新脚本
+                QApplication.quit()
+                os.startfile(update_script)
+            else:
+                QMessageBox.critical(self, "更新失败", "未找到主程序文件")
+                # 清理临时文件
+                os.remove(file_path)
+                shutil.rmtree(extract_dir)
+        except Exception as e:
+            QMessageBox.critical(self, "更新失败", f"更新安装失败：{str(e)}")
+            # 清理临时文件
+            try:
+                os.remove(file_path)
+                shutil.rmtree(extract_dir)
+            except:
+                pass
+    
+    def on_update_download_error(self, error):
+        """更新下载错误"""
+        self.update_progress_dialog.close()
+        QMessageBox.critical(self, "下载失败", f"更新下载失败：{error}")
+
+class FirstPaintFilter(QObject):
+    """在应用程序第一次绘制任何窗口部件时调用callback（只调用一次）"""
+    
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+    
+    def eventFilter(self, obj, event):
+        if self.callback and event.type() == QEvent.Paint:
+            callback, self.callback = self.callback, None
+            callback()
+        return False
+
+def run_startup_probe():
+    """--startup-probe：启动界面，第一次绘制后把各阶段耗时输出为一行JSON并退出"""
+    app = QApplication(sys.argv[:1])
+    app_created = time.perf_counter()
+    window = VolumeCompressor()
+    window_created = time.perf_counter()
+    
+    def on_first_paint():
+        painted = time.perf_counter()
+        result = {
+            "import_qt": _QT_IMPORTED - _MODULE_START,
+            "import_modules": _MODULES_IMPORTED - _QT_IMPORTED,
+            "create_app": app_created - _MODULES_IMPORTED,
+            "build_window": window_created - app_created,
+            "first_paint": painted - window_created,
+            "script_to_first_paint": painted - _MODULE_START,
+            "deferred_loaded": [name for name in DEFERRED_MODULES
+                                if name in sys.modules and name not in _PRELOADED_MODULES],
+        }
+        print(json.dumps(result), flush=True)
+        QTimer.singleShot(0, app.quit)
+    
+    paint_filter = FirstPaintFilter(on_first_paint)
+    app.installEventFilter(paint_filter)
+    window.show()
+    app.exec_()
+
+def parse_import_times(output, top=15):
+    """从python -X importtime的输出中取出界面脚本直接导入的模块，按累计耗时（秒）从大到小排列"""
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # 模块名前的缩进表示嵌套层次，"|"后面固定有一个空格
+        name = fields[2][1:].rstrip()
+        if name and not name.startswith(" "):
+            times.append((name, int(fields[1]) / 1e6))
+    times.sort(key=lambda item: item[1], reverse=True)
+    return times[:top]
+
+def run_startup_benchmark(argv):
+    """--startup-benchmark：在子进程中反复启动界面，测量到第一次绘制的时间和导入耗时分布
+    
+    返回退出码：第一次绘制之前导入了DEFERRED_MODULES中的模块，或者超出--max-ms时为1，
+    可以放在持续集成中发现启动变慢。
+    """
+    import argparse
+    import statistics
+    import subprocess
+    
+    parser = argparse.ArgumentParser(prog="分卷压缩工具.py --startup-benchmark")
+    parser.add_argument("--startup-benchmark", action="store_true")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="启动次数，结果取中位数（默认5）")
+    parser.add_argument("-o", "--output", help="把结果保存为JSON文件")
+    parser.add_argument("--max-ms", type=float, help="进程启动到第一次绘制的中位数超过该毫秒数时返回1")
+    args = parser.parse_args(argv)
+    
+    command = [sys.executable, os.path.abspath(__file__), "--startup-probe"]
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        line = process.stdout.readline()
+        # 包括解释器启动，是用户双击后实际等待的时间
+        elapsed = time.perf_counter() - start
+        process.wait()
+        if not line:
+            print("界面启动失败", file=sys.stderr)
+            return 1
+        result = json.loads(line)
+        result["process_to_first_paint"] = elapsed
+        runs.append(result)
+    
+    # 再用-X importtime启动一次，得到各个模块的导入耗时
+    process = subprocess.run([sys.executable, "-X", "importtime"] + command[1:],
+                             capture_output=True, text=True)
+    phases = ["process_to_first_paint", "script_to_first_paint", "import_qt", "import_modules",
+              "create_app", "build_window", "first_paint"]
+    report = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "repeat": len(runs),
+        "median": {phase: statistics.median(run[phase] for run in runs) for phase in phases},
+        "runs": runs,
+        "imports": dict(parse_import_times(process.stderr)),
+        "deferred_loaded": sorted({name for run in runs for name in run["deferred_loaded"]}),
+    }
+    
+    median = report["median"]
+    print(f"进程启动到第一次绘制 {median['process_to_first_paint'] * 1000:.1f} ms（{len(runs)}次的中位数）")
+    print("；".join(f"{phase} {median[phase] * 1000:.1f} ms" for phase in phases[1:]))
+    print("导入耗时：" + "；".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in report["imports"].items()))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    failed = False
+    if report["deferred_loaded"]:
+        print("第一次绘制之前导入了应当延迟导入的模块：" + "、".join(report["deferred_loaded"]), file=sys.stderr)
+        failed = True
+    if args.max_ms is not None and median["process_to_first_paint"] * 1000 > args.max_ms:
+        print(f"启动时间超出{args.max_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    if "--startup-probe" in sys.argv:
+        run_startup_probe()
+    elif "--startup-benchmark" in sys.argv:
+        sys.exit(run_startup_benchmark(sys.argv[1:]))
+    else:
+        app = QApplication(sys.argv)
+        window = VolumeCompressor()
+        window.show()
+        sys.exit(app.exec_())